@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import importlib.util
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -52,6 +53,13 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Per-request SQL profiling (Server-Timing header, N+1 warnings) from the
+# shared query_profiler package at the repository root. It is wired up only
+# in DEBUG and once installed with `pip install -e query_profiler`.
+if DEBUG and importlib.util.find_spec("query_profiler") is not None:
+    INSTALLED_APPS += ["query_profiler"]
+    MIDDLEWARE += ["query_profiler.middleware.QueryProfilerMiddleware"]
+
 ROOT_URLCONF = "advanced_api_project.urls"
 
 TEMPLATES = [
@@ -83,6 +91,58 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+#
+# The "api" alias holds rendered list pages (see api/cache.py). locmem is
+# per process; deployments running several workers should point it at a
+# shared backend so invalidations reach every process, e.g.
+#   "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+#   "LOCATION": "/var/tmp/advanced_api_cache",
+# or
+#   "BACKEND": "django.core.cache.backends.redis.RedisCache",
+#   "LOCATION": "redis://127.0.0.1:6379",
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "api": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "api-responses",
+    },
+}
+
+API_RESPONSE_CACHE_ALIAS = "api"
+API_RESPONSE_CACHE_TIMEOUT = 300
+
+
+# Bulk Book operations (api/bulk.py)
+
+API_BULK_CHUNK_SIZE = 500
+API_BULK_MAX_CHUNK_SIZE = 5000
+API_BULK_MAX_OPERATIONS = 50000
+
+# Batch BookCreateView inserts in a per-process write buffer
+# (api/writebehind.py): a batch is written once BATCH_SIZE creates are
+# waiting or FLUSH_INTERVAL seconds have passed. Past MAX_PENDING waiting
+# creates, requests wait up to SUBMIT_TIMEOUT seconds, then get a 503; a
+# request whose create is not written within RESULT_TIMEOUT also gets a 503.
+API_WRITE_BEHIND = False
+API_WRITE_BEHIND_BATCH_SIZE = 500
+API_WRITE_BEHIND_FLUSH_INTERVAL = 0.02
+API_WRITE_BEHIND_MAX_PENDING = 10000
+API_WRITE_BEHIND_SUBMIT_TIMEOUT = 2.0
+API_WRITE_BEHIND_RESULT_TIMEOUT = 10.0
+
+# Rows fetched per round trip by the streaming book export.
+API_EXPORT_CHUNK_SIZE = 2000
+
+# Dotted path of the ?q= search backend (api/search.py); None picks FTS5 on
+# SQLite and tsvector on PostgreSQL.
+API_SEARCH_BACKEND = None
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -144,4 +204,10 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 10,
     'SEARCH_PARAM': 'q',  
     'ORDERING_PARAM': 'ordering',
-}
\ No newline at end of file
+}
+# Build Book/Author list and detail responses from values() rows
+# (api/fastpath.py) instead of ModelSerializer instances. For the encoding
+# side, put "drf_orjson.renderers.ORJSONRenderer" first in
+# REST_FRAMEWORK["DEFAULT_RENDERER_CLASSES"]; it is the shared package at
+# the repository root (pip install -e "drf_orjson[orjson]").
+API_FAST_SERIALIZATION = False
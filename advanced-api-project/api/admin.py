@@ -8,7 +8,7 @@ from .models import Author, Book
 @admin.register(Author)
 class AuthorAdmin(admin.ModelAdmin):
     """Admin interface for Author model."""
-    list_display = ['name', 'created_at', 'updated_at']
+    list_display = ['name', 'book_count', 'created_at', 'updated_at']
     search_fields = ['name']
     list_filter = ['created_at']
 
@@ -0,0 +1,159 @@
+"""
+Async-native read views for books and authors.
+
+These serve the same JSON as BookListView, BookDetailView, AuthorListView
+and AuthorDetailView, but as ``async def`` handlers on the async ORM
+(``acount``, ``aget``, ``async for``). Under the ASGI application a request
+waiting on the database no longer holds a worker thread for its whole
+lifetime, which is what limits a threaded WSGI server under DB latency.
+
+DRF's APIView is sync-only, so these are plain Django views built from the
+pieces the DRF views already use: the FilterSets, the search backend,
+``?fields=``/``?expand=`` parsing, the values() fast serializers and
+ORJSONRenderer. Responses are not cached and carry no ETag; they are read
+paths for clients that need concurrency, not a replacement for the DRF
+views. Compare the two with ``manage.py bench_asgi``.
+"""
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.views import View
+from rest_framework.exceptions import APIException, NotFound, ValidationError
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from drf_orjson.renderers import ORJSONRenderer
+
+from .fastpath import FastAuthorSerializer, FastBookSerializer
+from .filters import AuthorFilter, BookFilter
+from .models import Author, Book
+from .search import get_search_backend, tokenize
+from .serializers import AuthorSerializer, BookSerializer
+from .sparse import parse_field_selection
+
+
+class AsyncReadView(View):
+    """
+    Base async list/detail view over a values() fast serializer.
+
+    A ``pk`` URL kwarg selects the detail response; otherwise the filtered,
+    ordered queryset is paginated like DRF's PageNumberPagination.
+    """
+
+    http_method_names = ['get', 'head', 'options']
+    model = None
+    serializer_class = None
+    fast_serializer_class = None
+    filterset_class = None
+    ordering_fields = ()
+    ordering = ('pk',)
+    page_size = api_settings.PAGE_SIZE
+    renderer = ORJSONRenderer()
+
+    def render(self, data, status=200):
+        return HttpResponse(
+            self.renderer.render(data), status=status, content_type=self.renderer.media_type,
+        )
+
+    async def get(self, request, pk=None):
+        try:
+            fields = parse_field_selection(
+                request.GET,
+                self.serializer_class.get_available_fields(),
+                self.serializer_class.get_expandable_fields(),
+            )
+            serializer = self.fast_serializer_class(fields=fields)
+            if pk is None:
+                data = await self.list(request, serializer)
+            else:
+                data = await self.retrieve(pk, serializer)
+        except APIException as exc:
+            detail = exc.detail if isinstance(exc, ValidationError) else {'detail': exc.detail}
+            return self.render(detail, status=exc.status_code)
+        return self.render(data)
+
+    def get_queryset(self):
+        return self.model._default_manager.all()
+
+    def filter_queryset(self, request, queryset):
+        """
+        Apply the FilterSet, search and ordering.
+
+        Runs in a worker thread: the FilterSet may query while validating
+        (e.g. ModelChoiceFilter), which the async context does not allow.
+        """
+        if self.filterset_class is not None:
+            filterset = self.filterset_class(request.GET, queryset=queryset, request=request)
+            if not filterset.is_valid():
+                raise ValidationError(filterset.errors)
+            queryset = filterset.qs
+
+        ordering = [
+            term for term in request.GET.get(api_settings.ORDERING_PARAM, '').split(',')
+            if term.lstrip('-') in self.ordering_fields
+        ]
+        return queryset.order_by(*(ordering or self.ordering))
+
+    async def list(self, request, serializer):
+        queryset = await sync_to_async(self.filter_queryset)(request, self.get_queryset())
+        count = await queryset.acount()
+        try:
+            page = int(request.GET.get('page', 1))
+        except ValueError:
+            raise NotFound('Invalid page.')
+        last_page = max(1, -(-count // self.page_size))
+        if not 1 <= page <= last_page:
+            raise NotFound('Invalid page.')
+
+        start = (page - 1) * self.page_size
+        rows = serializer.get_rows(queryset)[start:start + self.page_size]
+        url = request.build_absolute_uri()
+        previous = None
+        if page == 2:
+            previous = remove_query_param(url, 'page')
+        elif page > 2:
+            previous = replace_query_param(url, 'page', page - 1)
+        return {
+            'count': count,
+            'next': replace_query_param(url, 'page', page + 1) if page < last_page else None,
+            'previous': previous,
+            'results': await serializer.aserialize(rows),
+        }
+
+    async def retrieve(self, pk, serializer):
+        rows = serializer.get_rows(self.get_queryset())
+        try:
+            row = await rows.aget(pk=pk)
+        except self.model.DoesNotExist:
+            raise NotFound(f'No {self.model._meta.object_name} matches the given query.')
+        results = await serializer.aserialize([row])
+        return results[0]
+
+
+class AsyncBookView(AsyncReadView):
+    """Async BookListView/BookDetailView, including ``?q=`` search."""
+
+    model = Book
+    serializer_class = BookSerializer
+    fast_serializer_class = FastBookSerializer
+    filterset_class = BookFilter
+    ordering_fields = ('title', 'publication_year', 'created_at', 'updated_at', 'author__name')
+
+    def filter_queryset(self, request, queryset):
+        terms = [token for term in request.GET.getlist('q') for token in tokenize(term)]
+        if not terms:
+            return super().filter_queryset(request, queryset)
+        backend = get_search_backend(queryset.db)
+        rank = backend.ranked and not request.GET.get(api_settings.ORDERING_PARAM)
+        queryset = super().filter_queryset(request, backend.search(queryset, terms, rank=rank))
+        return queryset.order_by('-search_rank', 'pk') if rank else queryset
+
+
+class AsyncAuthorView(AsyncReadView):
+    """Async AuthorListView/AuthorDetailView, including ``?fields=``/``?expand=``."""
+
+    model = Author
+    serializer_class = AuthorSerializer
+    fast_serializer_class = FastAuthorSerializer
+    filterset_class = AuthorFilter
+    ordering_fields = ('name', 'created_at')
+    ordering = ('name',)
@@ -0,0 +1,252 @@
+"""
+Batched create/update/delete engine for Book instances.
+
+Used by BookBulkOperationsView. A request is a JSON array of operations:
+
+    {"op": "create", "data": {"title": ..., "publication_year": ..., "author": ...}}
+    {"op": "update", "id": 12, "data": {"title": ...}}
+    {"op": "delete", "id": 7}
+
+Every create and update payload is validated in one ``BookSerializer(many=True)``
+pass (authors are resolved with a single query by BookListSerializer). If any
+operation is invalid nothing is written; otherwise all writes run as
+``bulk_create``, ``bulk_update`` and ``QuerySet.delete()`` calls issued in
+chunks of ``chunk_size`` rows. Validation and writes share one transaction,
+and update/delete targets are loaded with ``select_for_update()``, so the
+rows written are the rows that were validated.
+"""
+
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .cache import bump_generation
+from .models import Author, Book
+from .serializers import BookSerializer
+
+OPERATIONS = ('create', 'update', 'delete')
+UPDATE_FIELDS = ['title', 'publication_year', 'author', 'updated_at', 'search_document']
+
+
+def get_chunk_size(requested=None):
+    """
+    Return the number of rows written per statement.
+
+    Args:
+        requested: Optional per-request override; clamped to
+            ``API_BULK_MAX_CHUNK_SIZE``.
+
+    Returns:
+        int: The chunk size to use.
+    """
+    default = getattr(settings, 'API_BULK_CHUNK_SIZE', 500)
+    maximum = getattr(settings, 'API_BULK_MAX_CHUNK_SIZE', 5000)
+    if requested in (None, ''):
+        return default
+    return max(1, min(int(requested), maximum))
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class BookBulkOperations:
+    """
+    Validate and apply a list of bulk Book operations.
+
+    Attributes:
+        results (list): One result dict per operation, in request order.
+        summary (dict): Counts per operation type, chunk size and timing.
+    """
+
+    def __init__(self, operations, chunk_size=None):
+        self.operations = operations
+        self.chunk_size = get_chunk_size(chunk_size)
+        self.results = [None] * len(operations)
+        self.summary = {}
+
+    @property
+    def error_count(self):
+        return sum(
+            result is not None and result['status'] == 'error'
+            for result in self.results
+        )
+
+    def run(self):
+        """
+        Validate every operation and, if all are valid, apply them.
+
+        Returns:
+            bool: True when the operations were applied.
+        """
+        started = time.perf_counter()
+        with transaction.atomic():
+            creates, updates, deletes = self._validate()
+            validated_at = time.perf_counter()
+
+            applied = not self.error_count
+            if applied:
+                self._apply_creates(creates)
+                self._apply_updates(updates)
+                self._apply_deletes(deletes)
+                Author.adjust_book_counts(self._book_count_deltas(creates, updates))
+                transaction.on_commit(lambda: bump_generation(Book))
+        finished = time.perf_counter()
+
+        self.summary = {
+            'applied': applied,
+            'created': len(creates) if applied else 0,
+            'updated': len(updates) if applied else 0,
+            'deleted': len(deletes) if applied else 0,
+            'errors': self.error_count,
+            'chunk_size': self.chunk_size,
+            'validation_ms': round((validated_at - started) * 1000, 2),
+            'write_ms': round((finished - validated_at) * 1000, 2),
+            'elapsed_ms': round((finished - started) * 1000, 2),
+        }
+        return applied
+
+    def _error(self, index, op, errors, pk=None):
+        result = {'index': index, 'op': op, 'status': 'error', 'errors': errors}
+        if pk is not None:
+            result['id'] = pk
+        self.results[index] = result
+
+    def _validate(self):
+        """
+        Check operation envelopes, load and lock update/delete targets in
+        one query and validate all payloads in one serializer pass. Runs
+        inside run()'s transaction.
+
+        Returns:
+            tuple: (creates, updates, deletes) as lists of
+            (index, validated_data), (index, book) and (index, pk).
+        """
+        envelopes = []
+        target_ids = set()
+        seen_ids = set()
+        for index, operation in enumerate(self.operations):
+            if not isinstance(operation, dict) or operation.get('op') not in OPERATIONS:
+                self._error(index, None, {'op': [f"Must be one of: {', '.join(OPERATIONS)}."]})
+                continue
+            op = operation['op']
+            pk = None
+            if op != 'create':
+                try:
+                    pk = int(operation.get('id'))
+                except (TypeError, ValueError):
+                    self._error(index, op, {'id': ['A valid integer id is required.']})
+                    continue
+                if pk in seen_ids:
+                    self._error(index, op, {'id': ['Book appears in more than one operation.']}, pk)
+                    continue
+                seen_ids.add(pk)
+                target_ids.add(pk)
+            data = operation.get('data', {})
+            if op != 'delete' and not isinstance(data, dict):
+                self._error(index, op, {'data': ['Expected an object.']}, pk)
+                continue
+            envelopes.append((index, op, pk, data))
+
+        books = (
+            Book.objects.select_for_update(of=('self',))
+            .select_related('author')
+            .in_bulk(target_ids)
+        )
+
+        payloads = []
+        payload_indexes = []
+        deletes = []
+        for index, op, pk, data in envelopes:
+            if op != 'create' and pk not in books:
+                self._error(index, op, {'id': [f'Book {pk} does not exist.']}, pk)
+                continue
+            if op == 'delete':
+                deletes.append((index, pk))
+                continue
+            if op == 'update':
+                book = books[pk]
+                data = {
+                    'title': book.title,
+                    'publication_year': book.publication_year,
+                    'author': book.author_id,
+                    **data,
+                }
+            payloads.append(data)
+            payload_indexes.append((index, op, pk))
+
+        serializer = BookSerializer(data=payloads, many=True)
+        valid = serializer.is_valid()
+        creates = []
+        updates = []
+        errors = {} if valid else serializer.errors
+        if isinstance(errors, list):
+            # DRF < 3.17 reports ListSerializer errors as a positional list.
+            errors = dict(enumerate(errors))
+        for position, (index, op, pk) in enumerate(payload_indexes):
+            if errors.get(position):
+                self._error(index, op, errors[position], pk)
+                continue
+            if not valid:
+                # Valid item in a failed batch: report it, write nothing.
+                self.results[index] = {'index': index, 'op': op, 'status': 'valid'}
+                continue
+            validated = serializer.validated_data[position]
+            if op == 'create':
+                creates.append((index, validated))
+            else:
+                book = books[pk]
+                for field, value in validated.items():
+                    setattr(book, field, value)
+                updates.append((index, book))
+        for index, pk in deletes:
+            if self.results[index] is None:
+                self.results[index] = {'index': index, 'op': 'delete', 'status': 'valid', 'id': pk}
+        return creates, updates, deletes
+
+    def _book_count_deltas(self, creates, updates):
+        """
+        Net Author.book_count change per author for the applied creates and
+        updates; deletes are counted by the post_delete handler.
+        """
+        deltas = Counter()
+        for _, validated in creates:
+            deltas[validated['author'].pk] += 1
+        for _, book in updates:
+            if book._loaded_author_id != book.author_id:
+                deltas[book._loaded_author_id] -= 1
+                deltas[book.author_id] += 1
+        return deltas
+
+    def _apply_creates(self, creates):
+        books = []
+        for _, validated in creates:
+            book = Book(**validated)
+            book.search_document = Book.build_search_document(book.title, book.author.name)
+            books.append(book)
+        books = Book.objects.bulk_create(books, batch_size=self.chunk_size)
+        for (index, _), book in zip(creates, books):
+            self.results[index] = {'index': index, 'op': 'create', 'status': 'created', 'id': book.pk}
+
+    def _apply_updates(self, updates):
+        now = timezone.now()
+        books = []
+        for index, book in updates:
+            book.updated_at = now
+            book.search_document = Book.build_search_document(book.title, book.author.name)
+            books.append(book)
+            self.results[index] = {'index': index, 'op': 'update', 'status': 'updated', 'id': book.pk}
+        Book.objects.bulk_update(books, UPDATE_FIELDS, batch_size=self.chunk_size)
+
+    def _apply_deletes(self, deletes):
+        # Book has no dependent rows; the post_delete handlers in
+        # api/signals.py adjust the author counts and bump the cache.
+        ids = [pk for _, pk in deletes]
+        for chunk in _chunks(ids, self.chunk_size):
+            Book.objects.filter(pk__in=chunk).delete()
+        for index, pk in deletes:
+            self.results[index] = {'index': index, 'op': 'delete', 'status': 'deleted', 'id': pk}
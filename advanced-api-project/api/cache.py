@@ -0,0 +1,114 @@
+"""
+Read-through response cache for the public list endpoints.
+
+Cached pages are keyed on the view, the normalized query string and a
+generation counter per model. Saving or deleting a Book or Author bumps
+its generation (see api/signals.py), so every page rendered from older
+data simply stops being looked up and ages out of the backend.
+
+The backend is whatever cache alias ``API_RESPONSE_CACHE_ALIAS`` names in
+``CACHES``: locmem by default, a FileBasedCache or RedisCache when several
+worker processes need to share entries and invalidations.
+"""
+
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.response import Response
+
+GENERATION_KEY = 'api:generation:{label}'
+RESPONSE_KEY = 'api:response:{view}:{generations}:{query}'
+
+
+def get_cache():
+    """Return the cache backend configured for API responses."""
+    return caches[getattr(settings, 'API_RESPONSE_CACHE_ALIAS', 'default')]
+
+
+def _generation_key(model):
+    return GENERATION_KEY.format(label=model._meta.label_lower)
+
+
+def get_generation(model):
+    """
+    Return the current generation counter for a model.
+
+    Missing counters are seeded from the clock rather than zero, so an
+    evicted counter can never come back to a value older entries used.
+    """
+    cache = get_cache()
+    key = _generation_key(model)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        generation = cache.get(key)
+    return generation
+
+
+def bump_generation(model):
+    """Invalidate every cached response built from rows of ``model``."""
+    cache = get_cache()
+    key = _generation_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+
+
+def normalize_query(query_params):
+    """
+    Build a canonical string from request query parameters.
+
+    Parameters are sorted by name and value and empty values are dropped,
+    so ``?page=2&ordering=title`` and ``?ordering=title&page=2&q=`` share
+    one cache entry.
+    """
+    items = sorted(
+        (key, value)
+        for key in query_params
+        for value in query_params.getlist(key)
+        if value != ''
+    )
+    return urlencode(items)
+
+
+class CachedListMixin:
+    """
+    Serve list responses from the API response cache.
+
+    Views set ``cache_models`` to every model whose rows appear in the
+    rendered output; a write to any of them invalidates the view's pages.
+    """
+
+    cache_models = ()
+    cache_timeout = None
+
+    def get_cache_key(self, request):
+        generations = '.'.join(str(get_generation(model)) for model in self.cache_models)
+        query = hashlib.md5(normalize_query(request.query_params).encode()).hexdigest()
+        return RESPONSE_KEY.format(
+            view=type(self).__name__, generations=generations, query=query
+        )
+
+    def get_cache_timeout(self):
+        if self.cache_timeout is not None:
+            return self.cache_timeout
+        return getattr(settings, 'API_RESPONSE_CACHE_TIMEOUT', 300)
+
+    def list(self, request, *args, **kwargs):
+        cache = get_cache()
+        key = self.get_cache_key(request)
+        data = cache.get(key)
+        if data is not None:
+            response = Response(data)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, self.get_cache_timeout())
+        response['X-Cache'] = 'MISS'
+        return response
@@ -0,0 +1,114 @@
+"""
+Conditional GET support for the read endpoints.
+
+ConditionalGetMixin hashes what a response is built from into a weak
+ETag before serializing anything. A client that sends the ETag back in
+``If-None-Match`` gets a 304 as soon as the validators match, so polling
+an unchanged resource skips the page query, the prefetches and a render.
+
+Views name the models their output is built from in
+``conditional_models``; the ETag then covers those models' generation
+counters from api/cache.py, which every write bumps, bulk writes
+included. That costs a couple of cache reads and no queries, so it is
+what the list views use. A detail 304 needs no existence check either: a
+delete bumps a generation, so an ETag can only still match while the row
+it was issued for exists (``If-None-Match: *`` is left to the view). Like the response cache, this relies on the
+``API_RESPONSE_CACHE_ALIAS`` backend being shared by every process.
+
+Views that set ``conditional_last_modified`` probe their row for
+``MAX(updated_at)`` and ``COUNT(*)`` instead, which also gives them a
+``Last-Modified`` date for ``If-Modified-Since``. The count is part of
+the validator because deleting a row does not move ``MAX(updated_at)``.
+"""
+
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .cache import get_generation, normalize_query
+
+
+class ConditionalGetMixin:
+    """
+    Answer ``If-None-Match`` (and, with ``conditional_last_modified``,
+    ``If-Modified-Since``) with 304 Not Modified before the view does any
+    real work.
+
+    Views set ``conditional_models`` to every model whose rows show up in
+    the rendered output, or set ``conditional_last_modified`` and extend
+    ``get_conditional_querysets`` with those rows.
+    """
+
+    conditional_models = ()
+    conditional_last_modified = False
+
+    def get_lookup(self):
+        """Return the detail lookup filter, or None on list views."""
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        if lookup_url_kwarg not in self.kwargs:
+            return None
+        return {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+
+    def get_conditional_querysets(self):
+        """
+        Return the querysets whose ``updated_at`` and row count determine
+        the response body. Defaults to the filtered view queryset, narrowed
+        to the looked-up row on detail views.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup = self.get_lookup()
+        if lookup is not None:
+            queryset = queryset.filter(**lookup)
+        return [queryset]
+
+    def get_validators(self, request):
+        """
+        Build the validators from the generation counters or the probes.
+
+        Returns:
+            tuple: ``(etag, last_modified)``; both None when a detail
+            view's row may not exist, so the normal 404 path runs.
+        """
+        parts = [
+            type(self).__name__,
+            request.accepted_renderer.format,
+            normalize_query(request.query_params),
+            repr(sorted(self.kwargs.items())),
+        ]
+        if not self.conditional_last_modified:
+            if self.get_lookup() is not None and request.headers.get('If-None-Match', '').strip() == '*':
+                # "*" matches any ETag, so it would skip the 404 check.
+                return None, None
+            parts.extend(str(get_generation(model)) for model in self.conditional_models)
+            return self.make_etag(parts), None
+
+        detail = self.get_lookup() is not None
+        latest = None
+        for index, queryset in enumerate(self.get_conditional_querysets()):
+            probe = queryset.aggregate(latest=Max('updated_at'), count=Count('pk'))
+            if detail and index == 0 and not probe['count']:
+                return None, None
+            parts.append(f"{probe['latest'] and probe['latest'].isoformat()}:{probe['count']}")
+            if probe['latest'] and (latest is None or probe['latest'] > latest):
+                latest = probe['latest']
+        return self.make_etag(parts), None if latest is None else int(latest.timestamp())
+
+    def make_etag(self, parts):
+        return 'W/' + quote_etag(hashlib.md5('|'.join(parts).encode()).hexdigest())
+
+    def get(self, request, *args, **kwargs):
+        etag, last_modified = self.get_validators(request)
+        if etag is not None:
+            response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+            if response is not None:
+                response['ETag'] = etag
+                return response
+
+        response = super().get(request, *args, **kwargs)
+        if etag is not None and response.status_code == 200:
+            response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+        return response
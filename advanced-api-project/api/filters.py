@@ -95,6 +95,9 @@ class AuthorFilter(filters.FilterSet):
     def filter_min_books(self, queryset, name, value):
         """
         Custom method to filter authors by minimum book count.
+
+        Uses the maintained ``Author.book_count`` column, so this is an
+        indexed range scan rather than a GROUP BY over all books.
         
         Args:
             queryset: The author queryset
@@ -104,11 +107,13 @@ class AuthorFilter(filters.FilterSet):
         Returns:
             QuerySet: Filtered author queryset
         """
-        return queryset.annotate(book_count=models.Count('books')).filter(book_count__gte=value)
+        return queryset.filter(book_count__gte=value)
     
     def filter_max_books(self, queryset, name, value):
         """
         Custom method to filter authors by maximum book count.
+
+        Uses the maintained ``Author.book_count`` column.
         
         Args:
             queryset: The author queryset
@@ -118,4 +123,4 @@ class AuthorFilter(filters.FilterSet):
         Returns:
             QuerySet: Filtered author queryset
         """
-        return queryset.annotate(book_count=models.Count('books')).filter(book_count__lte=value)
\ No newline at end of file
+        return queryset.filter(book_count__lte=value)
\ No newline at end of file
@@ -0,0 +1,169 @@
+"""
+Benchmark the REST endpoints through the Django test client.
+
+Seeds a catalog inside a transaction that is rolled back afterwards, then
+requests each scenario ``--iterations`` times and reports p50/p95
+latency, queries per request and response size. ``--output`` writes the
+results as JSON so runs can be diffed across commits.
+"""
+
+import json
+import math
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from api.cache import get_cache
+from api.factories import seed_catalog
+from api.models import Author, Book
+
+
+class _Rollback(Exception):
+    pass
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks the api endpoints and reports latency, query counts and payload sizes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=10000, help='Books to seed (default 10000)')
+        parser.add_argument('--authors', type=int, default=None, help='Authors to seed (default books/20)')
+        parser.add_argument('--iterations', type=int, default=30, help='Requests per scenario (default 30)')
+        parser.add_argument('--warmup', type=int, default=3, help='Untimed requests per scenario')
+        parser.add_argument(
+            '--warm-cache', action='store_true',
+            help='Keep the API response cache between requests (default: clear it before each)',
+        )
+        parser.add_argument('--only', nargs='*', help='Run only the named scenarios')
+        parser.add_argument('--output', help='Write results as JSON to this path')
+
+    def scenarios(self):
+        """Return (name, method, url, data) tuples for the seeded catalog."""
+        book = Book.objects.order_by('pk')[Book.objects.count() // 2]
+        author = Author.objects.order_by('-book_count').first()
+        books = reverse('book-list')
+        deep_page = max(1, Book.objects.count() // 10 // 2)
+        return [
+            ('book-list', 'get', books, None),
+            ('book-list-deep-page', 'get', f'{books}?page={deep_page}', None),
+            ('book-list-cursor', 'get', f'{books}?pagination=cursor&ordering=-created_at', None),
+            ('book-filter-year-range', 'get', f'{books}?publication_year_min=1900&publication_year_max=1950', None),
+            ('book-filter-author', 'get', f'{books}?author={author.pk}', None),
+            ('book-search', 'get', f'{books}?q=river', None),
+            ('book-order-title', 'get', f'{books}?ordering=title', None),
+            ('book-order-author', 'get', f'{books}?ordering=author__name', None),
+            ('book-detail', 'get', reverse('book-detail', args=[book.pk]), None),
+            ('author-list', 'get', reverse('author-list'), None),
+            ('author-list-sparse', 'get', f'{reverse("author-list")}?fields=id,name,book_count', None),
+            ('book-list-sparse', 'get', f'{books}?fields=id,title', None),
+            ('author-detail', 'get', reverse('author-detail', args=[author.pk]), None),
+            ('book-create', 'post', reverse('book-create'), {
+                'title': 'Benchmark Book', 'publication_year': 2001, 'author': author.pk,
+            }),
+        ]
+
+    def server_name(self):
+        """Pick a host name ALLOWED_HOSTS accepts for the test client."""
+        for host in settings.ALLOWED_HOSTS:
+            if host != '*' and not host.startswith('.'):
+                return host
+        return 'localhost'
+
+    def run_scenario(self, client, method, url, data, options):
+        timings, queries, sizes, statuses = [], [], [], set()
+        send = getattr(client, method)
+        kwargs = {'data': json.dumps(data), 'content_type': 'application/json'} if data else {}
+        for iteration in range(options['warmup'] + options['iterations']):
+            if not options['warm_cache']:
+                get_cache().clear()
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = send(url, **kwargs)
+                content = b''.join(response.streaming_content) if response.streaming else response.content
+                elapsed = (time.perf_counter() - started) * 1000
+            if iteration < options['warmup']:
+                continue
+            timings.append(elapsed)
+            queries.append(len(captured))
+            sizes.append(len(content))
+            statuses.add(response.status_code)
+        return {
+            'p50_ms': round(percentile(timings, 50), 3),
+            'p95_ms': round(percentile(timings, 95), 3),
+            'mean_ms': round(statistics.fmean(timings), 3),
+            'queries': max(queries),
+            'bytes': round(statistics.fmean(sizes)),
+            'status': sorted(statuses),
+        }
+
+    def handle(self, *args, **options):
+        results = []
+        try:
+            with transaction.atomic():
+                self.stdout.write(f'Seeding {options["books"]} books ...')
+                authors, books = seed_catalog(options['books'], options['authors'])
+                user = get_user_model().objects.create_user('bench', password='bench')
+                client = Client(SERVER_NAME=self.server_name())
+                client.force_login(user)
+
+                header = f'{"scenario":<24}{"p50 ms":>10}{"p95 ms":>10}{"queries":>9}{"bytes":>10}  status'
+                self.stdout.write(header)
+                for name, method, url, data in self.scenarios():
+                    if options['only'] and name not in options['only']:
+                        continue
+                    result = self.run_scenario(client, method, url, data, options)
+                    results.append({'name': name, 'method': method.upper(), 'url': url, **result})
+                    self.stdout.write(
+                        f'{name:<24}{result["p50_ms"]:>10.2f}{result["p95_ms"]:>10.2f}'
+                        f'{result["queries"]:>9}{result["bytes"]:>10}  {result["status"]}'
+                    )
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        report = {
+            'meta': {
+                'commit': current_commit(),
+                'timestamp': datetime.now(timezone.utc).isoformat(),
+                'books': books,
+                'authors': authors,
+                'iterations': options['iterations'],
+                'warm_cache': options['warm_cache'],
+                'database': connection.vendor,
+                'python': platform.python_version(),
+                'django': django.get_version(),
+            },
+            'results': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                json.dump(report, handle, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Wrote {options["output"]}'))
@@ -0,0 +1,259 @@
+"""
+Compare concurrent read throughput of the WSGI and ASGI paths.
+
+Requests are driven straight through Django's real handlers, in process:
+
+- wsgi:       ``get_wsgi_application()`` called from a pool of
+              ``--threads`` threads, like a threaded WSGI server
+              (gunicorn ``--threads``, mod_wsgi), by ``--concurrency``
+              clients.
+- asgi+sync:  ``get_asgi_application()`` serving the sync DRF view.
+- asgi+async: ``get_asgi_application()`` serving the async view from
+              api/async_views.py.
+
+Every query sleeps for ``--latency`` ms first, standing in for a database
+on the network; that wait is what a WSGI thread sits idle through and an
+async view yields. Each request carries a unique ``nonce`` parameter so
+the response cache never answers it.
+
+The catalog is seeded with committed rows, because the handlers' threads
+use their own connections and would not see an open transaction, and is
+deleted again afterwards. Run it against a development database.
+
+For numbers including the server's own overhead, serve the project with
+``uvicorn advanced_api_project.asgi:application --workers 1`` and with a
+WSGI server of the same worker count, and point a load generator (wrk,
+hey, locust) at ``/api/books/`` and ``/api/async/books/``.
+"""
+
+import asyncio
+import io
+import json
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode
+from wsgiref.util import setup_testing_defaults
+
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from api.factories import seed_catalog
+from api.models import Author, Book
+
+from .bench import percentile
+
+HOST = 'localhost'
+
+
+class WSGIDriver:
+    """
+    Call the WSGI application from a fixed pool of server threads.
+
+    Each of the ``concurrency`` clients waits for a free server thread, so
+    its timings include the queueing a real threaded server would add.
+    """
+
+    def __init__(self, threads):
+        self.application = get_wsgi_application()
+        self.threads = threads
+
+    def handle(self, path, query):
+        environ = {
+            'REQUEST_METHOD': 'GET',
+            'PATH_INFO': path,
+            'QUERY_STRING': query,
+            'HTTP_HOST': HOST,
+            'SERVER_NAME': HOST,
+            'wsgi.input': io.BytesIO(),
+        }
+        setup_testing_defaults(environ)
+        statuses = []
+        response = self.application(environ, lambda status, headers: statuses.append(status))
+        try:
+            b''.join(response)
+        finally:
+            # Sends request_finished, which closes the thread's connection.
+            response.close()
+        return int(statuses[0].split()[0])
+
+    def run(self, requests, concurrency):
+        with ThreadPoolExecutor(max_workers=self.threads) as server, \
+                ThreadPoolExecutor(max_workers=concurrency) as clients:
+            def request(args):
+                started = time.perf_counter()
+                status = server.submit(self.handle, *args).result()
+                return status, time.perf_counter() - started
+
+            return list(clients.map(request, requests))
+
+
+class ASGIDriver:
+    """Run requests through the ASGI application on one event loop."""
+
+    def __init__(self):
+        self.application = get_asgi_application()
+
+    async def request(self, path, query):
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': 'GET',
+            'scheme': 'http',
+            'path': path,
+            'raw_path': path.encode(),
+            'query_string': query.encode(),
+            'root_path': '',
+            'headers': [(b'host', HOST.encode())],
+            'client': ('127.0.0.1', 50000),
+            'server': (HOST, 80),
+        }
+        received = False
+        disconnected = asyncio.Event()
+
+        async def receive():
+            nonlocal received
+            if not received:
+                received = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            # Django listens for a disconnect while the view runs; the
+            # client stays connected until the response is complete.
+            await disconnected.wait()
+            return {'type': 'http.disconnect'}
+
+        status = None
+
+        async def send(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+
+        started = time.perf_counter()
+        await self.application(scope, receive, send)
+        disconnected.set()
+        return status, time.perf_counter() - started
+
+    def run(self, requests, concurrency):
+        async def run_all():
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def bounded(path, query):
+                async with semaphore:
+                    return await self.request(path, query)
+
+            return await asyncio.gather(*(bounded(path, query) for path, query in requests))
+
+        return asyncio.run(run_all())
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks concurrent reads through WSGI, ASGI with sync views and ASGI with async views'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=2000, help='Books to seed (default 2000)')
+        parser.add_argument('--latency', type=float, default=5.0,
+                            help='Simulated latency per query, in ms (default 5)')
+        parser.add_argument('--threads', type=int, default=8,
+                            help='WSGI worker threads (default 8)')
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 10, 50])
+        parser.add_argument('--requests', type=int, default=200,
+                            help='Requests per run (default 200)')
+        parser.add_argument('--output', help='Write results as JSON to this path')
+
+    def scenarios(self):
+        """Return (name, sync url, async url) tuples for the seeded catalog."""
+        book = Book.objects.order_by('-pk').first()
+        return [
+            ('book-list', reverse('book-list'), reverse('async-book-list')),
+            ('book-search', f'{reverse("book-list")}?q=river', f'{reverse("async-book-list")}?q=river'),
+            ('book-detail', reverse('book-detail', args=[book.pk]),
+             reverse('async-book-detail', args=[book.pk])),
+            ('author-list', reverse('author-list'), reverse('async-author-list')),
+        ]
+
+    def add_latency(self, seconds):
+        def delay(execute, sql, params, many, context):
+            time.sleep(seconds)
+            return execute(sql, params, many, context)
+
+        def receiver(connection, **kwargs):
+            connection.execute_wrappers.append(delay)
+
+        return receiver
+
+    def requests(self, url, count):
+        path, _, query = url.partition('?')
+        return [
+            (path, '&'.join(filter(None, [query, urlencode({'nonce': uuid.uuid4().hex})])))
+            for _ in range(count)
+        ]
+
+    def measure(self, driver, url, concurrency, count):
+        started = time.perf_counter()
+        outcomes = driver.run(self.requests(url, count), concurrency)
+        elapsed = time.perf_counter() - started
+        statuses = sorted({status for status, _ in outcomes})
+        if statuses != [200]:
+            raise CommandError(f'{url} answered {statuses}')
+        timings = [seconds * 1000 for _, seconds in outcomes]
+        return {
+            'requests_per_sec': round(count / elapsed, 1),
+            'p50_ms': round(percentile(timings, 50), 2),
+            'p95_ms': round(percentile(timings, 95), 2),
+            'mean_ms': round(statistics.fmean(timings), 2),
+        }
+
+    def handle(self, *args, **options):
+        last_author = Author.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+        self.stdout.write(f'Seeding {options["books"]} books ...')
+        with transaction.atomic():
+            seed_catalog(options['books'])
+        receiver = self.add_latency(options['latency'] / 1000)
+        results = []
+        try:
+            with override_settings(DEBUG=False, ALLOWED_HOSTS=[HOST]):
+                drivers = [
+                    ('wsgi', WSGIDriver(options['threads']), 0),
+                    ('asgi+sync', ASGIDriver(), 0),
+                    ('asgi+async', ASGIDriver(), 1),
+                ]
+                scenarios = self.scenarios()
+                connection_created.connect(receiver)
+                self.stdout.write(
+                    f'{"scenario":<22}{"path":<12}{"conc":>5}{"req/s":>10}{"p50 ms":>10}{"p95 ms":>10}'
+                )
+                for name, *urls in scenarios:
+                    for concurrency in options['concurrency']:
+                        for path, driver, url_index in drivers:
+                            result = self.measure(
+                                driver, urls[url_index], concurrency, options['requests'],
+                            )
+                            results.append({
+                                'scenario': name, 'path': path, 'concurrency': concurrency, **result,
+                            })
+                            self.stdout.write(
+                                f'{name:<22}{path:<12}{concurrency:>5}{result["requests_per_sec"]:>10.1f}'
+                                f'{result["p50_ms"]:>10.2f}{result["p95_ms"]:>10.2f}'
+                            )
+        finally:
+            connection_created.disconnect(receiver)
+            with transaction.atomic():
+                Author.objects.filter(pk__gt=last_author).delete()
+
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                json.dump({
+                    'books': options['books'],
+                    'latency_ms': options['latency'],
+                    'wsgi_threads': options['threads'],
+                    'requests': options['requests'],
+                    'results': results,
+                }, handle, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Wrote {options["output"]}'))
@@ -0,0 +1,85 @@
+"""
+Compare the search backend with DRF's icontains SearchFilter.
+
+Seeds a catalog inside a transaction that is rolled back afterwards and
+times, for a handful of queries, the COUNT plus first page that
+BookListView would run under each approach.
+"""
+
+import statistics
+import time
+from functools import reduce
+from operator import and_, or_
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+
+from api.factories import seed_catalog
+from api.models import Book
+from api.search import get_search_backend, tokenize
+
+# What SearchFilter made of the former search_fields ('title',
+# 'title__icontains', 'author__name', 'author__name__icontains').
+LEGACY_LOOKUPS = ['title__icontains', 'author__name__icontains']
+QUERIES = ['river', 'shadow empire', 'ada', 'lantern 99', 'kingdom night']
+
+
+class _Rollback(Exception):
+    pass
+
+
+def legacy_search(queryset, query):
+    """Reproduce SearchFilter over BookListView's former search_fields."""
+    conditions = []
+    for term in tokenize(query):
+        conditions.append(reduce(or_, (Q(**{lookup: term}) for lookup in LEGACY_LOOKUPS)))
+    return queryset.filter(reduce(and_, conditions)).distinct()
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks the Book search backend against the icontains SearchFilter'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=100000, help='Books to seed (default 100000)')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per query')
+        parser.add_argument('--page-size', type=int, default=10)
+
+    def time_query(self, build, repeat, page_size):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            queryset = build()
+            count = queryset.count()
+            list(queryset[:page_size])
+            timings.append((time.perf_counter() - started) * 1000)
+        return count, statistics.median(timings)
+
+    def handle(self, *args, **options):
+        backend = get_search_backend()
+        self.stdout.write(f'Seeding {options["books"]} books ({connection.vendor}) ...')
+        try:
+            with transaction.atomic():
+                seed_catalog(options['books'])
+                self.stdout.write(
+                    f'{"query":<16}{"legacy ms":>12}{"backend ms":>12}{"speedup":>10}{"rows":>10}'
+                )
+                for query in QUERIES:
+                    terms = tokenize(query)
+                    legacy_count, legacy_ms = self.time_query(
+                        lambda: legacy_search(Book.objects.all(), query),
+                        options['repeat'], options['page_size'],
+                    )
+                    count, backend_ms = self.time_query(
+                        lambda: backend.search(Book.objects.all(), terms, rank=True).order_by('-search_rank', 'pk')
+                        if backend.ranked else backend.search(Book.objects.all(), terms),
+                        options['repeat'], options['page_size'],
+                    )
+                    self.stdout.write(
+                        f'{query:<16}{legacy_ms:>12.1f}{backend_ms:>12.1f}'
+                        f'{legacy_ms / backend_ms:>9.1f}x{count:>10}'
+                    )
+                raise _Rollback
+        except _Rollback:
+            pass
+        self.stdout.write(self.style.SUCCESS(f'Backend: {type(backend).__name__}'))
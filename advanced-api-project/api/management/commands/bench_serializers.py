@@ -0,0 +1,117 @@
+"""
+Compare the ModelSerializer read path with the values() fast path.
+
+Seeds a catalog inside a transaction that is rolled back afterwards, then
+for each page size fetches, serializes and renders a page of books and of
+authors (with their nested books) through:
+
+- drf:         BookSerializer / AuthorSerializer + JSONRenderer
+- fast:        FastBookSerializer / FastAuthorSerializer + JSONRenderer
+- fast+orjson: the fast serializers + ORJSONRenderer
+
+and reports rows per second (best of ``--iterations``) and the speedup over
+``drf``. Every path's bytes are checked against ``drf`` first.
+"""
+
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+from drf_orjson.renderers import ORJSONRenderer
+
+from api.factories import seed_catalog
+from api.fastpath import FastAuthorSerializer, FastBookSerializer
+from api.models import Author, Book
+from api.serializers import AuthorSerializer, BookSerializer
+from api.views import author_with_books_queryset
+
+
+class _Rollback(Exception):
+    pass
+
+
+def drf_path(serializer_class, queryset, renderer):
+    return lambda n: renderer.render(serializer_class(queryset[:n], many=True).data)
+
+
+def fast_path(serializer_class, queryset, renderer):
+    def run(n):
+        serializer = serializer_class()
+        return renderer.render(serializer.serialize(serializer.get_rows(queryset)[:n]))
+    return run
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks ModelSerializer against the values() fast path at several page sizes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=20000, help='Books to seed (default 20000)')
+        parser.add_argument('--page-sizes', type=int, nargs='+', default=[10, 100, 1000])
+        parser.add_argument('--iterations', type=int, default=20, help='Timed runs per case (default 20)')
+        parser.add_argument('--output', help='Write results as JSON to this path')
+
+    def cases(self):
+        books = Book.objects.order_by('pk')
+        authors = author_with_books_queryset().order_by('pk')
+        json_renderer, orjson_renderer = JSONRenderer(), ORJSONRenderer()
+        return {
+            'book': [
+                ('drf', drf_path(BookSerializer, books, json_renderer)),
+                ('fast', fast_path(FastBookSerializer, books, json_renderer)),
+                ('fast+orjson', fast_path(FastBookSerializer, books, orjson_renderer)),
+            ],
+            'author': [
+                ('drf', drf_path(AuthorSerializer, authors, json_renderer)),
+                ('fast', fast_path(FastAuthorSerializer, authors, json_renderer)),
+                ('fast+orjson', fast_path(FastAuthorSerializer, authors, orjson_renderer)),
+            ],
+        }
+
+    def time_case(self, run, n, iterations):
+        best = None
+        for _ in range(iterations):
+            started = time.perf_counter()
+            run(n)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    def handle(self, *args, **options):
+        results = []
+        try:
+            with transaction.atomic():
+                self.stdout.write(f'Seeding {options["books"]} books ...')
+                seed_catalog(options['books'])
+                author_total = Author.objects.count()
+                self.stdout.write(f'{"model":<8}{"page":>6}  {"path":<13}{"rows/s":>12}{"speedup":>9}')
+                for model, paths in self.cases().items():
+                    for n in options['page_sizes']:
+                        reference = paths[0][1](n)
+                        rows = len(json.loads(reference))
+                        if model == 'author' and n > author_total:
+                            self.stdout.write(f'{model:<8}{n:>6}  only {author_total} authors seeded')
+                        baseline = None
+                        for name, run in paths:
+                            if run(n) != reference:
+                                raise CommandError(f'{model} {name} output differs from drf at page size {n}')
+                            seconds = self.time_case(run, n, options['iterations'])
+                            rate = rows / seconds
+                            baseline = baseline or rate
+                            results.append({
+                                'model': model, 'page_size': n, 'path': name, 'rows': rows,
+                                'best_ms': round(seconds * 1000, 3),
+                                'rows_per_sec': round(rate), 'speedup': round(rate / baseline, 2),
+                            })
+                            self.stdout.write(
+                                f'{model:<8}{n:>6}  {name:<13}{rate:>12,.0f}{rate / baseline:>8.2f}x'
+                            )
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        if options['output']:
+            with open(options['output'], 'w') as handle:
+                json.dump({'books': options['books'], 'results': results}, handle, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Wrote {options["output"]}'))
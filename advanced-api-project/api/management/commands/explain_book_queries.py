@@ -0,0 +1,119 @@
+"""
+Check that every BookListView filter/ordering combination is served by an index.
+
+Seeds a catalog inside a transaction that is rolled back afterwards,
+refreshes planner statistics, then runs EXPLAIN on the first page query
+for each combination of filter and ordering BookListView accepts. The
+querysets are built by the view's own filter backends, so the plans are
+the ones the endpoint runs.
+"""
+
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory
+
+from api.factories import seed_catalog
+from api.models import Author, Book
+from api.views import BookListView
+
+# Patterns identifying a full table scan in each backend's plan output. A
+# SQLite "SCAN ... VIRTUAL TABLE" is the FTS5 index answering ?q=.
+FULL_SCAN_PATTERNS = {
+    'sqlite': re.compile(r'\bSCAN (\w+)(?! USING| VIRTUAL TABLE)(?:\s|$)'),
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+}
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Runs EXPLAIN for each BookListView filter/ordering combination and fails on full table scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--books', type=int, default=20000, help='Books to seed (default 20000)')
+        parser.add_argument('--authors', type=int, default=None, help='Authors to seed (default books/20)')
+        parser.add_argument('--page-size', type=int, default=10, help='LIMIT applied to each query')
+        parser.add_argument(
+            '--strict', action='store_true',
+            help='Also fail on scans caused by ?q= search, which no B-tree index serves',
+        )
+        parser.add_argument('--verbose-plans', action='store_true', help='Print every plan')
+
+    def combinations(self):
+        """Yield (label, query params, ordering, search used)."""
+        author_name = Author.objects.values_list('name', flat=True).first()
+        filters = [
+            ('none', {}, False),
+            ('publication_year', {'publication_year': 1990}, False),
+            ('author__name', {'author__name': author_name}, False),
+            ('search', {'q': 'River'}, True),
+        ]
+        orderings = [None]
+        for field in BookListView.ordering_fields:
+            orderings += [field, f'-{field}']
+        for filter_label, params, search in filters:
+            for ordering in orderings:
+                if not params and ordering is None:
+                    # An unfiltered, unordered page stops after LIMIT rows.
+                    continue
+                yield f'{filter_label} / {ordering or "unordered"}', params, ordering, search
+
+    def handle(self, *args, **options):
+        pattern = FULL_SCAN_PATTERNS.get(connection.vendor)
+        if pattern is None:
+            raise CommandError(f'No plan parser for database vendor {connection.vendor!r}')
+
+        failures, warnings, total = [], [], 0
+        try:
+            with transaction.atomic():
+                seed_catalog(options['books'], options['authors'])
+                self.analyze()
+                for label, params, ordering, search in self.combinations():
+                    total += 1
+                    if ordering:
+                        params = {**params, 'ordering': ordering}
+                    queryset = self.list_queryset(params)
+                    plan = queryset[:options['page_size']].explain()
+                    scanned = sorted({
+                        table for match in pattern.finditer(plan)
+                        for table in match.groups() if table
+                    })
+                    if options['verbose_plans']:
+                        self.stdout.write(f'{label}:\n{plan}\n')
+                    if not scanned:
+                        continue
+                    message = f'{label}: full scan of {", ".join(scanned)}'
+                    if search and not options['strict']:
+                        warnings.append(message)
+                    else:
+                        failures.append((message, plan))
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        for message in warnings:
+            self.stdout.write(self.style.WARNING(f'  ~ {message} (search filter, not indexable)'))
+        for message, plan in failures:
+            self.stdout.write(self.style.ERROR(f'  - {message}'))
+            self.stdout.write(plan)
+        if failures:
+            raise CommandError(f'{len(failures)} of {total} query plans fall back to a full table scan.')
+        self.stdout.write(self.style.SUCCESS(f'All {total} query plans use an index.'))
+
+    def list_queryset(self, params):
+        """Return BookListView's filtered queryset for a GET with ``params``."""
+        view = BookListView()
+        request = RequestFactory().get('/', params)
+        view.setup(request)
+        view.request = view.initialize_request(request)
+        return view.filter_queryset(view.get_queryset())
+
+    def analyze(self):
+        """Refresh planner statistics for the freshly seeded tables."""
+        with connection.cursor() as cursor:
+            for table in (Author._meta.db_table, Book._meta.db_table):
+                cursor.execute(f'ANALYZE {connection.ops.quote_name(table)}')
@@ -0,0 +1,63 @@
+"""
+Repair drift in the denormalized Author.book_count column.
+
+Writes that bypass model signals (raw SQL, QuerySet.update() on
+Book.author, bulk_create outside api/bulk.py) can leave the counter
+wrong. This walks authors in primary key order, one batch at a time,
+and rewrites only the counts that differ from the books table, then
+invalidates the cached Author responses and ETags if any changed.
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from api.cache import bump_generation
+from api.models import Author, Book
+
+
+class Command(BaseCommand):
+    help = 'Recomputes Author.book_count in batches and fixes any drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Authors per batch (default 1000)')
+        parser.add_argument('--dry-run', action='store_true', help='Report drift without writing')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        checked = fixed = 0
+        last_pk = 0
+        while True:
+            # Lock the batch so concurrent F() increments are not lost
+            # between reading the real counts and writing them back.
+            with transaction.atomic():
+                authors = list(
+                    Author.objects.select_for_update()
+                    .filter(pk__gt=last_pk)
+                    .order_by('pk')
+                    .only('pk', 'book_count')[:batch_size]
+                )
+                if not authors:
+                    break
+                last_pk = authors[-1].pk
+                actual = dict(
+                    Book.objects.filter(author_id__in=[author.pk for author in authors])
+                    .values('author_id')
+                    .annotate(total=Count('pk'))
+                    .values_list('author_id', 'total')
+                )
+                drifted = []
+                for author in authors:
+                    count = actual.get(author.pk, 0)
+                    if author.book_count != count:
+                        author.book_count = count
+                        drifted.append(author)
+                checked += len(authors)
+                fixed += len(drifted)
+                if drifted and not options['dry_run']:
+                    Author.objects.bulk_update(drifted, ['book_count'])
+                    # bulk_update sends no post_save for the response cache.
+                    transaction.on_commit(lambda: bump_generation(Author))
+
+        verb = 'would fix' if options['dry_run'] else 'fixed'
+        self.stdout.write(self.style.SUCCESS(f'Checked {checked} authors, {verb} {fixed}.'))
@@ -0,0 +1,132 @@
+# Search document column plus the vendor-specific full-text indexes that
+# api/search.py queries.
+#
+# On SQLite the FTS5 index is an external-content table over
+# api_book.search_document, kept in sync by triggers so that bulk_create,
+# bulk_update and raw deletes are covered too. A later migration that makes
+# Django rebuild the api_book table (SQLite ALTER emulation) drops these
+# triggers and must recreate them with create_sqlite_fts().
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Concat
+
+import api.models
+
+SQLITE_FTS = [
+    "CREATE VIRTUAL TABLE api_book_search USING fts5("
+    "search_document, content='api_book', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER api_book_search_ai AFTER INSERT ON api_book BEGIN "
+    "INSERT INTO api_book_search(rowid, search_document) VALUES (new.id, new.search_document); "
+    "END",
+    "CREATE TRIGGER api_book_search_ad AFTER DELETE ON api_book BEGIN "
+    "INSERT INTO api_book_search(api_book_search, rowid, search_document) "
+    "VALUES ('delete', old.id, old.search_document); "
+    "END",
+    "CREATE TRIGGER api_book_search_au AFTER UPDATE OF search_document ON api_book BEGIN "
+    "INSERT INTO api_book_search(api_book_search, rowid, search_document) "
+    "VALUES ('delete', old.id, old.search_document); "
+    "INSERT INTO api_book_search(rowid, search_document) VALUES (new.id, new.search_document); "
+    "END",
+    "INSERT INTO api_book_search(api_book_search) VALUES ('rebuild')",
+]
+SQLITE_FTS_DROP = [
+    "DROP TRIGGER IF EXISTS api_book_search_ai",
+    "DROP TRIGGER IF EXISTS api_book_search_ad",
+    "DROP TRIGGER IF EXISTS api_book_search_au",
+    "DROP TABLE IF EXISTS api_book_search",
+]
+POSTGRES_FTS = [
+    "CREATE INDEX api_book_search_tsv_idx ON api_book "
+    "USING GIN (to_tsvector('simple', search_document))",
+]
+POSTGRES_FTS_DROP = [
+    "DROP INDEX IF EXISTS api_book_search_tsv_idx",
+    "DROP INDEX IF EXISTS api_book_search_trgm_idx",
+]
+# Serves ContainsSearchBackend's UPPER(search_document) LIKE UPPER('%q%').
+POSTGRES_TRIGRAM = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX api_book_search_trgm_idx ON api_book "
+    "USING GIN (UPPER(search_document) gin_trgm_ops)",
+]
+
+
+def backfill_search_documents(apps, schema_editor):
+    Author = apps.get_model("api", "Author")
+    Book = apps.get_model("api", "Book")
+    author_name = Author.objects.filter(pk=OuterRef("author_id")).values("name")[:1]
+    Book.objects.using(schema_editor.connection.alias).update(
+        search_document=Concat("title", Value(" "), Subquery(author_name))
+    )
+
+
+def create_sqlite_fts(schema_editor):
+    for statement in SQLITE_FTS:
+        schema_editor.execute(statement)
+
+
+def create_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        create_sqlite_fts(schema_editor)
+    elif vendor == "postgresql":
+        for statement in POSTGRES_FTS:
+            schema_editor.execute(statement)
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+            trigram_available = cursor.fetchone() is not None
+        if trigram_available:
+            for statement in POSTGRES_TRIGRAM:
+                schema_editor.execute(statement)
+
+
+def drop_search_indexes(apps, schema_editor):
+    statements = {
+        "sqlite": SQLITE_FTS_DROP,
+        "postgresql": POSTGRES_FTS_DROP,
+    }.get(schema_editor.connection.vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0003_book_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="book",
+            name="search_document",
+            field=models.TextField(blank=True, default="", editable=False),
+        ),
+        migrations.RunPython(backfill_search_documents, migrations.RunPython.noop),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+        migrations.CreateModel(
+            name="BookSearchIndex",
+            fields=[
+                (
+                    "book",
+                    models.OneToOneField(
+                        db_column="rowid",
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        primary_key=True,
+                        related_name="search_index",
+                        serialize=False,
+                        to="api.book",
+                    ),
+                ),
+                ("search_document", api.models.FullTextField()),
+                ("rank", models.FloatField()),
+            ],
+            options={
+                "db_table": "api_book_search",
+                "managed": False,
+            },
+        ),
+    ]
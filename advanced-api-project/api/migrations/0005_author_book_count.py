@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:52
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_book_counts(apps, schema_editor):
+    Author = apps.get_model("api", "Author")
+    Book = apps.get_model("api", "Book")
+    counts = (
+        Book.objects.filter(author_id=OuterRef("pk"))
+        .order_by()
+        .values("author_id")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    Author.objects.using(schema_editor.connection.alias).update(
+        book_count=Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("api", "0004_book_search_document"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="author",
+            name="book_count",
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_book_counts, migrations.RunPython.noop),
+    ]
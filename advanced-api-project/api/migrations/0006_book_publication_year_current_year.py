@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:19
+
+import api.validators
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_author_book_count'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='book',
+            name='publication_year',
+            field=models.IntegerField(help_text='Enter the year the book was published', validators=[django.core.validators.MinValueValidator(1450), django.core.validators.MaxValueValidator(api.validators.current_year)]),
+        ),
+    ]
@@ -1,11 +1,54 @@
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.utils import timezone
+from django.db.models.functions import Greatest
+from .validators import current_year
 
 class Author(models.Model):
     name = models.CharField(max_length=100, help_text="Enter the author's name")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Denormalized number of books; maintained by api/signals.py and the
+    # bulk paths, repaired by the recount_authors command.
+    book_count = models.PositiveIntegerField(default=0, editable=False, db_index=True)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination of books ordered by author__name joins here.
+            models.Index(fields=['name', 'id'], name='author_name_id_idx'),
+        ]
+
+    @classmethod
+    def adjust_book_counts(cls, deltas):
+        """
+        Apply per-author book count changes with F-expressions.
+
+        Args:
+            deltas (dict): Mapping of author pk to the change in book count.
+                Authors sharing a delta are updated together, in chunks.
+        """
+        by_delta = {}
+        for author_id, delta in deltas.items():
+            if delta:
+                by_delta.setdefault(delta, []).append(author_id)
+        for delta, author_ids in by_delta.items():
+            count = models.F('book_count') + delta
+            if delta < 0:
+                # Never fail a delete on a counter that has already drifted.
+                count = Greatest(count, 0)
+            for start in range(0, len(author_ids), 500):
+                cls.objects.filter(pk__in=author_ids[start:start + 500]).update(book_count=count)
+
+    def save(self, *args, **kwargs):
+        """
+        Save the author without writing ``book_count`` back on updates, so a
+        stale in-memory value cannot overwrite concurrent F() increments.
+        """
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'book_count'
+            ]
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return self.name
@@ -20,15 +63,77 @@ class Book(models.Model):
         author (ForeignKey): Reference to the Author who wrote the book.
         created_at (DateTimeField): Timestamp when the book record was created.
         updated_at (DateTimeField): Timestamp when the book record was last updated.
+        search_document (TextField): Denormalized "title author name" text
+            indexed by the search backends in api/search.py.
     """
     title = models.CharField(max_length=200,help_text="Enter the book title")
     publication_year = models.IntegerField(
-        validators=[MinValueValidator(1450), MaxValueValidator(timezone.now().year)],
+        validators=[MinValueValidator(1450), MaxValueValidator(current_year)],
         help_text="Enter the year the book was published"
     )
     author = models.ForeignKey(Author, on_delete=models.CASCADE, related_name='books')
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    search_document = models.TextField(blank=True, default='', editable=False)
+
+    class Meta:
+        indexes = [
+            # (ordering key, id) pairs used by KeysetPagination on BookListView.
+            models.Index(fields=['created_at', 'id'], name='book_created_id_idx'),
+            models.Index(fields=['updated_at', 'id'], name='book_updated_id_idx'),
+            models.Index(fields=['title', 'id'], name='book_title_id_idx'),
+            models.Index(fields=['publication_year', 'id'], name='book_pubyear_id_idx'),
+            # BookFilter's author filter combined with BookListView orderings.
+            models.Index(fields=['author', 'publication_year'], name='book_author_pubyear_idx'),
+            models.Index(fields=['author', 'title'], name='book_author_title_idx'),
+            models.Index(fields=['author', 'created_at'], name='book_author_created_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored author so a reassignment can move the count.
+        instance._loaded_author_id = instance.__dict__.get('author_id')
+        return instance
+
+    @staticmethod
+    def build_search_document(title, author_name):
+        """Return the text the search backends index for a book."""
+        return f"{title} {author_name}"
 
     def __str__(self):
-        return f"{self.title} by {self.author.name} "
\ No newline at end of file
+        return f"{self.title} by {self.author.name} "
+
+class FullTextField(models.TextField):
+    """Text column of a SQLite FTS5 table; supports the ``match`` lookup."""
+
+
+@FullTextField.register_lookup
+class Match(models.Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", [*lhs_params, *rhs_params]
+
+
+class BookSearchIndex(models.Model):
+    """
+    Read-only view of the SQLite FTS5 index over Book.search_document.
+
+    The table is created and kept in sync by migration 0004 (an
+    external-content FTS5 table plus triggers), so Django never writes to
+    it. Joining through ``Book.search_index`` lets a search filter on
+    MATCH and order by the bm25 ``rank`` in a single query.
+    """
+    book = models.OneToOneField(
+        Book, on_delete=models.DO_NOTHING, primary_key=True, db_column='rowid',
+        db_constraint=False, related_name='search_index',
+    )
+    search_document = FullTextField()
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'api_book_search'
@@ -0,0 +1,222 @@
+"""
+Custom pagination classes for the API application.
+
+KeysetPagination pages through a queryset by remembering the ordering key
+values of the last row served instead of an OFFSET, and never runs a
+COUNT query, so every page costs the same no matter how deep it is.
+"""
+
+import base64
+import binascii
+import json
+from collections import namedtuple
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+Key = namedtuple('Key', ['lookup', 'descending', 'field'])
+
+
+def _resolve_field(model, lookup):
+    """Return the model field a ``__``-separated lookup points at."""
+    field = None
+    for part in lookup.split('__'):
+        field = model._meta.pk if part == 'pk' else model._meta.get_field(part)
+        if field.is_relation:
+            model = field.related_model
+    if field.is_relation:
+        field = field.target_field
+    return field
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over the queryset's current ordering plus a primary
+    key tiebreak.
+
+    The ordering is whatever OrderingFilter applied (``default_ordering``
+    when none), so every entry in a view's ``ordering_fields`` works. The
+    cursor is an opaque token holding the key values of the boundary row
+    and the ordering it was issued for.
+    """
+
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = 'cursor'
+    mode_query_param = 'pagination'
+    mode_value = 'cursor'
+    default_ordering = ('-created_at',)
+    tiebreak = 'id'
+    invalid_cursor_message = 'Invalid cursor'
+
+    @classmethod
+    def requested(cls, request):
+        """Return True when the request opts in to keyset pagination."""
+        params = request.query_params
+        return cls.cursor_query_param in params or params.get(cls.mode_query_param) == cls.mode_value
+
+    def get_keys(self, queryset):
+        """
+        Build the list of ordering keys, ending with the tiebreak.
+
+        The tiebreak follows the direction of the last ordering key so a
+        composite ``(key, id)`` index can serve both directions.
+        """
+        ordering = [
+            term for term in queryset.query.order_by if isinstance(term, str)
+        ] or list(self.default_ordering)
+        try:
+            keys = self._build_keys(queryset.model, ordering)
+        except FieldDoesNotExist:
+            # Orderings on annotations (e.g. search relevance) have no
+            # stable column to seek on.
+            keys = self._build_keys(queryset.model, self.default_ordering)
+        descending = keys[-1].descending if keys else False
+        keys.append(Key(self.tiebreak, descending, _resolve_field(queryset.model, self.tiebreak)))
+        return keys
+
+    def _build_keys(self, model, ordering):
+        keys = []
+        for term in ordering:
+            lookup = term.lstrip('-')
+            if lookup in ('pk', self.tiebreak):
+                break
+            keys.append(Key(lookup, term.startswith('-'), _resolve_field(model, lookup)))
+        return keys
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.keys = self.get_keys(queryset)
+        position, reverse = self.decode_cursor(request)
+
+        if position is not None:
+            queryset = queryset.filter(self._after(position, reverse))
+        queryset = queryset.annotate(
+            **{f'keyset_{i}': F(key.lookup) for i, key in enumerate(self.keys)}
+        ).order_by(*[
+            ('-' if key.descending != reverse else '') + key.lookup for key in self.keys
+        ])
+
+        rows = list(queryset[:self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[:self.page_size]
+        if reverse:
+            rows.reverse()
+
+        if reverse:
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        self.first = self._position(rows[0]) if rows else None
+        self.last = self._position(rows[-1]) if rows else None
+        return rows
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next or self.last is None:
+            return None
+        return self.encode_cursor(self.last, reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or self.first is None:
+            return None
+        return self.encode_cursor(self.first, reverse=True)
+
+    def _position(self, row):
+        # Rows are model instances, or dicts on the values() fast path.
+        if isinstance(row, dict):
+            return [row[f'keyset_{i}'] for i in range(len(self.keys))]
+        return [getattr(row, f'keyset_{i}') for i in range(len(self.keys))]
+
+    def _after(self, position, reverse):
+        """
+        Return the lexicographic "comes after position" condition:
+        (k1 > v1) OR (k1 = v1 AND k2 > v2) OR ...
+        """
+        condition = Q()
+        equal = Q()
+        for key, value in zip(self.keys, position):
+            operator = 'lt' if key.descending != reverse else 'gt'
+            condition |= equal & Q(**{f'{key.lookup}__{operator}': value})
+            equal &= Q(**{key.lookup: value})
+        return condition
+
+    def _signature(self):
+        return [('-' if key.descending else '') + key.lookup for key in self.keys]
+
+    def encode_cursor(self, position, reverse):
+        payload = {
+            'o': self._signature(),
+            'v': [
+                value.isoformat() if hasattr(value, 'isoformat') else value
+                for value in position
+            ],
+            'r': int(reverse),
+        }
+        token = base64.urlsafe_b64encode(
+            json.dumps(payload, separators=(',', ':')).encode()
+        ).decode()
+        url = remove_query_param(self.base_url, 'page')
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        """
+        Return ``(position, reverse)`` from the request cursor, or
+        ``(None, False)`` for the first page.
+        """
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode()))
+            if payload['o'] != self._signature() or len(payload['v']) != len(self.keys):
+                raise ValueError
+            position = [
+                key.field.to_python(value) for key, value in zip(self.keys, payload['v'])
+            ]
+            return position, bool(payload.get('r'))
+        except (KeyError, TypeError, ValueError, binascii.Error, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+
+class KeysetPaginationMixin:
+    """
+    Let a list view switch to ``keyset_pagination_class`` per request
+    (``?pagination=cursor`` or any ``?cursor=``) while keeping
+    ``pagination_class`` as the default.
+    """
+
+    keyset_pagination_class = KeysetPagination
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            if self.keyset_pagination_class.requested(self.request):
+                self._paginator = self.keyset_pagination_class()
+            elif self.pagination_class is None:
+                self._paginator = None
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
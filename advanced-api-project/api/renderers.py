@@ -0,0 +1,95 @@
+"""
+Custom renderers for the API application.
+
+The export renderers turn an iterable of row tuples into a stream of
+encoded chunks, so large result sets can be sent with StreamingHttpResponse
+without building the whole body in memory. ``render`` is kept for the
+regular DRF response path (e.g. error payloads).
+"""
+
+import csv
+import datetime
+import json
+
+from rest_framework import renderers
+
+
+def _encode_value(value):
+    """Encode a database value the way BookSerializer would."""
+    if isinstance(value, datetime.datetime):
+        value = value.isoformat()
+        if value.endswith('+00:00'):
+            value = value[:-6] + 'Z'
+    elif isinstance(value, datetime.date):
+        value = value.isoformat()
+    return value
+
+
+def _as_rows(data):
+    if isinstance(data, dict):
+        data = [data]
+    fields = list(data[0]) if data else []
+    return fields, ([item.get(field) for field in fields] for item in data)
+
+
+class NDJSONRenderer(renderers.BaseRenderer):
+    """Newline-delimited JSON: one object per line."""
+
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        fields, rows = _as_rows(data)
+        return b''.join(self.stream(fields, rows))
+
+    def stream(self, fields, rows):
+        """
+        Yield one encoded line per row.
+
+        Args:
+            fields (list): Output keys, in the same order as each row.
+            rows (iterable): Row tuples, e.g. from ``values_list().iterator()``.
+        """
+        for row in rows:
+            line = json.dumps(
+                dict(zip(fields, (_encode_value(value) for value in row))),
+                separators=(',', ':'),
+            )
+            yield (line + '\n').encode(self.charset)
+
+
+class _LineBuffer:
+    """File-like object that hands back what csv.writer writes to it."""
+
+    def write(self, value):
+        return value
+
+
+class CSVRenderer(renderers.BaseRenderer):
+    """Comma-separated values with a header row."""
+
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        fields, rows = _as_rows(data)
+        return b''.join(self.stream(fields, rows))
+
+    def stream(self, fields, rows):
+        """
+        Yield the header line and then one encoded line per row.
+
+        Args:
+            fields (list): Column names, in the same order as each row.
+            rows (iterable): Row tuples, e.g. from ``values_list().iterator()``.
+        """
+        writer = csv.writer(_LineBuffer())
+        yield writer.writerow(fields).encode(self.charset)
+        for row in rows:
+            yield writer.writerow([_encode_value(value) for value in row]).encode(self.charset)
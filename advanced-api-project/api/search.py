@@ -0,0 +1,166 @@
+"""
+Pluggable full-text search over ``Book.search_document``.
+
+DRF's SearchFilter turns ``search_fields`` into ``LIKE '%q%'`` ORs across
+the author join, which no index can serve. BookSearchFilter instead hands
+the ``q`` terms to a search backend that matches against the denormalized
+per-book document:
+
+- SQLiteFTSSearchBackend: an FTS5 index (``api_book_search``) kept in sync
+  with ``api_book.search_document`` by triggers, ranked with bm25.
+- PostgresSearchBackend: a GIN ``tsvector`` expression index, ranked with
+  ``ts_rank``.
+- ContainsSearchBackend: single-column ``icontains`` on the document, for
+  databases without either; on PostgreSQL a ``pg_trgm`` index serves it.
+
+The full-text backends match word prefixes ("dispo" finds "Dispossessed")
+rather than arbitrary substrings. ``API_SEARCH_BACKEND`` selects a backend
+by dotted path; by default one is picked from the database vendor.
+"""
+
+import re
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import BooleanField, F, FloatField, Q
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+from rest_framework.filters import SearchFilter
+from rest_framework.settings import api_settings
+
+from .models import BookSearchIndex
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(query):
+    """Split a search string into word tokens, dropping punctuation."""
+    return TOKEN_RE.findall(query)
+
+
+class BaseSearchBackend:
+    """
+    Search backend interface.
+
+    ``search`` filters a Book queryset down to matches of ``terms``; when
+    ``rank`` is True the queryset is also annotated with ``search_rank``
+    where higher means more relevant.
+    """
+
+    ranked = False
+
+    def __init__(self, using='default'):
+        self.using = using
+
+    def search(self, queryset, terms, rank=False):
+        raise NotImplementedError
+
+
+class ContainsSearchBackend(BaseSearchBackend):
+    """Every term must appear somewhere in the search document."""
+
+    def search(self, queryset, terms, rank=False):
+        condition = Q()
+        for term in terms:
+            condition &= Q(search_document__icontains=term)
+        return queryset.filter(condition)
+
+
+class SQLiteFTSSearchBackend(BaseSearchBackend):
+    """
+    FTS5 prefix search, joined to the index through ``Book.search_index``
+    so matching and bm25 ranking happen in the same query.
+    """
+
+    ranked = True
+    table = BookSearchIndex._meta.db_table
+
+    def match_expression(self, terms):
+        return ' '.join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+
+    def search(self, queryset, terms, rank=False):
+        queryset = queryset.filter(search_index__search_document__match=self.match_expression(terms))
+        if rank:
+            # FTS5's rank is bm25, where smaller is better; flip the sign.
+            queryset = queryset.annotate(search_rank=-F('search_index__rank'))
+        return queryset
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """
+    ``tsvector`` prefix search. The expression matches the GIN index built
+    in migration 0004 so the planner can use it.
+    """
+
+    ranked = True
+    vector = "to_tsvector('simple', {table}.search_document)"
+
+    def tsquery(self, terms):
+        # Terms come from tokenize(), so they hold word characters only.
+        return ' & '.join(f'{term}:*' for term in terms)
+
+    def search(self, queryset, terms, rank=False):
+        vector = self.vector.format(table=queryset.model._meta.db_table)
+        query = self.tsquery(terms)
+        queryset = queryset.filter(RawSQL(
+            f"{vector} @@ to_tsquery('simple', %s)", [query], output_field=BooleanField()
+        ))
+        if rank:
+            queryset = queryset.annotate(search_rank=RawSQL(
+                f"ts_rank({vector}, to_tsquery('simple', %s))", [query], output_field=FloatField()
+            ))
+        return queryset
+
+
+_backend_cache = {}
+
+
+def _sqlite_has_fts_table(connection):
+    with connection.cursor() as cursor:
+        return SQLiteFTSSearchBackend.table in connection.introspection.table_names(cursor)
+
+
+def get_search_backend(using='default'):
+    """
+    Return the search backend for a database alias.
+
+    Uses ``API_SEARCH_BACKEND`` when set, otherwise FTS5 on SQLite (when
+    the index table exists), tsvector on PostgreSQL and plain document
+    ``icontains`` elsewhere.
+    """
+    if using in _backend_cache:
+        return _backend_cache[using]
+    path = getattr(settings, 'API_SEARCH_BACKEND', None)
+    if path:
+        backend_class = import_string(path)
+    else:
+        connection = connections[using]
+        if connection.vendor == 'sqlite' and _sqlite_has_fts_table(connection):
+            backend_class = SQLiteFTSSearchBackend
+        elif connection.vendor == 'postgresql':
+            backend_class = PostgresSearchBackend
+        else:
+            backend_class = ContainsSearchBackend
+    backend = _backend_cache[using] = backend_class(using)
+    return backend
+
+
+class BookSearchFilter(SearchFilter):
+    """
+    SearchFilter that delegates ``?q=`` to the configured search backend.
+
+    Without an explicit ``?ordering=`` results are sorted by relevance.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        terms = [
+            token for term in self.get_search_terms(request) for token in tokenize(term)
+        ]
+        if not terms:
+            return queryset
+        backend = get_search_backend(queryset.db)
+        rank = backend.ranked and not request.query_params.get(api_settings.ORDERING_PARAM)
+        queryset = backend.search(queryset, terms, rank=rank)
+        if rank:
+            queryset = queryset.order_by('-search_rank', 'pk')
+        return queryset
@@ -6,10 +6,58 @@ nested relationships and custom validation logic.
 """
 
 from rest_framework import serializers
-from django.utils import timezone
 from .models import Author, Book
+from .sparse import SparseFieldsetSerializerMixin
+from .validators import current_year
 
-class BookSerializer(serializers.ModelSerializer):
+class PrefetchedAuthorField(serializers.PrimaryKeyRelatedField):
+    """
+    Author primary key field that resolves against a prefetched mapping.
+
+    When the serializer context carries ``prefetched_authors`` (a dict of
+    pk -> Author, filled by BookListSerializer), lookups are served from it
+    instead of issuing one query per validated item.
+    """
+
+    def to_internal_value(self, data):
+        authors = self.context.get('prefetched_authors')
+        if authors is None:
+            return super().to_internal_value(data)
+        try:
+            if isinstance(data, bool):
+                raise TypeError
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        author = authors.get(pk)
+        if author is None:
+            self.fail('does_not_exist', pk_value=data)
+        return author
+
+
+class BookListSerializer(serializers.ListSerializer):
+    """
+    List serializer used for ``BookSerializer(many=True)``.
+
+    Loads every author referenced by the incoming items with a single
+    query before the per-item validation runs.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, list) and 'prefetched_authors' not in self.context:
+            author_ids = set()
+            for item in data:
+                if not isinstance(item, dict):
+                    continue
+                try:
+                    author_ids.add(int(item.get('author')))
+                except (TypeError, ValueError):
+                    continue
+            self.context['prefetched_authors'] = Author.objects.in_bulk(author_ids)
+        return super().to_internal_value(data)
+
+
+class BookSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for the Book model.
     
@@ -17,13 +65,22 @@ class BookSerializer(serializers.ModelSerializer):
     custom validation for the publication_year field.
     
     Attributes:
+        author: Primary key of the author, resolved in bulk when many=True.
         publication_year: Custom validation ensures the year is not in the future.
+
+    Pass ``fields=[...]`` to limit the output to a subset of fields.
     """
+
+    author = PrefetchedAuthorField(queryset=Author.objects.all())
     
     class Meta:
         model = Book
         fields = ['id', 'title', 'publication_year', 'author', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
+        list_serializer_class = BookListSerializer
+        # validate_publication_year checks the upper bound; drop the copy
+        # of the model's MaxValueValidator so it is not run twice per item.
+        extra_kwargs = {'publication_year': {'max_value': None}}
     
     def validate_publication_year(self, value):
         """
@@ -38,10 +95,10 @@ class BookSerializer(serializers.ModelSerializer):
         Raises:
             serializers.ValidationError: If the publication year is in the future.
         """
-        current_year = timezone.now().year
-        if value > current_year:
+        year = current_year()
+        if value > year:
             raise serializers.ValidationError(
-                f"Publication year cannot be in the future. Current year is {current_year}."
+                f"Publication year cannot be in the future. Current year is {year}."
             )
         return value
     
@@ -58,7 +115,7 @@ class BookSerializer(serializers.ModelSerializer):
         
         return data
 
-class AuthorSerializer(serializers.ModelSerializer):
+class AuthorSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     """
     Serializer for the Author model with nested Book serialization.
     
@@ -68,6 +125,8 @@ class AuthorSerializer(serializers.ModelSerializer):
     
     Attributes:
         books (BookSerializer): Nested serializer for the author's books.
+            The read views leave it out when ``?fields=`` does not name it
+            and ``?expand=books`` is not given.
     """
     
     books = BookSerializer(many=True, read_only=True)
@@ -76,6 +135,8 @@ class AuthorSerializer(serializers.ModelSerializer):
         model = Author
         fields = ['id', 'name', 'books', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
+        computed_fields = ['book_count']
+        expandable_fields = ['books']
     
     def to_representation(self, instance):
         """
@@ -92,10 +153,26 @@ class AuthorSerializer(serializers.ModelSerializer):
         """
         representation = super().to_representation(instance)
         
-        representation['book_count'] = instance.books.count()
+        if self.is_selected('book_count'):
+            representation['book_count'] = self.get_book_count(instance)
         
         return representation
 
+    def get_book_count(self, instance):
+        """
+        Return the number of books for an author.
+
+        Reads the maintained ``Author.book_count`` column, so no query is
+        needed.
+
+        Args:
+            instance (Author): The Author instance being serialized.
+
+        Returns:
+            int: The number of books written by the author.
+        """
+        return instance.book_count
+
 class AuthorDetailSerializer(AuthorSerializer):
     """
     Detailed Author serializer with additional book information.
@@ -0,0 +1,60 @@
+"""
+Signal handlers for the API application.
+
+Writes to Book and Author bump the response cache generation for their
+model once the transaction commits, invalidating cached list pages that
+include them. Book saves and
+Author renames also keep ``Book.search_document`` current; the SQLite FTS
+index follows that column through database triggers. Book creates,
+deletes and author reassignments keep ``Author.book_count`` current.
+"""
+
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Concat
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .cache import bump_generation
+from .models import Author, Book
+
+
+@receiver(post_save, sender=Book)
+@receiver(post_delete, sender=Book)
+@receiver(post_save, sender=Author)
+@receiver(post_delete, sender=Author)
+def invalidate_cached_responses(sender, **kwargs):
+    # Bumping before commit would let a concurrent reader cache the old
+    # rows under the new generation.
+    transaction.on_commit(lambda: bump_generation(sender))
+
+
+@receiver(pre_save, sender=Book)
+def build_book_search_document(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not {'title', 'author', 'search_document'} & set(update_fields):
+        return
+    instance.search_document = Book.build_search_document(instance.title, instance.author.name)
+
+
+@receiver(post_save, sender=Author)
+def refresh_author_search_documents(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields is not None and 'name' not in update_fields):
+        return
+    instance.books.update(
+        search_document=Concat(F('title'), Value(' '), Value(instance.name))
+    )
+
+
+@receiver(post_save, sender=Book)
+def count_saved_book(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_loaded_author_id', None)
+    if created:
+        Author.adjust_book_counts({instance.author_id: 1})
+    elif previous is not None and previous != instance.author_id:
+        Author.adjust_book_counts({previous: -1, instance.author_id: 1})
+    instance._loaded_author_id = instance.author_id
+
+
+@receiver(post_delete, sender=Book)
+def count_deleted_book(sender, instance, **kwargs):
+    Author.adjust_book_counts({instance.author_id: -1})
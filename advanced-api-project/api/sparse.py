@@ -0,0 +1,123 @@
+"""
+Sparse fieldsets (``?fields=``) and relation expansion (``?expand=``).
+
+Without either parameter a response has every field, as it always has.
+``?fields=id,title`` limits it to the named fields, and ``?expand=books``
+adds a nested relation back to such a selection. The selection also
+shapes the query: only the selected columns are loaded (``only()`` /
+``values()``) and an expandable relation is prefetched only when it is
+selected, so nothing the client left out is fetched.
+
+Unknown names are rejected with a 400 rather than silently ignored, so a
+typo cannot quietly return a different shape.
+"""
+
+from rest_framework.exceptions import ValidationError
+
+
+def _split(value):
+    return [name.strip() for name in (value or '').split(',') if name.strip()]
+
+
+def parse_field_selection(query_params, available, expandable=(),
+                          fields_param='fields', expand_param='expand'):
+    """
+    Resolve the output fields requested by a query string.
+
+    Args:
+        query_params: The request's query parameters.
+        available (list): Every field the representation can contain, in
+            output order.
+        expandable (iterable): Relations ``?expand=`` may add to a
+            ``?fields=`` selection.
+
+    Returns:
+        list: The selected field names, in output order.
+
+    Raises:
+        ValidationError: If a requested field or expansion does not exist.
+    """
+    requested = _split(query_params.get(fields_param))
+    expand = _split(query_params.get(expand_param))
+    errors = {}
+    unknown = [name for name in requested if name not in available]
+    if unknown:
+        errors[fields_param] = [f"Unknown field: {name}." for name in unknown]
+    unknown = [name for name in expand if name not in expandable]
+    if unknown:
+        errors[expand_param] = [f"Cannot expand: {name}." for name in unknown]
+    if errors:
+        raise ValidationError(errors)
+
+    if requested:
+        return [name for name in available if name in requested or name in expand]
+    return list(available)
+
+
+class SparseFieldsetSerializerMixin:
+    """
+    Serializer mixin accepting a ``fields`` keyword to drop every other
+    field from the output.
+
+    ``Meta.computed_fields`` names output keys added outside the declared
+    fields (e.g. in ``to_representation``), and ``Meta.expandable_fields``
+    the relations ``?expand=`` accepts.
+    """
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.selected_fields = None if fields is None else frozenset(fields)
+        if fields is not None:
+            for name in set(self.fields) - self.selected_fields:
+                self.fields.pop(name)
+
+    def is_selected(self, name):
+        return self.selected_fields is None or name in self.selected_fields
+
+    @classmethod
+    def get_available_fields(cls):
+        return list(dict.fromkeys([*cls.Meta.fields, *getattr(cls.Meta, 'computed_fields', ())]))
+
+    @classmethod
+    def get_expandable_fields(cls):
+        return list(getattr(cls.Meta, 'expandable_fields', ()))
+
+
+class SparseFieldsetMixin:
+    """
+    View mixin applying ``?fields=`` and ``?expand=`` to the serializer,
+    the fast serializer and the queryset.
+
+    ``expansions`` maps each expandable field to the ``prefetch_related``
+    lookup that loads it.
+    """
+
+    expansions = {}
+
+    def get_selected_fields(self):
+        if not hasattr(self, '_selected_fields'):
+            serializer_class = self.get_serializer_class()
+            self._selected_fields = parse_field_selection(
+                self.request.query_params,
+                serializer_class.get_available_fields(),
+                serializer_class.get_expandable_fields(),
+            )
+        return self._selected_fields
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        selected = self.get_selected_fields()
+        concrete = {field.name for field in queryset.model._meta.concrete_fields}
+        columns = [name for name in selected if name in concrete]
+        queryset = queryset.only(*columns or ['pk'])
+        for name, lookup in self.expansions.items():
+            if name in selected:
+                queryset = queryset.prefetch_related(lookup)
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('fields', self.get_selected_fields())
+        return super().get_serializer(*args, **kwargs)
+
+    def get_fast_serializer(self):
+        return self.fast_serializer_class(fields=self.get_selected_fields())
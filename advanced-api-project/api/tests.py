@@ -1,3 +1,769 @@
-from django.test import TestCase
+"""
+Tests for the API application.
+"""
 
-# Create your tests here.
+import csv
+import io
+import datetime
+import json
+import tempfile
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.http import QueryDict
+from django.test import AsyncClient, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from drf_orjson.renderers import ORJSONRenderer
+
+from .bulk import BookBulkOperations
+from .cache import get_cache, get_generation, normalize_query
+from .models import Author, Book
+from .serializers import BookSerializer
+from .validators import current_year
+from .writebehind import BookWriteBuffer, WriteBufferFull, close_write_buffer
+
+
+class AuthorListQueryCountTests(TestCase):
+    """The author endpoints must not issue queries per serialized author."""
+
+    def setUp(self):
+        self.client = APIClient()
+        get_cache().clear()
+
+    def _create_authors(self, count, books_per_author=3):
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(count):
+                author = Author.objects.create(name=f"Author {i:03d}")
+                Book.objects.bulk_create(
+                    Book(title=f"Book {i}-{j}", publication_year=2000, author=author)
+                    for j in range(books_per_author)
+                )
+                Author.adjust_book_counts({author.pk: books_per_author})
+
+    def test_list_query_count_is_independent_of_page_size(self):
+        # COUNT for pagination, the author page and the prefetched books.
+        self._create_authors(2)
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('author-list'))
+        self.assertEqual(response.status_code, 200)
+
+        self._create_authors(10)
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('author-list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 10)
+
+    def test_list_reports_book_count_and_books(self):
+        self._create_authors(1, books_per_author=4)
+        response = self.client.get(reverse('author-list'))
+        author = response.data['results'][0]
+        self.assertEqual(author['book_count'], 4)
+        self.assertEqual(len(author['books']), 4)
+
+    def test_detail_query_count(self):
+        self._create_authors(1, books_per_author=5)
+        author = Author.objects.get()
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('author-detail', args=[author.pk]))
+        self.assertEqual(response.data['book_count'], 5)
+
+
+class ListResponseCacheTests(TestCase):
+    """Public list endpoints are served from cache until the data changes."""
+
+    def setUp(self):
+        self.client = APIClient()
+        get_cache().clear()
+        self.author = Author.objects.create(name="Ursula K. Le Guin")
+        Book.objects.create(title="The Dispossessed", publication_year=1974, author=self.author)
+
+    def test_repeated_request_is_a_cache_hit(self):
+        url = reverse('book-list')
+        first = self.client.get(url, {'ordering': 'title'})
+        self.assertEqual(first['X-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            second = self.client.get(url, {'ordering': 'title', 'q': ''})
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(first.data, second.data)
+
+    def test_book_write_invalidates_book_and_author_lists(self):
+        self.client.get(reverse('book-list'))
+        self.client.get(reverse('author-list'))
+        with self.captureOnCommitCallbacks(execute=True):
+            Book.objects.create(title="The Lathe of Heaven", publication_year=1971, author=self.author)
+
+        books = self.client.get(reverse('book-list'))
+        authors = self.client.get(reverse('author-list'))
+        self.assertEqual(books['X-Cache'], 'MISS')
+        self.assertEqual(books.data['count'], 2)
+        self.assertEqual(authors.data['results'][0]['book_count'], 2)
+
+    def test_author_delete_invalidates_book_list(self):
+        self.client.get(reverse('book-list'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.author.delete()
+        response = self.client.get(reverse('book-list'))
+        self.assertEqual(response.data['count'], 0)
+
+    def test_generation_moves_only_after_commit(self):
+        before = get_generation(Book)
+        with self.captureOnCommitCallbacks() as callbacks:
+            Book.objects.create(title="The Lathe of Heaven", publication_year=1971, author=self.author)
+            self.assertEqual(get_generation(Book), before)
+        self.assertEqual(get_generation(Book), before)
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(get_generation(Book), before)
+
+    def test_normalize_query_is_order_independent(self):
+        self.assertEqual(
+            normalize_query(QueryDict('page=2&ordering=title&q=')),
+            normalize_query(QueryDict('ordering=title&page=2')),
+        )
+
+
+class ConditionalGetTests(TestCase):
+    """Read endpoints answer If-None-Match/If-Modified-Since with 304."""
+
+    def setUp(self):
+        self.client = APIClient()
+        get_cache().clear()
+        self.author = Author.objects.create(name="Ursula K. Le Guin")
+        self.book = Book.objects.create(title="The Dispossessed", publication_year=1974, author=self.author)
+
+    def assertNotModified(self, url, **headers):
+        response = self.client.get(url, headers=headers)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        return response
+
+    def test_book_detail_etag_and_last_modified(self):
+        url = reverse('book-detail', args=[self.book.pk])
+        first = self.client.get(url)
+        self.assertTrue(first['ETag'].startswith('W/"'))
+        with self.assertNumQueries(1):
+            self.assertNotModified(url, if_none_match=first['ETag'])
+        self.assertNotModified(url, if_modified_since=first['Last-Modified'])
+
+        self.book.title = "The Lathe of Heaven"
+        self.book.save()
+        response = self.client.get(url, headers={'if-none-match': first['ETag']})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], first['ETag'])
+
+    def test_missing_book_is_still_404(self):
+        url = reverse('book-detail', args=[self.book.pk + 1])
+        response = self.client.get(url, headers={'if-none-match': '*'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_missing_author_is_still_404(self):
+        url = reverse('author-detail', args=[self.author.pk + 1])
+        response = self.client.get(url, headers={'if-none-match': '*'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_book_list_changes_on_delete_and_author_rename(self):
+        url = reverse('book-list')
+        other = Book.objects.create(title="Always Coming Home", publication_year=1985, author=self.author)
+        etag = self.client.get(url, {'ordering': 'author__name'})['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {'ordering': 'author__name'}, headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            other.delete()
+        response = self.client.get(url, {'ordering': 'author__name'}, headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 200)
+
+        etag = response['ETag']
+        self.author.name = "U. K. Le Guin"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.author.save()
+        response = self.client.get(url, {'ordering': 'author__name'}, headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 200)
+
+    def test_list_etag_depends_on_query(self):
+        url = reverse('book-list')
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, {'publication_year': 1974}, headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('Last-Modified'))
+
+    def test_author_detail_changes_when_a_book_changes(self):
+        url = reverse('author-detail', args=[self.author.pk])
+        etag = self.client.get(url)['ETag']
+        self.assertNotModified(url, if_none_match=etag)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Book.objects.create(title="The Word for World Is Forest", publication_year=1972, author=self.author)
+        response = self.client.get(url, headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['book_count'], 2)
+
+    def test_cached_author_list_answers_without_queries(self):
+        url = reverse('author-list')
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            self.assertNotModified(url, if_none_match=etag)
+
+
+class SparseFieldsetTests(TestCase):
+    """?fields= and ?expand= shape both the output and the queries."""
+
+    def setUp(self):
+        self.client = APIClient()
+        get_cache().clear()
+        self.author = Author.objects.create(name="Ursula K. Le Guin")
+        self.book = Book.objects.create(title="The Dispossessed", publication_year=1974, author=self.author)
+
+    def test_book_fields_limit_output_and_columns(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('book-list'), {'fields': 'title, id'})
+        self.assertEqual(response.data['results'], [{'id': self.book.pk, 'title': "The Dispossessed"}])
+        page_query = queries[-1]['sql']
+        self.assertIn('"title"', page_query)
+        self.assertNotIn('"search_document"', page_query)
+        self.assertNotIn('"created_at"', page_query)
+
+    def test_books_are_embedded_unless_left_out(self):
+        url = reverse('author-detail', args=[self.author.pk])
+        response = self.client.get(url)
+        self.assertEqual(response.data['books'][0]['title'], "The Dispossessed")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'fields': 'name,book_count'})
+        self.assertEqual(response.data, {'name': "Ursula K. Le Guin", 'book_count': 1})
+        # Only the author row.
+        self.assertEqual(len(queries), 1)
+
+        response = self.client.get(url, {'expand': 'books', 'fields': 'name'})
+        self.assertEqual(list(response.data), ['name', 'books'])
+        self.assertEqual(response.data['books'][0]['title'], "The Dispossessed")
+
+    def test_unknown_fields_are_rejected(self):
+        response = self.client.get(reverse('book-list'), {'fields': 'title,isbn'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['fields'], ["Unknown field: isbn."])
+        response = self.client.get(reverse('book-list'), {'expand': 'author'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_export_fields(self):
+        response = self.client.get(reverse('book-export'), {'format': 'csv', 'fields': 'id,title'})
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(rows, [['id', 'title'], [str(self.book.pk), "The Dispossessed"]])
+
+
+class BookBulkOperationsTests(TestCase):
+    """The bulk endpoint applies create/update/delete batches atomically."""
+
+    def setUp(self):
+        self.client = APIClient()
+        get_cache().clear()
+        user = User.objects.create_user(username="loader", password="secret")
+        self.client.force_authenticate(user)
+        self.author = Author.objects.create(name="Octavia E. Butler")
+        self.other = Author.objects.create(name="Samuel R. Delany")
+        self.kindred = Book.objects.create(title="Kindred", publication_year=1979, author=self.author)
+        self.dawn = Book.objects.create(title="Dawn", publication_year=1987, author=self.author)
+
+    def test_mixed_operations_are_applied(self):
+        operations = [
+            {'op': 'create', 'data': {'title': 'Dhalgren', 'publication_year': 1975, 'author': self.other.pk}},
+            {'op': 'create', 'data': {'title': 'Nova', 'publication_year': 1968, 'author': self.other.pk}},
+            {'op': 'update', 'id': self.kindred.pk, 'data': {'publication_year': 1980}},
+            {'op': 'delete', 'id': self.dawn.pk},
+        ]
+        response = self.client.post(reverse('book-bulk-operations'), operations, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [result['status'] for result in response.data['results']],
+            ['created', 'created', 'updated', 'deleted'],
+        )
+        summary = response.data['summary']
+        self.assertEqual((summary['created'], summary['updated'], summary['deleted']), (2, 1, 1))
+        self.assertEqual(Book.objects.get(pk=self.kindred.pk).publication_year, 1980)
+        self.assertFalse(Book.objects.filter(pk=self.dawn.pk).exists())
+        self.assertEqual(Book.objects.filter(author=self.other).count(), 2)
+        self.assertEqual(
+            dict(Author.objects.values_list('pk', 'book_count')),
+            {self.author.pk: 1, self.other.pk: 2},
+        )
+
+    def test_invalid_operation_rolls_back_the_batch(self):
+        operations = [
+            {'op': 'create', 'data': {'title': 'Dhalgren', 'publication_year': 1975, 'author': self.other.pk}},
+            {'op': 'create', 'data': {'title': 'Ghost', 'publication_year': 1975, 'author': 999999}},
+            {'op': 'delete', 'id': 999999},
+        ]
+        response = self.client.post(reverse('book-bulk-operations'), operations, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            [result['status'] for result in response.data['results']],
+            ['valid', 'error', 'error'],
+        )
+        self.assertIn('author', response.data['results'][1]['errors'])
+        self.assertEqual(Book.objects.count(), 2)
+
+    def test_query_count_is_independent_of_batch_size(self):
+        def payload(count):
+            return [
+                {'op': 'create', 'data': {'title': f'Book {i}', 'publication_year': 2000, 'author': self.author.pk}}
+                for i in range(count)
+            ]
+
+        url = reverse('book-bulk-operations') + '?chunk_size=1000'
+        with CaptureQueriesContext(connection) as small:
+            self.client.post(url, payload(5), format='json')
+        with self.assertNumQueries(len(small.captured_queries)):
+            self.client.post(url, payload(150), format='json')
+        self.assertEqual(Book.objects.count(), 157)
+
+    def test_rejects_non_list_body(self):
+        response = self.client.post(reverse('book-bulk-operations'), {'op': 'create'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+
+class BookExportTests(TestCase):
+    """The export endpoint streams every matching book without paging."""
+
+    def setUp(self):
+        self.client = APIClient()
+        author = Author.objects.create(name="N. K. Jemisin")
+        Book.objects.bulk_create(
+            Book(title=f"Book {i:02d}", publication_year=2000 + i, author=author)
+            for i in range(15)
+        )
+
+    def _content(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_ndjson_export_is_unpaginated_and_filtered(self):
+        response = self.client.get(
+            reverse('book-export'),
+            {'publication_year_min': 2005, 'ordering': '-publication_year'},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        rows = [json.loads(line) for line in self._content(response).splitlines()]
+        self.assertEqual(len(rows), 10)
+        self.assertEqual(rows[0]['publication_year'], 2014)
+        self.assertEqual(
+            list(rows[0]),
+            ['id', 'title', 'publication_year', 'author', 'created_at', 'updated_at'],
+        )
+
+    def test_csv_export(self):
+        response = self.client.get(reverse('book-export'), {'format': 'csv', 'title': 'Book 0'})
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        rows = list(csv.reader(io.StringIO(self._content(response))))
+        self.assertEqual(rows[0][:3], ['id', 'title', 'publication_year'])
+        self.assertEqual(len(rows), 11)
+
+
+class KeysetPaginationTests(TestCase):
+    """?pagination=cursor walks BookListView without COUNT or OFFSET."""
+
+    def setUp(self):
+        self.client = APIClient()
+        get_cache().clear()
+        author = Author.objects.create(name="Iain M. Banks")
+        # Repeated years force the id tiebreak to do real work.
+        Book.objects.bulk_create(
+            Book(title=f"Culture {i:02d}", publication_year=1990 + i % 3, author=author)
+            for i in range(25)
+        )
+
+    def _walk(self, params):
+        url, ids = reverse('book-list'), []
+        response = self.client.get(url, params)
+        while True:
+            self.assertNotIn('count', response.data)
+            ids.extend(book['id'] for book in response.data['results'])
+            if not response.data['next']:
+                return ids, response
+            response = self.client.get(response.data['next'])
+
+    def test_walk_matches_offset_ordering_for_every_ordering_field(self):
+        for ordering in ['title', '-publication_year', 'created_at', '-updated_at', 'author__name']:
+            with self.subTest(ordering=ordering):
+                ids, _ = self._walk({'pagination': 'cursor', 'ordering': ordering})
+                direction = '-' if ordering.startswith('-') else ''
+                expected = list(
+                    Book.objects.order_by(ordering, f'{direction}id').values_list('id', flat=True)
+                )
+                self.assertEqual(ids, expected)
+
+    def test_previous_link_returns_the_prior_page(self):
+        first = self.client.get(reverse('book-list'), {'pagination': 'cursor', 'ordering': 'publication_year'})
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+        self.assertEqual(back.data['results'], first.data['results'])
+        self.assertIsNone(back.data['previous'])
+
+    def test_page_query_does_not_count(self):
+        first = self.client.get(reverse('book-list'), {'pagination': 'cursor'})
+        get_cache().clear()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(first.data['next'])
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('COUNT', queries[0]['sql'])
+        self.assertNotIn('OFFSET', queries[0]['sql'])
+
+    def test_cursor_from_another_ordering_is_rejected(self):
+        first = self.client.get(reverse('book-list'), {'pagination': 'cursor', 'ordering': 'title'})
+        cursor = QueryDict(first.data['next'].split('?', 1)[1])['cursor']
+        response = self.client.get(reverse('book-list'), {'cursor': cursor, 'ordering': 'publication_year'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_page_number_pagination_remains_the_default(self):
+        response = self.client.get(reverse('book-list'))
+        self.assertEqual(response.data['count'], 25)
+
+
+class ExplainBookQueriesCommandTests(TestCase):
+    """Every BookListView filter/ordering combination is served by an index."""
+
+    def test_no_full_table_scans(self):
+        out = io.StringIO()
+        call_command('explain_book_queries', books=2000, stdout=out)
+        self.assertIn('query plans use an index', out.getvalue())
+        self.assertFalse(Book.objects.exists())
+
+
+class BookSearchTests(TestCase):
+    """?q= goes through the search backend over Book.search_document."""
+
+    def setUp(self):
+        self.client = APIClient()
+        get_cache().clear()
+        self.le_guin = Author.objects.create(name="Ursula K. Le Guin")
+        self.banks = Author.objects.create(name="Iain M. Banks")
+        Book.objects.create(title="The Dispossessed", publication_year=1974, author=self.le_guin)
+        Book.objects.create(title="The Left Hand of Darkness", publication_year=1969, author=self.le_guin)
+        Book.objects.create(title="Use of Weapons", publication_year=1990, author=self.banks)
+
+    def _titles(self, **params):
+        response = self.client.get(reverse('book-list'), params)
+        return [book['title'] for book in response.data['results']]
+
+    def test_search_matches_title_and_author_prefixes(self):
+        self.assertEqual(self._titles(q='dispo'), ['The Dispossessed'])
+        self.assertEqual(
+            sorted(self._titles(q='guin')),
+            ['The Dispossessed', 'The Left Hand of Darkness'],
+        )
+        self.assertEqual(self._titles(q='banks weapons'), ['Use of Weapons'])
+        self.assertEqual(self._titles(q='nothing'), [])
+
+    def test_search_honours_explicit_ordering(self):
+        self.assertEqual(
+            self._titles(q='le guin', ordering='publication_year'),
+            ['The Left Hand of Darkness', 'The Dispossessed'],
+        )
+
+    def test_document_follows_author_rename_and_bulk_writes(self):
+        self.banks.name = "Iain Banks"
+        self.banks.save()
+        Book.objects.filter(title="Use of Weapons").delete()
+        BookBulkOperations([
+            {'op': 'create', 'data': {'title': 'Excession', 'publication_year': 1996, 'author': self.banks.pk}},
+        ]).run()
+        self.assertEqual(self._titles(q='iain excess'), ['Excession'])
+        self.assertEqual(self._titles(q='weapons'), [])
+
+    def test_search_document_is_denormalized(self):
+        book = Book.objects.get(title="Use of Weapons")
+        self.assertEqual(book.search_document, "Use of Weapons Iain M. Banks")
+
+
+class AuthorBookCountTests(TestCase):
+    """Author.book_count follows book writes and backs min/max_books."""
+
+    def setUp(self):
+        self.client = APIClient()
+        get_cache().clear()
+        self.tolkien = Author.objects.create(name="J. R. R. Tolkien")
+        self.lewis = Author.objects.create(name="C. S. Lewis")
+
+    def _counts(self):
+        return dict(Author.objects.values_list('name', 'book_count'))
+
+    def test_signals_track_create_reassign_and_delete(self):
+        hobbit = Book.objects.create(title="The Hobbit", publication_year=1937, author=self.tolkien)
+        Book.objects.create(title="The Silmarillion", publication_year=1977, author=self.tolkien)
+        self.assertEqual(self._counts(), {"J. R. R. Tolkien": 2, "C. S. Lewis": 0})
+
+        hobbit = Book.objects.get(pk=hobbit.pk)
+        hobbit.author = self.lewis
+        hobbit.save()
+        self.assertEqual(self._counts(), {"J. R. R. Tolkien": 1, "C. S. Lewis": 1})
+
+        hobbit.delete()
+        self.assertEqual(self._counts(), {"J. R. R. Tolkien": 1, "C. S. Lewis": 0})
+
+    def test_bulk_operations_adjust_counts(self):
+        book = Book.objects.create(title="The Hobbit", publication_year=1937, author=self.tolkien)
+        gone = Book.objects.create(title="Farmer Giles of Ham", publication_year=1949, author=self.tolkien)
+        BookBulkOperations([
+            {'op': 'create', 'data': {'title': 'Perelandra', 'publication_year': 1943, 'author': self.lewis.pk}},
+            {'op': 'update', 'id': book.pk, 'data': {'author': self.lewis.pk}},
+            {'op': 'delete', 'id': gone.pk},
+        ]).run()
+        self.assertEqual(self._counts(), {"J. R. R. Tolkien": 0, "C. S. Lewis": 2})
+
+    def test_min_and_max_books_filters(self):
+        Book.objects.create(title="The Hobbit", publication_year=1937, author=self.tolkien)
+        Book.objects.create(title="The Silmarillion", publication_year=1977, author=self.tolkien)
+        response = self.client.get(reverse('author-list'), {'min_books': 1})
+        self.assertEqual([a['name'] for a in response.data['results']], ["J. R. R. Tolkien"])
+        response = self.client.get(reverse('author-list'), {'max_books': 0})
+        self.assertEqual([a['name'] for a in response.data['results']], ["C. S. Lewis"])
+
+    def test_recount_authors_repairs_drift(self):
+        Book.objects.bulk_create([
+            Book(title="The Hobbit", publication_year=1937, author=self.tolkien),
+            Book(title="Beren and Luthien", publication_year=2017, author=self.tolkien),
+        ])
+        Author.objects.filter(pk=self.lewis.pk).update(book_count=7)
+        out = io.StringIO()
+        call_command('recount_authors', batch_size=1, stdout=out)
+        self.assertIn('fixed 2', out.getvalue())
+        self.assertEqual(self._counts(), {"J. R. R. Tolkien": 2, "C. S. Lewis": 0})
+
+
+class BenchCommandTests(TestCase):
+    """manage.py bench produces a JSON report for every scenario."""
+
+    def test_writes_json_report(self):
+        with tempfile.NamedTemporaryFile(suffix='.json') as output:
+            call_command(
+                'bench', books=200, iterations=2, warmup=0,
+                output=output.name, stdout=io.StringIO(),
+            )
+            report = json.load(open(output.name))
+        self.assertEqual(report['meta']['books'], 200)
+        by_name = {result['name']: result for result in report['results']}
+        self.assertEqual(by_name['book-list']['status'], [200])
+        self.assertEqual(by_name['book-create']['status'], [201])
+        for result in report['results']:
+            self.assertLessEqual(result['p50_ms'], result['p95_ms'])
+            self.assertGreater(result['queries'], 0)
+        self.assertFalse(Book.objects.exists())
+
+
+class FastSerializationTests(TestCase):
+    """The values() fast path renders exactly what the serializers do."""
+
+    def setUp(self):
+        self.client = APIClient()
+        get_cache().clear()
+        le_guin = Author.objects.create(name="Ursula K. Le Guin")
+        Author.objects.create(name="Nobody Yet")
+        for i in range(15):
+            Book.objects.create(title=f"Earthsea {i}", publication_year=1968 + i, author=le_guin)
+
+    def assertSameResponse(self, url, params=None):
+        get_cache().clear()
+        expected = self.client.get(url, params)
+        get_cache().clear()
+        with override_settings(API_FAST_SERIALIZATION=True):
+            actual = self.client.get(url, params)
+        self.assertEqual(actual.status_code, expected.status_code)
+        self.assertEqual(actual.content, expected.content)
+        return actual
+
+    def test_book_views(self):
+        book = Book.objects.order_by('pk').last()
+        self.assertSameResponse(reverse('book-list'), {'ordering': 'title', 'page': 2})
+        self.assertSameResponse(reverse('book-list'), {'q': 'earth'})
+        self.assertSameResponse(reverse('book-detail', args=[book.pk]))
+        self.assertSameResponse(reverse('book-detail', args=[book.pk + 1]))
+        self.assertSameResponse(reverse('book-list'), {'fields': 'title,author'})
+
+    def test_cursor_pages(self):
+        first = self.assertSameResponse(reverse('book-list'), {'pagination': 'cursor', 'ordering': 'title'})
+        self.assertSameResponse(first.data['next'])
+
+    def test_author_views(self):
+        author = Author.objects.get(name="Ursula K. Le Guin")
+        self.assertSameResponse(reverse('author-list'))
+        self.assertSameResponse(reverse('author-list'), {'expand': 'books'})
+        self.assertSameResponse(reverse('author-detail', args=[author.pk]), {'expand': 'books'})
+        self.assertSameResponse(reverse('author-list'), {'fields': 'name,books'})
+
+    def test_orjson_renderer_matches_json_renderer(self):
+        data = {'title': "Tehanu \u2028 é", 'year': 1990, 'created_at': Book.objects.first().created_at}
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+
+
+class AsyncReadViewTests(TestCase):
+    """The async views return what the sync read views do."""
+
+    def setUp(self):
+        get_cache().clear()
+        self.le_guin = Author.objects.create(name="Ursula K. Le Guin")
+        Author.objects.create(name="Nobody Yet")
+        for i in range(15):
+            Book.objects.create(title=f"Earthsea {i}", publication_year=1968 + i, author=self.le_guin)
+
+    def assertSameResponse(self, async_url, sync_url, params=None):
+        get_cache().clear()
+        expected = APIClient().get(sync_url, params)
+        actual = async_to_sync(AsyncClient().get)(async_url, params)
+        self.assertEqual(actual.status_code, expected.status_code)
+        # Pagination links differ only by the async/ prefix.
+        content = actual.content.replace(b'/async/', b'/')
+        self.assertEqual(json.loads(content), json.loads(expected.content))
+        return actual
+
+    def test_book_views(self):
+        book = Book.objects.order_by('pk').last()
+        list_urls = reverse('async-book-list'), reverse('book-list')
+        self.assertSameResponse(*list_urls, {'ordering': 'title', 'page': 2})
+        self.assertSameResponse(*list_urls, {'ordering': '-publication_year', 'fields': 'id,title'})
+        self.assertSameResponse(*list_urls, {'q': 'earth', 'page': 2})
+        self.assertSameResponse(*list_urls, {'publication_year': 1970})
+        self.assertSameResponse(reverse('async-book-detail', args=[book.pk]), reverse('book-detail', args=[book.pk]))
+
+    def test_author_views(self):
+        list_urls = reverse('async-author-list'), reverse('author-list')
+        self.assertSameResponse(*list_urls)
+        self.assertSameResponse(*list_urls, {'expand': 'books'})
+        self.assertSameResponse(
+            reverse('async-author-detail', args=[self.le_guin.pk]),
+            reverse('author-detail', args=[self.le_guin.pk]),
+            {'expand': 'books'},
+        )
+
+    def test_errors(self):
+        missing = Book.objects.order_by('pk').last().pk + 1
+        self.assertSameResponse(reverse('async-book-detail', args=[missing]), reverse('book-detail', args=[missing]))
+        list_urls = reverse('async-book-list'), reverse('book-list')
+        self.assertSameResponse(*list_urls, {'page': 9})
+        self.assertSameResponse(*list_urls, {'fields': 'title,isbn'})
+
+
+class WriteBehindTests(TransactionTestCase):
+    """Buffered creates are written in batches and answered one by one."""
+
+    def setUp(self):
+        self.author = Author.objects.create(name="Octavia E. Butler")
+
+    def book_data(self, i):
+        return {'title': f"Parable {i}", 'publication_year': 1993, 'author': self.author}
+
+    def test_creates_are_batched_and_resolved(self):
+        buffer = BookWriteBuffer(batch_size=5, flush_interval=5)
+        futures = [buffer.submit(self.book_data(i)) for i in range(5)]
+        books = [future.result(timeout=5) for future in futures]
+        buffer.close()
+        self.assertEqual(buffer.flushes, 1)
+        self.assertEqual(
+            sorted(book.pk for book in books),
+            list(Book.objects.order_by('pk').values_list('pk', flat=True)),
+        )
+        self.author.refresh_from_db()
+        self.assertEqual(self.author.book_count, 5)
+        self.assertEqual(Book.objects.filter(search_document__contains='Butler').count(), 5)
+
+    def test_backpressure_and_drain_on_close(self):
+        buffer = BookWriteBuffer(batch_size=10, flush_interval=5, max_pending=2, submit_timeout=0.01)
+        futures = [buffer.submit(self.book_data(i)) for i in range(2)]
+        with self.assertRaises(WriteBufferFull):
+            buffer.submit(self.book_data(2))
+        buffer.close()
+        self.assertTrue(all(future.done() for future in futures))
+        self.assertEqual(Book.objects.count(), 2)
+        with self.assertRaises(WriteBufferFull):
+            buffer.submit(self.book_data(3))
+
+    def test_failed_row_does_not_fail_the_batch(self):
+        doomed = Author.objects.create(name="Doomed")
+        buffer = BookWriteBuffer(batch_size=10, flush_interval=5)
+        good = buffer.submit(self.book_data(0))
+        bad = buffer.submit({**self.book_data(1), 'author': doomed})
+        doomed.delete()
+        buffer.close()
+        self.assertEqual(good.result().title, "Parable 0")
+        self.assertIsNotNone(bad.exception())
+        self.assertEqual(list(Book.objects.values_list('title', flat=True)), ["Parable 0"])
+
+    def test_flusher_survives_an_unexpected_error(self):
+        buffer = BookWriteBuffer(batch_size=10, flush_interval=0)
+        with mock.patch('api.writebehind.close_old_connections', side_effect=RuntimeError('boom')):
+            failed = buffer.submit(self.book_data(0))
+            self.assertIsInstance(failed.exception(timeout=5), RuntimeError)
+        written = buffer.submit(self.book_data(1))
+        self.assertEqual(written.result(timeout=5).title, "Parable 1")
+        buffer.close()
+        self.assertEqual(list(Book.objects.values_list('title', flat=True)), ["Parable 1"])
+
+    @override_settings(API_WRITE_BEHIND=True, API_WRITE_BEHIND_RESULT_TIMEOUT=0.01)
+    def test_create_view_gives_up_on_a_stalled_buffer(self):
+        self.addCleanup(close_write_buffer)
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user('writer', password='pass'))
+        with mock.patch('api.writebehind.BookWriteBuffer._run'):
+            response = client.post(
+                reverse('book-create'),
+                {'title': "Kindred", 'publication_year': 1979, 'author': self.author.pk},
+                format='json',
+            )
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertFalse(Book.objects.exists())
+
+    @override_settings(API_WRITE_BEHIND=True, API_WRITE_BEHIND_FLUSH_INTERVAL=0)
+    def test_create_view_responds_with_the_written_book(self):
+        self.addCleanup(close_write_buffer)
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user('writer', password='pass'))
+        response = client.post(
+            reverse('book-create'),
+            {'title': "Kindred", 'publication_year': 1979, 'author': self.author.pk},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 201)
+        book = Book.objects.get()
+        self.assertEqual(response.data['id'], book.pk)
+        self.assertEqual(response.data['created_at'], book.created_at.isoformat().replace('+00:00', 'Z'))
+        self.assertEqual(
+            client.post(reverse('book-create'), {'title': "Dawn"}, format='json').status_code, 400,
+        )
+
+
+class CurrentYearTests(TestCase):
+    """The cached year follows the clock across New Year."""
+
+    @mock.patch('api.validators._year', None)
+    @mock.patch('api.validators._expires_at', 0.0)
+    def test_year_rolls_over(self):
+        new_year_eve = datetime.datetime(2030, 12, 31, 23, 59, tzinfo=datetime.timezone.utc)
+        with mock.patch('api.validators.timezone.now', return_value=new_year_eve), \
+                mock.patch('api.validators.time.time', return_value=new_year_eve.timestamp()):
+            self.assertEqual(current_year(), 2030)
+        new_year = new_year_eve + datetime.timedelta(minutes=1)
+        with mock.patch('api.validators.timezone.now', return_value=new_year), \
+                mock.patch('api.validators.time.time', return_value=new_year.timestamp()):
+            self.assertEqual(current_year(), 2031)
+
+    def test_serializer_bound_is_the_current_year(self):
+        year = timezone.now().year
+        author = Author.objects.create(name="N. K. Jemisin")
+        serializer = BookSerializer(data={'title': "Later", 'publication_year': year + 1, 'author': author.pk})
+        serializer.is_valid()
+        self.assertEqual(
+            serializer.errors['publication_year'],
+            [f"Publication year cannot be in the future. Current year is {year}."],
+        )
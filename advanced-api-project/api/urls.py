@@ -6,10 +6,11 @@ mapping each URL to its corresponding view with appropriate naming.
 """
 
 from django.urls import path
-from . import views
+from . import async_views, views
 
 urlpatterns = [
     path('books/', views.BookListView.as_view(), name='book-list'),
+    path('books/export/', views.BookExportView.as_view(), name='book-export'),
     path('books/create/', views.BookCreateView.as_view(), name='book-create'),
     path('books/<int:pk>/', views.BookDetailView.as_view(), name='book-detail'),
     path('books/update/<int:pk>', views.BookUpdateView.as_view(), name='book-update'),
@@ -22,4 +23,10 @@ urlpatterns = [
     path('authors/<int:pk>/delete/', views.AuthorDeleteView.as_view(), name='author-delete'),
     
     path('books/bulk/', views.BookBulkOperationsView.as_view(), name='book-bulk-operations'),
+
+    # Async (ASGI) read path; see api/async_views.py.
+    path('async/books/', async_views.AsyncBookView.as_view(), name='async-book-list'),
+    path('async/books/<int:pk>/', async_views.AsyncBookView.as_view(), name='async-book-detail'),
+    path('async/authors/', async_views.AsyncAuthorView.as_view(), name='async-author-list'),
+    path('async/authors/<int:pk>/', async_views.AsyncAuthorView.as_view(), name='async-author-detail'),
 ]
\ No newline at end of file
@@ -0,0 +1,32 @@
+"""
+Validation helpers shared by the API models and serializers.
+
+``current_year`` is the upper bound for ``Book.publication_year``. It is
+passed to MaxValueValidator as a callable, so the bound is read when a
+value is validated instead of being frozen when the models are imported
+(and into every migration generated after that). The year is cached per
+process until the next New Year, so validating a large batch costs one
+``time.time()`` comparison per row rather than a ``timezone.now()`` call.
+"""
+
+import time
+
+from django.utils import timezone
+
+_year = None
+_expires_at = 0.0
+
+
+def current_year():
+    """
+    Return the current year, as ``timezone.now().year`` would.
+
+    Returns:
+        int: The year, recomputed only once the cached one has ended.
+    """
+    global _year, _expires_at
+    if time.time() >= _expires_at:
+        now = timezone.now()
+        new_year = now.replace(year=now.year + 1, month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+        _year, _expires_at = now.year, new_year.timestamp()
+    return _year
@@ -2,15 +2,44 @@
 API views for the Author and Book models.
 """
 
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from django.conf import settings
+from django.db.models import Prefetch
+from django.http import StreamingHttpResponse
 from rest_framework import generics
+from .bulk import BookBulkOperations
+from .cache import CachedListMixin
+from .conditional import ConditionalGetMixin
+from .fastpath import FastAuthorSerializer, FastBookSerializer, FastSerializationMixin
+from .filters import AuthorFilter, BookFilter
+from .pagination import KeysetPaginationMixin
 from .models import Author, Book
+from .renderers import CSVRenderer, NDJSONRenderer
+from .search import BookSearchFilter
+from .sparse import SparseFieldsetMixin, parse_field_selection
 from .serializers import AuthorSerializer, BookSerializer
+from .writebehind import WriteTimeout, get_write_buffer, use_write_behind
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
 from django_filters import rest_framework
+
+
+def author_with_books_queryset():
+    """Return an Author queryset that carries everything AuthorSerializer reads.
+
+    The nested books are prefetched and the book count is a column on
+    Author, so serializing a page of authors costs a fixed number of
+    queries instead of extra queries per author.
+    """
+    return Author.objects.prefetch_related(
+        Prefetch('books', queryset=Book.objects.order_by('pk'))
+    )
+
+
 class AuthorListCreateView(generics.ListCreateAPIView):
     """
     API endpoint that allows authors to be viewed or created.
@@ -40,19 +69,27 @@ class BookDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = BookSerializer
 
 
-class BookListView(generics.ListAPIView):
+class BookListView(CachedListMixin, ConditionalGetMixin, KeysetPaginationMixin,
+                   SparseFieldsetMixin, FastSerializationMixin, generics.ListAPIView):
     """List view for retrieving all books with filtering and search capabilities.
     This view provides read-only access to all Book instances and includes
-    filtering, searching and ordering functionalities.
+    filtering, searching and ordering functionalities. ``?q=`` searches
+    titles and author names through the backend in api/search.py and,
+    without ``?ordering=``, sorts by relevance. Rendered pages are
+    cached per normalized query string until a Book or Author changes.
+    Pass ``?pagination=cursor`` for keyset pagination (no COUNT, no OFFSET)
+    over any of the ``ordering_fields``. Clients re-sending the ETag in
+    ``If-None-Match`` get a 304 until a Book or Author changes.
+    ``?fields=id,title`` returns (and loads) only the named fields.
     """
+    cache_models = (Book, Author)
+    # Author names drive the author__name filter, search and ordering.
+    conditional_models = cache_models
     queryset = Book.objects.all()
     serializer_class = BookSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    fast_serializer_class = FastBookSerializer
+    filter_backends = [DjangoFilterBackend, BookSearchFilter, OrderingFilter]
     filterset_fields = ['publication_year', 'author__name']
-    search_fields = ['title',           
-        'title__icontains', 
-        'author__name',    
-        'author__name__icontains', ]
     ordering_fields = ['title',
         'publication_year',
         'created_at',
@@ -60,25 +97,90 @@ class BookListView(generics.ListAPIView):
         'author__name', ]
     permission_classes = [permissions.AllowAny]
 
-class BookDetailView(generics.RetrieveAPIView):
+class BookExportView(generics.GenericAPIView):
+    """Streaming export of the whole (filtered) book catalog.
+    Accepts the same BookFilter, search and ordering parameters as the list
+    view but is not paginated. Rows are read from a server-side iterator
+    over ``values_list()`` tuples and written as NDJSON (default) or CSV,
+    selected with ``?format=ndjson|csv`` or the Accept header, so memory
+    stays flat regardless of catalog size. ``?fields=`` picks the columns.
+    """
+    queryset = Book.objects.all()
+    permission_classes = [permissions.AllowAny]
+    renderer_classes = [NDJSONRenderer, CSVRenderer]
+    pagination_class = None
+    filter_backends = [DjangoFilterBackend, BookSearchFilter, OrderingFilter]
+    filterset_class = BookFilter
+    ordering_fields = BookListView.ordering_fields
+    ordering = ['pk']
+    # (output name, values_list() lookup), matching BookSerializer's fields.
+    export_fields = [
+        ('id', 'id'),
+        ('title', 'title'),
+        ('publication_year', 'publication_year'),
+        ('author', 'author_id'),
+        ('created_at', 'created_at'),
+        ('updated_at', 'updated_at'),
+    ]
+
+    def get(self, request, *args, **kwargs):
+        selected = parse_field_selection(
+            request.query_params, [name for name, _ in self.export_fields]
+        )
+        fields = [(name, lookup) for name, lookup in self.export_fields if name in selected]
+        names = [name for name, _ in fields]
+        lookups = [lookup for _, lookup in fields]
+        queryset = self.filter_queryset(self.get_queryset())
+        chunk_size = getattr(settings, 'API_EXPORT_CHUNK_SIZE', 2000)
+        rows = queryset.values_list(*lookups).iterator(chunk_size=chunk_size)
+
+        renderer = request.accepted_renderer
+        response = StreamingHttpResponse(
+            renderer.stream(names, rows),
+            content_type=f'{renderer.media_type}; charset={renderer.charset}',
+        )
+        response['Content-Disposition'] = f'attachment; filename="books.{renderer.format}"'
+        return response
+
+
+class BookDetailView(ConditionalGetMixin, SparseFieldsetMixin, FastSerializationMixin,
+                     generics.RetrieveAPIView):
     """Detail view for retrieving a single book instance.
     This view provides read-only access to a single Book instance identified
-    by its primary key.
+    by its primary key. Responses carry an ETag and Last-Modified taken from
+    the book's ``updated_at``, so conditional requests can get a 304.
+    Supports ``?fields=``.
     """
     queryset = Book.objects.all()
     serializer_class = BookSerializer
+    fast_serializer_class = FastBookSerializer
     permission_classes = [permissions.AllowAny]
     lookup_field = 'pk'
+    conditional_last_modified = True
 
 class BookCreateView(generics.CreateAPIView):
     """Create view for adding a new book instance.
     This view allows authenticated users to create new Book instances.
+    With ``API_WRITE_BEHIND`` on, validated books are inserted in batches
+    by the process's write buffer (api/writebehind.py); the response is
+    sent once this request's row has been written, or as a 503 if that
+    takes longer than ``API_WRITE_BEHIND_RESULT_TIMEOUT`` seconds.
     """
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def perform_create(self, serializer):
+        if use_write_behind():
+            future = get_write_buffer().submit(serializer.validated_data)
+            try:
+                serializer.instance = future.result(
+                    timeout=getattr(settings, 'API_WRITE_BEHIND_RESULT_TIMEOUT', 10.0)
+                )
+            except FutureTimeoutError:
+                future.cancel()
+                raise WriteTimeout()
+            return
         book = serializer.save()
 
 
@@ -102,28 +204,43 @@ class BookDeleteView(generics.DestroyAPIView):
     lookup_field = 'pk'
     def perform_destroy(self, instance):
         instance.delete()
-class AuthorListView(generics.ListAPIView):
+class AuthorListView(CachedListMixin, ConditionalGetMixin, SparseFieldsetMixin,
+                     FastSerializationMixin, generics.ListAPIView):
     """List view for retrieving all authors.
-    This view provides read-only access to all Author instances.
+    This view provides read-only access to all Author instances. Rendered
+    pages are cached until an Author or one of their books changes, and
+    conditional requests get a 304 until then. ``?fields=`` picks the
+    fields; books are embedded (and prefetched) unless it leaves them out,
+    and ``?expand=books`` adds them to a selection.
     """
+    cache_models = (Author, Book)
+    conditional_models = cache_models
     queryset = Author.objects.all()
+    expansions = {'books': Prefetch('books', queryset=Book.objects.order_by('pk'))}
     serializer_class = AuthorSerializer
+    fast_serializer_class = FastAuthorSerializer
     permission_classes = [permissions.AllowAny]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filterset_class = AuthorFilter
     serach_fields = ['name']
     ordering_fields = ['name', 'created_at']
     ordering = ['name']
 
 
-class AuthorDetailView(generics.RetrieveAPIView):
+class AuthorDetailView(ConditionalGetMixin, SparseFieldsetMixin, FastSerializationMixin,
+                       generics.RetrieveAPIView):
     """Detail view for retrieving a single author instance.
     This view provides read-only access to a single Author instance identified
-    by its primary key.
+    by its primary key. The ETag covers the author and their books. It
+    takes ``?fields=`` and ``?expand=books`` like the list.
     """
     queryset = Author.objects.all()
+    expansions = AuthorListView.expansions
     serializer_class = AuthorSerializer
+    fast_serializer_class = FastAuthorSerializer
     permission_classes = [permissions.AllowAny]
     lookup_field = 'pk'
+    conditional_models = (Author, Book)
 
 class AuthorCreateView(generics.CreateAPIView):
     """Create view for adding a new author instance.
@@ -154,18 +271,39 @@ class AuthorDeleteView(generics.DestroyAPIView):
 class BookBulkOperationsView(generics.GenericAPIView):
     """View for performing bulk operations on Book instances.
     This view allows authenticated users to create, update, or delete
-    multiple Book instances in a single request.
+    multiple Book instances in a single request. The body is a JSON array
+    of operations (see api/bulk.py); ``?chunk_size=`` overrides the number
+    of rows written per statement. Either every operation is applied in
+    one transaction or, if any is invalid, none is.
     """
     serializer_class = BookSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
         return Book.objects.all()
+
     def post(self, request, *args, **kwargs):
-       
+        operations = request.data
+        if not isinstance(operations, list):
+            return Response(
+                {"detail": "Expected a list of operations."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        max_operations = getattr(settings, 'API_BULK_MAX_OPERATIONS', 50000)
+        if len(operations) > max_operations:
+            return Response(
+                {"detail": f"At most {max_operations} operations are allowed per request."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            bulk = BookBulkOperations(operations, request.query_params.get('chunk_size'))
+        except ValueError:
+            return Response(
+                {"detail": "chunk_size must be an integer."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        applied = bulk.run()
         return Response(
-            {"message": "Bulk operations endpoint - implement specific logic as needed"},
-            status=status.HTTP_501_NOT_IMPLEMENTED
+            {"results": bulk.results, "summary": bulk.summary},
+            status=status.HTTP_200_OK if applied else status.HTTP_400_BAD_REQUEST
         )
-
-    
\ No newline at end of file
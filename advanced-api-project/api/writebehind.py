@@ -0,0 +1,213 @@
+"""
+Write-behind batching for BookCreateView.
+
+On SQLite every single-row create is its own transaction and its own
+fsync, which caps a busy ingest client at a few hundred books a second.
+With ``API_WRITE_BEHIND`` enabled, BookCreateView still validates each
+request as usual but hands the validated data to a per-process
+BookWriteBuffer instead of saving it. One flusher thread collects the
+pending creates and writes them with a single ``bulk_create`` per batch
+once ``API_WRITE_BEHIND_BATCH_SIZE`` rows are waiting or
+``API_WRITE_BEHIND_FLUSH_INTERVAL`` seconds have passed. Each request
+waits on a Future for its own Book (or the exception that stopped it), so
+responses are unchanged. A request that gets no answer within
+``API_WRITE_BEHIND_RESULT_TIMEOUT`` seconds withdraws its create, if it
+has not been picked up yet, and gets a 503. The flusher survives errors
+outside the per-row handling by failing that batch's creates.
+
+Backpressure: at most ``API_WRITE_BEHIND_MAX_PENDING`` creates wait at
+once. A request that finds the buffer full waits up to
+``API_WRITE_BEHIND_SUBMIT_TIMEOUT`` seconds for room and then gets a 503
+with Retry-After. On interpreter exit the buffer stops accepting creates
+and flushes everything already queued before the process ends.
+
+Batches bypass model signals, so, like api/bulk.py, the search document,
+the author book counts and the cache generation are maintained here.
+"""
+
+import atexit
+import threading
+from collections import Counter, deque
+from concurrent.futures import Future
+
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from .cache import bump_generation
+from .models import Author, Book
+
+
+class WriteBufferFull(APIException):
+    """The buffer is full (or shutting down) and cannot take another create."""
+
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Too many pending writes, retry shortly.'
+    default_code = 'write_buffer_full'
+    # DRF's exception handler sends this as Retry-After.
+    wait = 1
+
+
+class WriteTimeout(APIException):
+    """A buffered create was not written within the result timeout."""
+
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'The write was not confirmed in time, retry shortly.'
+    default_code = 'write_timeout'
+    wait = 1
+
+
+def use_write_behind():
+    return getattr(settings, 'API_WRITE_BEHIND', False)
+
+
+class BookWriteBuffer:
+    """
+    Coalesce Book creates from many request threads into batched inserts.
+
+    Args:
+        batch_size (int): Most rows written per ``bulk_create``.
+        flush_interval (float): Seconds a partial batch waits for more rows.
+        max_pending (int): Creates allowed to wait before submit() blocks.
+        submit_timeout (float): Seconds submit() waits for room before
+            raising WriteBufferFull.
+
+    Attributes:
+        flushes (int): Batches written so far.
+    """
+
+    def __init__(self, batch_size=500, flush_interval=0.02, max_pending=10000, submit_timeout=2.0):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.submit_timeout = submit_timeout
+        self.flushes = 0
+        self._pending = deque()
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name='book-write-buffer', daemon=True)
+        self._thread.start()
+
+    def submit(self, validated_data):
+        """
+        Queue a validated BookSerializer payload for creation.
+
+        Returns:
+            Future: Resolves to the created Book, or to the exception that
+            prevented the insert. Cancelling it before the flusher takes
+            it up drops the create.
+
+        Raises:
+            WriteBufferFull: If no room frees up within ``submit_timeout``
+                or the buffer has been closed.
+        """
+        future = Future()
+        with self._condition:
+            has_room = self._condition.wait_for(
+                lambda: len(self._pending) < self.max_pending or self._closed,
+                timeout=self.submit_timeout,
+            )
+            if not has_room or self._closed:
+                raise WriteBufferFull()
+            self._pending.append((validated_data, future))
+            self._condition.notify_all()
+        return future
+
+    def close(self, timeout=None):
+        """Stop accepting creates and wait until every queued one is written."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join(timeout)
+
+    def _take_batch(self):
+        with self._condition:
+            self._condition.wait_for(lambda: self._pending or self._closed)
+            if len(self._pending) < self.batch_size and not self._closed:
+                self._condition.wait_for(
+                    lambda: len(self._pending) >= self.batch_size or self._closed,
+                    timeout=self.flush_interval,
+                )
+            batch = [self._pending.popleft() for _ in range(min(self.batch_size, len(self._pending)))]
+            # Wake submitters waiting for room.
+            self._condition.notify_all()
+            return batch
+
+    def _run(self):
+        try:
+            while True:
+                batch = self._take_batch()
+                if not batch:
+                    return
+                try:
+                    self._flush(batch)
+                except Exception as exc:
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(exc)
+        finally:
+            connections.close_all()
+
+    def _flush(self, batch):
+        # Drop creates whose request gave up waiting.
+        batch = [(validated, future) for validated, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        close_old_connections()
+        self.flushes += 1
+        try:
+            books = self._write([validated for validated, _ in batch])
+        except Exception:
+            # Retry row by row so one bad create (say, an author deleted
+            # since validation) does not fail the rest of the batch.
+            for validated, future in batch:
+                try:
+                    book, = self._write([validated])
+                except Exception as exc:
+                    future.set_exception(exc)
+                else:
+                    future.set_result(book)
+            return
+        for (_, future), book in zip(batch, books):
+            future.set_result(book)
+
+    def _write(self, items):
+        books = []
+        for validated in items:
+            book = Book(**validated)
+            book.search_document = Book.build_search_document(book.title, book.author.name)
+            books.append(book)
+        with transaction.atomic():
+            Book.objects.bulk_create(books)
+            Author.adjust_book_counts(Counter(book.author_id for book in books))
+            transaction.on_commit(lambda: bump_generation(Book))
+        return books
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_write_buffer():
+    """Return this process's BookWriteBuffer, starting it on first use."""
+    global _buffer
+    with _buffer_lock:
+        if _buffer is None:
+            _buffer = BookWriteBuffer(
+                batch_size=getattr(settings, 'API_WRITE_BEHIND_BATCH_SIZE', 500),
+                flush_interval=getattr(settings, 'API_WRITE_BEHIND_FLUSH_INTERVAL', 0.02),
+                max_pending=getattr(settings, 'API_WRITE_BEHIND_MAX_PENDING', 10000),
+                submit_timeout=getattr(settings, 'API_WRITE_BEHIND_SUBMIT_TIMEOUT', 2.0),
+            )
+        return _buffer
+
+
+@atexit.register
+def close_write_buffer(timeout=None):
+    """Drain and stop the process's buffer, if one was started."""
+    global _buffer
+    with _buffer_lock:
+        buffer, _buffer = _buffer, None
+    if buffer is not None:
+        buffer.close(timeout)
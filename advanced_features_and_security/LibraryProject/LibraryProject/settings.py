@@ -10,6 +10,9 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import importlib.util
+import json
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -39,6 +42,7 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'bookshelf',
     'relationship_app',
+    'jobs',
 ]
 
 MIDDLEWARE = [
@@ -51,6 +55,13 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Per-request SQL profiling (Server-Timing header, N+1 warnings) from the
+# shared query_profiler package at the repository root. It is wired up only
+# in DEBUG and once installed with `pip install -e query_profiler`.
+if DEBUG and importlib.util.find_spec('query_profiler') is not None:
+    INSTALLED_APPS += ['query_profiler']
+    MIDDLEWARE += ['query_profiler.middleware.QueryProfilerMiddleware']
+
 ROOT_URLCONF = 'LibraryProject.urls'
 
 TEMPLATES = [
@@ -118,6 +129,9 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+MEDIA_URL = 'media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -127,6 +141,8 @@ LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = 'list_books'
 LOGOUT_REDIRECT_URL = 'login'
 AUTH_USER_MODEL = 'bookshelf.CustomUser'
+# has_perm is served from a cached permission snapshot (bookshelf/permissions.py).
+AUTHENTICATION_BACKENDS = ['bookshelf.backends.SnapshotModelBackend']
 FILE_UPLOAD_PERMISSIONS = 0o644
 
 #https settings
@@ -162,3 +178,39 @@ PASSWORD_HASHERS = [
     'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
     'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
 ]
+
+# Bulk book import (bookshelf/importers.py). Uploads are streamed, so the
+# cap only bounds request size; files over FILE_UPLOAD_MAX_MEMORY_SIZE are
+# spooled to a temporary file rather than held in memory.
+BOOKSHELF_IMPORT_MAX_UPLOAD_SIZE = 50 * 1024 * 1024
+BOOKSHELF_IMPORT_CHUNK_SIZE = 1000
+BOOKSHELF_IMPORT_BATCH_SIZE = 500
+
+# Dashboard catalog snapshot (bookshelf/stats.py). Model signals drop it on
+# every write; the timeout bounds staleness in other processes when the
+# cache alias is per-process (locmem).
+BOOKSHELF_STATS_CACHE_ALIAS = 'default'
+BOOKSHELF_STATS_CACHE_TIMEOUT = 60
+
+# Permission snapshots (bookshelf/permissions.py) are keyed on a version
+# that group and permission changes bump, so they need a cache every
+# process shares. Off (one permission query per request) until the alias
+# names a shared backend such as Redis or Memcached; locmem aliases are
+# ignored.
+BOOKSHELF_PERMISSIONS_CACHE_ALIAS = None
+BOOKSHELF_PERMISSIONS_CACHE_TIMEOUT = 300
+
+# Library selections larger than this are applied by a background job.
+BOOKSHELF_INLINE_SELECTION_LIMIT = 1000
+
+# Database-backed job queue (jobs/), run with ``manage.py run_worker``.
+# Failed jobs are retried after RETRY_BACKOFF seconds, doubling each time,
+# and a running job whose heartbeat is older than STALE_AFTER seconds is
+# assumed lost with its worker and queued again.
+JOBS = {
+    'POLL_INTERVAL': 1.0,
+    'MAX_ATTEMPTS': 3,
+    'RETRY_BACKOFF': 10,
+    'HEARTBEAT_INTERVAL': 30,
+    'STALE_AFTER': 300,
+}
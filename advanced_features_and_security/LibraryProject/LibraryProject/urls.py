@@ -19,6 +19,7 @@ from django.urls import include, path
 
 urlpatterns = [
     path("books/", include("bookshelf.urls")),
+    path("jobs/", include("jobs.urls")),
     path('admin/', admin.site.urls),
     # path('relationship/', include('relationship_app.urls')),
 
@@ -0,0 +1,33 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+from .permissions import get_permission_snapshot
+
+
+class SnapshotModelBackend(ModelBackend):
+    """
+    ModelBackend that answers ``has_perm`` and friends from the cached
+    permission snapshot (bookshelf/permissions.py) instead of querying
+    the database on every request, once a shared cache is configured, and
+    loads the session user together with their profile, so role checks
+    cost no extra query. The role is read with the user on every request,
+    so a changed role applies from the next request without any
+    invalidation.
+    """
+
+    def get_user(self, user_id):
+        UserModel = get_user_model()
+        try:
+            user = UserModel._default_manager.select_related('profile').get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
+
+    def get_all_permissions(self, user_obj, obj=None):
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+        # Kept on the user too, so repeated checks in one request skip
+        # the cache as well, like ModelBackend's own _perm_cache.
+        if not hasattr(user_obj, '_perm_cache'):
+            user_obj._perm_cache = get_permission_snapshot(user_obj)
+        return user_obj._perm_cache
@@ -53,14 +53,15 @@ class UserProfileForm(forms.ModelForm):
 
 
 from django import forms
+from django.conf import settings
 from django.contrib.auth.forms import UserCreationForm, UserChangeForm
 from django.utils.translation import gettext_lazy as _
 from django.core.exceptions import ValidationError
 import html
 import re
-from .models import Book, Author, Library, User, UserProfile, Librarian
+from .models import Book, Author, Library, CustomUser as User, UserProfile, Librarian
 
-class ExampleForm(forms.ModelForm):
+class SecureModelForm(forms.ModelForm):
     """
     Base form with security enhancements.
     """
@@ -178,17 +179,14 @@ class LibrarianForm(SecureModelForm):
     """
     class Meta:
         model = Librarian
-        fields = ['user', 'library', 'employee_id']
+        fields = ['name', 'library']
         widgets = {
-            'user': forms.Select(attrs={
-                'class': 'form-control'
+            'name': forms.TextInput(attrs={
+                'class': 'form-control',
+                'placeholder': 'Enter librarian name'
             }),
             'library': forms.Select(attrs={
                 'class': 'form-control'
-            }),
-            'employee_id': forms.TextInput(attrs={
-                'class': 'form-control',
-                'placeholder': 'Enter employee ID'
             })
         }
 
@@ -518,10 +516,13 @@ class ContactForm(ExampleForm):
 class BulkUploadForm(forms.Form):
     """
     Form for bulk upload with file security validation.
+
+    The upload is imported by bookshelf.importers.BookImporter, which
+    streams it, so the size cap is the BOOKSHELF_IMPORT_MAX_UPLOAD_SIZE
+    setting rather than a fixed in-memory limit.
     """
     file = forms.FileField(
         label='Select file to upload',
-        help_text='Supported formats: CSV, JSON (Max 5MB)',
         widget=forms.FileInput(attrs={
             'class': 'form-control',
             'accept': '.csv,.json'
@@ -538,13 +539,19 @@ class BulkUploadForm(forms.Form):
         })
     )
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_size = getattr(settings, 'BOOKSHELF_IMPORT_MAX_UPLOAD_SIZE', 5 * 1024 * 1024)
+        self.fields['file'].help_text = (
+            f'Supported formats: CSV, JSON (Max {self.max_size // 1024 // 1024}MB)'
+        )
+
     def clean_file(self):
         file = self.cleaned_data.get('file')
         if file:
-            # Check file size (5MB limit)
-            max_size = 5 * 1024 * 1024
-            if file.size > max_size:
-                raise ValidationError(f'File size must be under {max_size // 1024 // 1024}MB.')
+            # Check file size against the configured limit
+            if file.size > self.max_size:
+                raise ValidationError(f'File size must be under {self.max_size // 1024 // 1024}MB.')
             
             # Check file extension
             allowed_extensions = ['.csv', '.json']
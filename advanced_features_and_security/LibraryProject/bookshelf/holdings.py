@@ -0,0 +1,109 @@
+"""
+Set reconciliation for a library's books.
+
+``library.books.set(ids)`` loads every current holding into Python, diffs
+the two sets there and then deletes and inserts the difference, which
+gets slow for libraries holding tens of thousands of books. Here the diff
+is computed by the database instead:
+
+- ``reconcile_books`` replaces the holdings with a full selection. The
+  ids go into a temporary table; the missing holdings are found with one
+  anti-join against the through table and written with
+  ``bulk_create(ignore_conflicts=True)``, and everything not selected is
+  removed with one ``DELETE``.
+- ``change_books`` applies an incremental ``add``/``remove`` payload
+  without looking at the rest of the holdings.
+
+Ids that do not name a book are ignored. Both write the through table
+directly, so no ``m2m_changed`` signals are sent.
+"""
+
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef
+
+from .models import Book, Library
+
+Holding = Library.books.through
+SELECTION_TABLE = 'bookshelf_selected_books'
+
+
+def parse_ids(values):
+    """Return the positive integer ids among form values, ignoring the rest."""
+    return {int(value) for value in values if str(value).isdigit() and int(value) > 0}
+
+
+def add_holdings(library, book_ids, batch_size=1000):
+    """Insert through rows for ``book_ids``; rows that already exist are skipped."""
+    Holding.objects.bulk_create(
+        [Holding(library_id=library.pk, book_id=book_id) for book_id in book_ids],
+        batch_size=batch_size,
+        ignore_conflicts=True,
+    )
+    return len(book_ids)
+
+
+def reconcile_books(library, book_ids, batch_size=1000):
+    """
+    Make ``book_ids`` the library's exact set of books.
+
+    Returns:
+        dict: ``{'added': n, 'removed': n}``.
+    """
+    qn = connection.ops.quote_name
+    table, holdings, books = qn(SELECTION_TABLE), qn(Holding._meta.db_table), qn(Book._meta.db_table)
+    book_pk = qn(Book._meta.pk.column)
+    ids = sorted(parse_ids(book_ids))
+    with transaction.atomic(), connection.cursor() as cursor:
+        # A failed run rolls the CREATE back with everything else, except
+        # on MySQL, where a leftover table is dropped here.
+        cursor.execute(f'DROP TABLE IF EXISTS {table}')
+        cursor.execute(f'CREATE TEMPORARY TABLE {table} (book_id bigint PRIMARY KEY)')
+        for start in range(0, len(ids), batch_size):
+            cursor.executemany(
+                f'INSERT INTO {table} (book_id) VALUES (%s)',
+                [(book_id,) for book_id in ids[start:start + batch_size]],
+            )
+        cursor.execute(
+            f'SELECT s.book_id FROM {table} s '
+            f'INNER JOIN {books} b ON b.{book_pk} = s.book_id '
+            f'WHERE NOT EXISTS (SELECT 1 FROM {holdings} h WHERE h.library_id = %s AND h.book_id = s.book_id)',
+            [library.pk],
+        )
+        added = add_holdings(library, [row[0] for row in cursor.fetchall()], batch_size)
+        cursor.execute(
+            f'DELETE FROM {holdings} WHERE library_id = %s '
+            f'AND book_id NOT IN (SELECT book_id FROM {table})',
+            [library.pk],
+        )
+        removed = cursor.rowcount
+        cursor.execute(f'DROP TABLE {table}')
+    return {'added': added, 'removed': removed}
+
+
+def change_books(library, add=(), remove=(), batch_size=1000):
+    """
+    Add and remove individual books, leaving the other holdings alone.
+
+    Returns:
+        dict: ``{'added': n, 'removed': n}``, counting only holdings that
+        were actually inserted or deleted.
+    """
+    add, remove = parse_ids(add), parse_ids(remove)
+    held = Holding.objects.filter(library_id=library.pk, book_id=OuterRef('pk'))
+    with transaction.atomic():
+        new = []
+        add = sorted(add - remove)
+        for start in range(0, len(add), batch_size):
+            new += (
+                Book.objects.filter(pk__in=add[start:start + batch_size])
+                .exclude(Exists(held))
+                .values_list('pk', flat=True)
+            )
+        added = add_holdings(library, new, batch_size)
+        removed = 0
+        remove = sorted(remove)
+        for start in range(0, len(remove), batch_size):
+            removed += Holding.objects.filter(
+                library_id=library.pk, book_id__in=remove[start:start + batch_size],
+            ).delete()[0]
+    return {'added': added, 'removed': removed}
@@ -0,0 +1,244 @@
+"""
+Streaming book import for BulkUploadForm uploads.
+
+The upload is parsed incrementally, so memory use depends on the chunk
+size, not on the file size:
+
+- CSV is read line by line with ``csv.DictReader``; the header must name
+  at least ``title`` and ``author`` (the author's name).
+- JSON must be an array of objects with the same keys. Objects are
+  decoded one at a time as the array is read, in the manner of ijson,
+  without a third-party parser.
+
+Rows are cleaned against the model fields and written ``chunk_size`` at a
+time. Each chunk resolves its authors with one ``name IN (...)`` query,
+creates the missing ones with one ``bulk_create`` and then inserts its
+books with ``bulk_create(batch_size=...)``, all in one transaction. Rows
+that fail validation are skipped and reported with their row number.
+"""
+
+import codecs
+import csv
+import json
+from itertools import islice
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import models, transaction
+
+from .models import Author, Book
+from .stats import invalidate_catalog_stats
+
+FIELDS = ('title', 'author', 'isbn', 'publication_date', 'description', 'is_available')
+REQUIRED_COLUMNS = ('title', 'author')
+WHITESPACE = ' \t\r\n'
+BOOLEANS = {'true': True, 't': True, 'yes': True, '1': True, 'false': False, 'f': False, 'no': False, '0': False}
+
+
+class ImportFormatError(Exception):
+    """The upload is not a readable CSV file or JSON array."""
+
+
+def iter_csv_rows(file):
+    """
+    Yield ``(line number, row dict)`` for each record of a CSV upload.
+
+    Raises:
+        ImportFormatError: If the header lacks a required column or the
+            CSV is malformed.
+    """
+    reader = csv.DictReader(codecs.iterdecode(file, 'utf-8-sig'))
+    try:
+        missing = [name for name in REQUIRED_COLUMNS if name not in (reader.fieldnames or ())]
+        if missing:
+            raise ImportFormatError(f'The CSV header is missing: {", ".join(missing)}.')
+        for row in reader:
+            yield reader.line_num, row
+    except (csv.Error, UnicodeDecodeError) as exc:
+        raise ImportFormatError(f'Line {reader.line_num}: {exc}') from exc
+
+
+def iter_json_rows(file, read_size=64 * 1024):
+    """
+    Yield ``(position, value)`` for each element of a top-level JSON array,
+    reading ``read_size`` bytes at a time.
+
+    Raises:
+        ImportFormatError: If the upload is not a well-formed JSON array.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder('utf-8-sig')()
+    buffer, pos, eof = '', 0, False
+    expect = '['
+    position = 0
+    while True:
+        while pos < len(buffer) and buffer[pos] in WHITESPACE:
+            pos += 1
+        if pos == len(buffer):
+            if eof:
+                raise ImportFormatError('Unexpected end of the JSON array.')
+            data = file.read(read_size)
+            try:
+                buffer, pos, eof = text.decode(data, final=not data), 0, not data
+            except UnicodeDecodeError as exc:
+                raise ImportFormatError(str(exc)) from exc
+            continue
+
+        char = buffer[pos]
+        if expect == '[':
+            if char != '[':
+                raise ImportFormatError('Expected a JSON array of objects.')
+            pos += 1
+            expect = 'first'
+        elif expect in ('first', 'separator') and char == ']':
+            return
+        elif expect == 'separator':
+            if char != ',':
+                raise ImportFormatError(f'Expected "," or "]" after element {position}.')
+            pos += 1
+            expect = 'value'
+        else:
+            try:
+                value, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as exc:
+                if eof:
+                    raise ImportFormatError(f'Element {position + 1}: {exc.msg}.') from exc
+                end = None
+            # A value ending at the buffer edge may continue in the next read.
+            if end is None or (end == len(buffer) and not eof):
+                data = file.read(read_size)
+                try:
+                    buffer, pos, eof = buffer[pos:] + text.decode(data, final=not data), 0, not data
+                except UnicodeDecodeError as exc:
+                    raise ImportFormatError(str(exc)) from exc
+                continue
+            position += 1
+            yield position, value
+            pos = end
+            expect = 'separator'
+
+
+class BookImporter:
+    """
+    Import books from an uploaded CSV or JSON file.
+
+    Args:
+        file: The uploaded file, opened in binary mode.
+        file_type (str): ``'csv'`` or ``'json'``.
+        chunk_size (int): Rows validated and written per transaction.
+        batch_size (int): Rows per INSERT statement.
+        max_errors (int): Row errors kept in ``errors``; later ones are
+            only counted.
+        progress (callable): Called with ``summary`` after every chunk,
+            in the chunk's transaction, so a checkpoint it saves commits
+            together with the chunk's rows.
+        resume (dict): A ``summary`` passed to ``progress`` by an earlier,
+            interrupted run of the same file; the rows it counts are
+            skipped and its totals carried on. Other keys are ignored.
+
+    Attributes:
+        summary (dict): Rows read, books and authors created, error count.
+        errors (list): ``{'row': n, 'errors': {field: [messages]}}`` dicts.
+    """
+
+    def __init__(self, file, file_type, chunk_size=None, batch_size=None, max_errors=100, progress=None,
+                 resume=None):
+        self.file = file
+        self.file_type = file_type
+        self.chunk_size = chunk_size or getattr(settings, 'BOOKSHELF_IMPORT_CHUNK_SIZE', 1000)
+        self.batch_size = batch_size or getattr(settings, 'BOOKSHELF_IMPORT_BATCH_SIZE', 500)
+        self.max_errors = max_errors
+        self.progress = progress
+        self.fields = {
+            name: Author._meta.get_field('name') if name == 'author' else Book._meta.get_field(name)
+            for name in FIELDS
+        }
+        self.summary = {'rows': 0, 'created': 0, 'authors_created': 0, 'errors': 0}
+        self.summary.update((key, value) for key, value in (resume or {}).items() if key in self.summary)
+        self.errors = []
+
+    def rows(self):
+        if self.file_type == 'csv':
+            return iter_csv_rows(self.file)
+        return iter_json_rows(self.file)
+
+    def run(self):
+        """
+        Import every valid row.
+
+        Returns:
+            dict: The final ``summary``.
+
+        Raises:
+            ImportFormatError: If the file cannot be parsed. Chunks written
+                before the bad spot stay imported.
+        """
+        rows = islice(self.rows(), self.summary['rows'], None)
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                return self.summary
+            with transaction.atomic():
+                self.import_chunk(chunk)
+                if self.progress is not None:
+                    self.progress(self.summary)
+
+    def import_chunk(self, chunk):
+        """Validate and write one chunk; ``run`` calls it inside a transaction."""
+        books = []
+        for number, raw in chunk:
+            self.summary['rows'] += 1
+            try:
+                books.append(self.clean_row(raw))
+            except ValidationError as exc:
+                self.add_error(number, exc.message_dict)
+        if not books:
+            return
+
+        names = {book['author'] for book in books}
+        authors = {}
+        for pk, name in Author.objects.filter(name__in=names).order_by('pk').values_list('pk', 'name'):
+            authors.setdefault(name, pk)
+        missing = [Author(name=name) for name in names if name not in authors]
+        # bulk_create sets the new pks on SQLite and PostgreSQL.
+        for author in Author.objects.bulk_create(missing, batch_size=self.batch_size):
+            authors[author.name] = author.pk
+        Book.objects.bulk_create(
+            [Book(author_id=authors[book.pop('author')], **book) for book in books],
+            batch_size=self.batch_size,
+        )
+        # bulk_create sends no post_save for the dashboard stats.
+        transaction.on_commit(invalidate_catalog_stats)
+        self.summary['created'] += len(books)
+        self.summary['authors_created'] += len(missing)
+
+    def clean_row(self, raw):
+        """
+        Return the model field values for one row.
+
+        Raises:
+            ValidationError: With a message dict keyed by field name.
+        """
+        if not isinstance(raw, dict):
+            raise ValidationError({'row': ['Expected an object.']})
+        cleaned, errors = {}, {}
+        for name, field in self.fields.items():
+            value = raw.get(name)
+            if isinstance(value, str):
+                value = value.strip()
+            if value in (None, ''):
+                value = field.get_default()
+            elif isinstance(field, models.BooleanField) and isinstance(value, str):
+                value = BOOLEANS.get(value.lower(), value)
+            try:
+                cleaned[name] = field.clean(value, None)
+            except ValidationError as exc:
+                errors[name] = exc.messages
+        if errors:
+            raise ValidationError(errors)
+        return cleaned
+
+    def add_error(self, number, errors):
+        self.summary['errors'] += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'row': number, 'errors': errors})
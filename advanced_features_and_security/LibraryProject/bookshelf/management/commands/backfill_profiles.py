@@ -0,0 +1,30 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from bookshelf.models import UserProfile
+
+
+class Command(BaseCommand):
+    help = 'Creates the missing UserProfile rows in bulk, with the default role'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Profiles per INSERT (default 1000)')
+
+    def handle(self, *args, **options):
+        missing = get_user_model().objects.filter(profile__isnull=True).order_by('pk')
+        created = last_pk = 0
+        while True:
+            # Keyset pages, so the inserts never disturb an open cursor.
+            batch = list(missing.filter(pk__gt=last_pk).values_list('pk', flat=True)[:options['batch_size']])
+            if not batch:
+                break
+            # ignore_conflicts: a profile created lazily meanwhile wins. Only
+            # the rows this insert added are counted as backfilled.
+            existing = UserProfile.objects.filter(user_id__in=batch).count()
+            UserProfile.objects.bulk_create(
+                [UserProfile(user_id=pk) for pk in batch], ignore_conflicts=True,
+            )
+            created += UserProfile.objects.filter(user_id__in=batch).count() - existing
+            last_pk = batch[-1]
+            self.stdout.write(f'{created} profiles created')
+        self.stdout.write(self.style.SUCCESS(f'Backfilled {created} profiles.'))
@@ -0,0 +1,93 @@
+"""
+Measure login throughput with and without a profile write per user save.
+
+``login()`` saves the user to update ``last_login``. The old
+relationship_app receivers saved the user's profile on every user save,
+adding an ``UPDATE`` to each login; the ``legacy`` run reconnects an
+equivalent receiver to show the difference. Profiles are now created
+lazily (``CustomUser.get_profile``) and user saves never touch them.
+
+By default only the post-authentication work is timed (session, the
+``last_login`` update and any receivers), since the password hasher would
+otherwise dominate; ``--authenticate`` includes ``authenticate()`` too.
+Users are created in a transaction that is rolled back afterwards.
+"""
+
+import time
+
+from django.contrib.auth import authenticate, get_user_model, login
+from django.contrib.auth.hashers import make_password
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models.signals import post_save
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from bookshelf.models import UserProfile
+
+PASSWORD = 'bench-password'
+
+
+class _Rollback(Exception):
+    pass
+
+
+def save_user_profile(sender, instance, **kwargs):
+    # What relationship_app used to run on every user save.
+    instance.profile.save()
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks login throughput with and without the legacy profile-saving receiver'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=500, help='Logins per run (default 500)')
+        parser.add_argument('--authenticate', action='store_true',
+                            help='Include password checking in the timings')
+
+    def login_all(self, users, check_password):
+        factory = RequestFactory()
+        started = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            for user in users:
+                request = factory.post('/login/')
+                request.session = SessionStore()
+                if check_password:
+                    user = authenticate(request, username=user.username, password=PASSWORD)
+                login(request, user, backend='bookshelf.backends.SnapshotModelBackend')
+        elapsed = time.perf_counter() - started
+        return {
+            'logins_per_sec': round(len(users) / elapsed, 1),
+            'queries_per_login': round(len(queries) / len(users), 2),
+        }
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        count = options['users']
+        password = make_password(PASSWORD)
+        results = {}
+        try:
+            with transaction.atomic():
+                users = User.objects.bulk_create([
+                    User(username=f'bench-login-{index}', email=f'bench-login-{index}@example.com',
+                         password=password)
+                    for index in range(count * 2)
+                ])
+                UserProfile.objects.bulk_create([UserProfile(user=user) for user in users])
+                # Fresh instances, so neither run starts with a cached profile.
+                users = list(User.objects.filter(pk__in=[user.pk for user in users]).order_by('pk'))
+
+                post_save.connect(save_user_profile, sender=User, dispatch_uid='bench-legacy-profile')
+                try:
+                    results['legacy'] = self.login_all(users[:count], options['authenticate'])
+                finally:
+                    post_save.disconnect(sender=User, dispatch_uid='bench-legacy-profile')
+                results['lazy'] = self.login_all(users[count:], options['authenticate'])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        self.stdout.write(f'{"profiles":<10}{"logins/s":>12}{"queries/login":>16}')
+        for name, result in results.items():
+            self.stdout.write(f'{name:<10}{result["logins_per_sec"]:>12.1f}{result["queries_per_login"]:>16.2f}')
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from bookshelf.importers import BookImporter, ImportFormatError
+
+
+class Command(BaseCommand):
+    help = 'Imports books from a CSV or JSON file, streaming it in chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or JSON file to import')
+        parser.add_argument('--format', choices=['csv', 'json'], help='Defaults to the file extension')
+        parser.add_argument('--chunk-size', type=int, help='Rows written per transaction')
+        parser.add_argument('--batch-size', type=int, help='Rows per INSERT statement')
+
+    def handle(self, *args, **options):
+        file_type = options['format'] or options['path'].rsplit('.', 1)[-1].lower()
+        if file_type not in ('csv', 'json'):
+            raise CommandError('Pass --format csv or --format json.')
+
+        def progress(summary):
+            self.stdout.write(
+                f'{summary["rows"]} rows read, {summary["created"]} books created, '
+                f'{summary["errors"]} skipped'
+            )
+
+        with open(options['path'], 'rb') as file:
+            importer = BookImporter(
+                file, file_type,
+                chunk_size=options['chunk_size'], batch_size=options['batch_size'],
+                progress=progress,
+            )
+            try:
+                summary = importer.run()
+            except ImportFormatError as exc:
+                raise CommandError(f'{exc} ({importer.summary["created"]} books imported before it)')
+
+        for error in importer.errors:
+            self.stderr.write(f'Row {error["row"]}: {error["errors"]}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {summary["created"]} books and {summary["authors_created"]} new authors; '
+            f'{summary["errors"]} rows skipped.'
+        ))
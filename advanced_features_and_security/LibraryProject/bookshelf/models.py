@@ -40,20 +40,25 @@ class CustomUser(AbstractUser):
             ("can_delete_user", "Can delete user"),
         ]
 
-class UserProfile(models.Model):
-    ROLE_CHOICES = [
-        ('Admin', 'Admin'),
-        ('Librarian', 'Librarian'),
-        ('Member', 'Member'),
-    ]
+    def get_profile(self):
+        """Return the user's profile, creating it on first access."""
+        return UserProfile.objects.for_user(self)
+
+class UserProfileManager(models.Manager):
+    def for_user(self, user):
+        """
+        Return ``user``'s profile, creating one with the default role the
+        first time it is needed. Saving a user never writes its profile;
+        users without one (created with bulk_create, or before profiles
+        existed) get it here or from ``manage.py backfill_profiles``.
+        """
+        try:
+            return user.profile
+        except UserProfile.DoesNotExist:
+            profile, _ = self.get_or_create(user=user)
+            user.profile = profile
+            return profile
 
-    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='profile')
-    role = models.CharField(max_length=10, choices=ROLE_CHOICES, default='Member')
-    
-    class Meta:
-        db_table = 'user_profile'
-    def __str__(self):
-        return f"{self.user.username} - {self.role}"
 class UserProfile(models.Model):
     ROLE_CHOICES = [
         ('Admin', 'Admin'),
@@ -65,6 +70,8 @@ class UserProfile(models.Model):
     role = models.CharField(max_length=10, choices=ROLE_CHOICES, default='Member')
     bio = models.TextField(blank=True)
     website = models.URLField(blank=True)
+
+    objects = UserProfileManager()
     
     def __str__(self):
         return f"{self.user.username} - {self.role}"  
@@ -0,0 +1,109 @@
+"""
+Cross-request permission snapshots.
+
+Django's ModelBackend loads a user's permissions from the database on the
+first ``has_perm`` of every request (one query for the user's own
+permissions, one joining groups and permissions) and keeps them only on
+that request's user object. Views and templates here check permissions
+on almost every page, so the loaded set is frozen into a snapshot and
+cached, keyed on the user and a global permissions version.
+
+Any change that can alter someone's permissions (group membership, a
+user's or a group's permissions, deleting a group or permission) bumps
+the version through the receivers in bookshelf/signals.py. Every
+snapshot then misses and is rebuilt on next use, while the stale ones
+age out of the cache. ``is_superuser`` is part of the key, so promoting
+or demoting a user needs no bump; ``is_active`` is checked on every call
+by the backend and never cached.
+
+The version only reaches other processes through a cache they share, so
+snapshots are used only when ``BOOKSHELF_PERMISSIONS_CACHE_ALIAS`` names
+one (Redis, Memcached, the database or file backends). With no alias, or
+a per-process backend such as locmem, every request loads permissions
+from the database; a revoked permission must never outlive its change in
+another worker. That load is a single query, where ModelBackend takes
+two, so a page's permission checks cost at most one query either way.
+"""
+
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Permission
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db.models import Q
+
+VERSION_KEY = 'bookshelf:permissions-version'
+SNAPSHOT_KEY = 'bookshelf:permissions:{version}:{user}:{superuser}'
+PROCESS_LOCAL_BACKENDS = (LocMemCache, DummyCache)
+
+
+def get_cache():
+    """Return the shared snapshot cache, or None when snapshots are off."""
+    alias = getattr(settings, 'BOOKSHELF_PERMISSIONS_CACHE_ALIAS', None)
+    if alias is None:
+        return None
+    cache = caches[alias]
+    return None if isinstance(cache, PROCESS_LOCAL_BACKENDS) else cache
+
+
+def get_permissions_version():
+    """
+    Return the current permissions version.
+
+    A missing version is seeded from the clock rather than zero, so an
+    evicted version can never come back to a value older snapshots used.
+    """
+    cache = get_cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_permissions_version(**kwargs):
+    """Invalidate every snapshot. Takes ``**kwargs`` so it can be a signal receiver."""
+    cache = get_cache()
+    if cache is None:
+        return
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def load_permissions(user):
+    """
+    Query ``user``'s permissions as ``'app_label.codename'`` strings: their
+    own and their groups' in one query, or all of them for a superuser.
+    """
+    if user.is_superuser:
+        permissions = Permission.objects.all()
+    else:
+        UserModel = get_user_model()
+        own = UserModel._meta.get_field('user_permissions').related_query_name()
+        via_groups = 'group__' + UserModel._meta.get_field('groups').related_query_name()
+        permissions = Permission.objects.filter(Q(**{own: user}) | Q(**{via_groups: user}))
+    rows = permissions.values_list('content_type__app_label', 'codename')
+    return frozenset(f'{app_label}.{codename}' for app_label, codename in rows)
+
+
+def get_permission_snapshot(user):
+    """
+    Return the frozenset of ``user``'s permissions, from the cache when a
+    snapshot for the current version exists.
+    """
+    cache = get_cache()
+    if cache is None:
+        return load_permissions(user)
+    key = SNAPSHOT_KEY.format(
+        version=get_permissions_version(), user=user.pk, superuser=int(user.is_superuser),
+    )
+    perms = cache.get(key)
+    if perms is None:
+        perms = load_permissions(user)
+        cache.set(key, perms, getattr(settings, 'BOOKSHELF_PERMISSIONS_CACHE_TIMEOUT', 300))
+    return perms
@@ -0,0 +1,37 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from .models import Author, Book, Library
+from .permissions import bump_permissions_version
+from .stats import invalidate_catalog_stats
+
+
+def catalog_changed(sender, **kwargs):
+    # Drop the snapshot after the commit; dropped earlier, a concurrent
+    # request could rebuild it from the old rows and cache that instead.
+    transaction.on_commit(invalidate_catalog_stats)
+
+
+# Any change to these models can alter a count or a recent list on the
+# dashboard; the snapshot is cheap to rebuild, so drop it on every write.
+for model in (Book, Author, Library):
+    post_save.connect(catalog_changed, sender=model, dispatch_uid=f'catalog-stats-save-{model.__name__}')
+    post_delete.connect(catalog_changed, sender=model, dispatch_uid=f'catalog-stats-delete-{model.__name__}')
+
+
+def permissions_changed(sender, action=None, **kwargs):
+    # Bump after the commit, so no request rebuilds a snapshot from the
+    # old rows under the new version.
+    if action is None or action.startswith('post_'):
+        transaction.on_commit(bump_permissions_version)
+
+
+# Membership and grant changes can alter anyone's permission snapshot.
+User = get_user_model()
+for through in (User.groups.through, User.user_permissions.through, Group.permissions.through):
+    m2m_changed.connect(permissions_changed, sender=through, dispatch_uid=f'permissions-{through.__name__}')
+for model in (Group, Permission):
+    post_delete.connect(permissions_changed, sender=model, dispatch_uid=f'permissions-delete-{model.__name__}')
+post_save.connect(permissions_changed, sender=Permission, dispatch_uid='permissions-save-Permission')
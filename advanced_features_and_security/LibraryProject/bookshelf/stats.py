@@ -0,0 +1,99 @@
+"""
+Cached catalog statistics for the dashboard.
+
+The counts and recent lists the dashboard shows are the same for every
+user, so they are built once into a shared snapshot and kept in the
+cache for ``BOOKSHELF_STATS_CACHE_TIMEOUT`` seconds. Saving or deleting a
+Book, Author or Library drops the snapshot (see bookshelf/signals.py);
+bulk writes that skip signals, like the importer, call
+``invalidate_catalog_stats`` themselves.
+
+What a user sees depends only on which of the dashboard permissions they
+hold, so the catalog part of the page is rendered once per combination
+of those permissions and snapshot version, then reused for every user
+with the same combination.
+
+With the default locmem cache each process keeps its own snapshot and
+other processes see a change when their copy expires; point
+``BOOKSHELF_STATS_CACHE_ALIAS`` at a shared backend (Redis, Memcached) to
+invalidate everywhere at once.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .models import Author, Book, Library
+
+STATS_KEY = 'bookshelf:catalog-stats'
+FRAGMENT_KEY = 'bookshelf:dashboard:{version}:{sections}'
+RECENT_LIMIT = 5
+
+# Permission checked -> dashboard section it unlocks.
+SECTIONS = {
+    'users.can_view_book': 'books',
+    'users.can_create_book': 'create_book',
+    'users.can_view_author': 'authors',
+    'users.can_view_library': 'libraries',
+}
+
+
+def get_cache():
+    return caches[getattr(settings, 'BOOKSHELF_STATS_CACHE_ALIAS', 'default')]
+
+
+def get_timeout():
+    return getattr(settings, 'BOOKSHELF_STATS_CACHE_TIMEOUT', 60)
+
+
+def build_catalog_stats():
+    """Query the counts and recent items; plain data, so it pickles cheaply."""
+    return {
+        'version': time.time_ns(),
+        'total_books': Book.objects.count(),
+        'total_authors': Author.objects.count(),
+        'total_libraries': Library.objects.count(),
+        'recent_books': list(
+            Book.objects.order_by('-pk').values('pk', 'title', 'author__name')[:RECENT_LIMIT]
+        ),
+        'recent_authors': list(Author.objects.order_by('-pk').values('pk', 'name')[:RECENT_LIMIT]),
+        'libraries': list(Library.objects.order_by('name').values('pk', 'name')),
+    }
+
+
+def get_catalog_stats():
+    """Return the shared snapshot, rebuilding it if it expired or was dropped."""
+    cache = get_cache()
+    stats = cache.get(STATS_KEY)
+    if stats is None:
+        stats = build_catalog_stats()
+        cache.set(STATS_KEY, stats, get_timeout())
+    return stats
+
+
+def invalidate_catalog_stats(**kwargs):
+    """Drop the snapshot. Takes ``**kwargs`` so it can be a signal receiver."""
+    get_cache().delete(STATS_KEY)
+
+
+def get_sections(user):
+    """Return the sorted dashboard sections ``user`` is allowed to see."""
+    return tuple(sorted(section for perm, section in SECTIONS.items() if user.has_perm(perm)))
+
+
+def get_dashboard_fragment(sections):
+    """
+    Return the rendered catalog part of the dashboard for one set of
+    sections, rendering it only once per snapshot version.
+    """
+    stats = get_catalog_stats()
+    cache = get_cache()
+    key = FRAGMENT_KEY.format(version=stats['version'], sections='.'.join(sections) or '-')
+    html = cache.get(key)
+    if html is None:
+        html = render_to_string('bookshelf/dashboard_catalog.html', {'stats': stats, 'sections': sections})
+        cache.set(key, html, get_timeout())
+    return mark_safe(html)
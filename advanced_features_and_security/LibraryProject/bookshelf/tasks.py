@@ -0,0 +1,77 @@
+"""
+Background tasks for the bookshelf app, run by ``manage.py run_worker``.
+"""
+
+import json
+import tempfile
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+
+from jobs.models import Job
+from jobs.registry import PermanentError, register
+
+from .holdings import reconcile_books
+from .importers import BookImporter, ImportFormatError
+from .models import Book, Library
+
+EXPORT_FIELDS = ('id', 'title', 'author__name', 'is_available')
+
+
+@register('bookshelf.import_books')
+def import_books(job, payload):
+    """
+    Import an uploaded file saved to storage by the book_import view.
+
+    Chunks commit one at a time, each together with the running summary
+    in ``job.result``; a retry skips the rows counted there instead of
+    importing them again. A file that cannot be parsed fails the job
+    without retrying, keeping the chunks before the bad spot.
+    """
+    name = payload['file']
+    checkpoint = job.result or {}
+
+    def progress(summary):
+        job.report_progress(summary['rows'], message=f'{summary["created"]} books created')
+        Job.objects.filter(pk=job.pk).update(result={**summary, 'row_errors': importer.errors})
+
+    try:
+        with default_storage.open(name, 'rb') as file:
+            importer = BookImporter(file, payload['file_type'], progress=progress, resume=checkpoint)
+            importer.errors = checkpoint.get('row_errors', [])
+            summary = importer.run()
+    except ImportFormatError as exc:
+        default_storage.delete(name)
+        raise PermanentError(str(exc)) from exc
+    default_storage.delete(name)
+    return {**summary, 'row_errors': importer.errors}
+
+
+@register('bookshelf.set_library_books')
+def set_library_books(job, payload):
+    """Replace a library's books with the selection from library_manage_books."""
+    library = Library.objects.get(pk=payload['library'])
+    job.report_progress(0, message='Updating library')
+    result = reconcile_books(library, payload['books'])
+    job.report_progress(1, 1, 'Done')
+    return {'library': library.pk, **result}
+
+
+@register('bookshelf.export_books')
+def export_books(job, payload, chunk_size=2000):
+    """Write the api_books listing to a JSON file in storage, row by row."""
+    total = Book.objects.count()
+    rows = Book.objects.order_by('pk').values(*EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+    count = 0
+    with tempfile.TemporaryFile('w+b') as output:
+        output.write(b'[')
+        for count, row in enumerate(rows, 1):
+            if count > 1:
+                output.write(b',')
+            output.write(json.dumps(row).encode())
+            if count % chunk_size == 0:
+                job.report_progress(count, total, 'Exporting books')
+        output.write(b']')
+        output.seek(0)
+        name = default_storage.save(f'exports/books-{job.pk}.json', File(output))
+    return {'file': name, 'count': count}
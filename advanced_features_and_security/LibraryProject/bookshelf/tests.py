@@ -1,3 +1,370 @@
-from django.test import TestCase
+"""
+Tests for the bookshelf application.
+"""
 
-# Create your tests here.
+import io
+import json
+import shutil
+import tempfile
+import threading
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import OperationalError
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.registry import enqueue
+from jobs.worker import Worker
+
+from .backends import SnapshotModelBackend
+from .forms import BulkUploadForm
+from .holdings import change_books, reconcile_books
+from .importers import BookImporter, ImportFormatError, iter_json_rows
+from .models import Author, Book, Library, UserProfile
+from .permissions import load_permissions
+from .stats import get_catalog_stats, get_dashboard_fragment
+from .views import dashboard
+
+
+class JSONStreamTests(SimpleTestCase):
+
+    def test_elements_split_across_reads(self):
+        rows = [{'title': f'Tehanu {i}', 'author': 'Ursula K. Le Guin'} for i in range(50)]
+        data = json.dumps(rows).encode()
+        self.assertEqual([row for _, row in iter_json_rows(io.BytesIO(data), read_size=7)], rows)
+
+    def test_malformed_arrays_are_rejected(self):
+        for data in (b'{"title": "x"}', b'[{"title": "x"}', b'[{"title": "x"} {}]'):
+            with self.subTest(data=data), self.assertRaises(ImportFormatError):
+                list(iter_json_rows(io.BytesIO(data), read_size=4))
+
+
+class BookImporterTests(TestCase):
+
+    def setUp(self):
+        self.le_guin = Author.objects.create(name='Ursula K. Le Guin')
+
+    def test_csv_import_resolves_and_creates_authors(self):
+        data = (
+            'title,author,publication_date,is_available\n'
+            'The Dispossessed,Ursula K. Le Guin,1974-05-01,true\n'
+            'Kindred,Octavia E. Butler,,false\n'
+            'Dawn,Octavia E. Butler,1987-01-01,\n'
+        ).encode()
+        importer = BookImporter(io.BytesIO(data), 'csv', chunk_size=2)
+        # Per chunk: savepoint, author lookup, missing authors, books, release.
+        with self.assertNumQueries(9):
+            summary = importer.run()
+        self.assertEqual(summary, {'rows': 3, 'created': 3, 'authors_created': 1, 'errors': 0})
+        self.assertEqual(Author.objects.count(), 2)
+        self.assertEqual(self.le_guin.books.get().title, 'The Dispossessed')
+        self.assertFalse(Book.objects.get(title='Kindred').is_available)
+        self.assertTrue(Book.objects.get(title='Dawn').is_available)
+
+    def test_invalid_rows_are_reported_and_skipped(self):
+        rows = [
+            {'title': 'Tehanu', 'author': 'Ursula K. Le Guin'},
+            {'title': '', 'author': 'Ursula K. Le Guin'},
+            {'title': 'Lavinia', 'author': 'Ursula K. Le Guin', 'publication_date': 'soon'},
+            ['not', 'an', 'object'],
+        ]
+        importer = BookImporter(io.BytesIO(json.dumps(rows).encode()), 'json')
+        summary = importer.run()
+        self.assertEqual(summary['created'], 1)
+        self.assertEqual(summary['errors'], 3)
+        self.assertEqual([error['row'] for error in importer.errors], [2, 3, 4])
+        self.assertIn('title', importer.errors[0]['errors'])
+        self.assertIn('publication_date', importer.errors[1]['errors'])
+
+    def test_progress_is_reported_per_chunk(self):
+        rows = [{'title': f'Book {i}', 'author': 'Ursula K. Le Guin'} for i in range(5)]
+        seen = []
+        BookImporter(
+            io.BytesIO(json.dumps(rows).encode()), 'json', chunk_size=2,
+            progress=lambda summary: seen.append(summary['rows']),
+        ).run()
+        self.assertEqual(seen, [2, 4, 5])
+
+
+class BulkUploadFormTests(SimpleTestCase):
+
+    @override_settings(BOOKSHELF_IMPORT_MAX_UPLOAD_SIZE=1024 * 1024)
+    def test_upload_size_cap_is_configurable(self):
+        upload = SimpleUploadedFile('books.csv', b'x' * (1024 * 1024 + 1), content_type='text/csv')
+        form = BulkUploadForm({'file_type': 'csv'}, {'file': upload})
+        self.assertFalse(form.is_valid())
+        self.assertEqual(form.errors['file'], ['File size must be under 1MB.'])
+
+
+@override_settings(BOOKSHELF_IMPORT_CHUNK_SIZE=2, JOBS={'MAX_ATTEMPTS': 3, 'RETRY_BACKOFF': 0})
+class ImportTaskTests(TestCase):
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        self.enterContext(override_settings(MEDIA_ROOT=media))
+        self.worker = Worker('test', threading.Event())
+
+    def enqueue_import(self, data):
+        name = default_storage.save('imports/books.json', ContentFile(data))
+        return name, enqueue('bookshelf.import_books', {'file': name, 'file_type': 'json'})
+
+    def run_until_idle(self):
+        runs = 0
+        while self.worker.run_once():
+            runs += 1
+            Job.objects.filter(status=Job.QUEUED).update(run_at=timezone.now())
+        return runs
+
+    def test_retry_resumes_after_the_committed_chunks(self):
+        rows = [{'title': title, 'author': 'Ursula K. Le Guin'} for title in 'ABCDE']
+        name, job = self.enqueue_import(json.dumps(rows).encode())
+        import_chunk = BookImporter.import_chunk
+        calls = []
+
+        def flaky(importer, chunk):
+            calls.append(chunk[0][0])
+            if len(calls) == 2:
+                raise OperationalError('database is locked')
+            import_chunk(importer, chunk)
+
+        with mock.patch.object(BookImporter, 'import_chunk', flaky):
+            self.assertEqual(self.run_until_idle(), 2)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.SUCCEEDED, 2))
+        self.assertEqual(calls, [1, 3, 3, 5])
+        self.assertEqual(job.result['created'], 5)
+        self.assertEqual(sorted(Book.objects.values_list('title', flat=True)), list('ABCDE'))
+        self.assertFalse(default_storage.exists(name))
+
+    def test_unparsable_file_fails_without_retrying(self):
+        name, job = self.enqueue_import(b'[{"title": "A", "author": "Le Guin"}, '
+                                        b'{"title": "B", "author": "Le Guin"}, {"title": ')
+        self.assertEqual(self.run_until_idle(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 1))
+        self.assertIn('ImportFormatError', job.error)
+        self.assertEqual(job.result['created'], 2)
+        self.assertEqual(sorted(Book.objects.values_list('title', flat=True)), ['A', 'B'])
+        self.assertFalse(default_storage.exists(name))
+
+
+class CatalogStatsTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.author = Author.objects.create(name='Ursula K. Le Guin')
+        Book.objects.create(title='The Dispossessed', author=self.author)
+
+    def test_snapshot_is_reused_until_a_write(self):
+        with self.assertNumQueries(6):
+            stats = get_catalog_stats()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_catalog_stats(), stats)
+        self.assertEqual((stats['total_books'], stats['total_authors']), (1, 1))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Book.objects.create(title='Tehanu', author=self.author)
+            # Not dropped until the write commits.
+            self.assertEqual(get_catalog_stats(), stats)
+        stats = get_catalog_stats()
+        self.assertEqual(stats['total_books'], 2)
+        self.assertEqual(stats['recent_books'][0]['title'], 'Tehanu')
+
+    def test_fragment_is_rendered_once_per_sections(self):
+        books = get_dashboard_fragment(('books',))
+        self.assertIn('The Dispossessed', books)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_dashboard_fragment(('books',)), books)
+        self.assertNotIn('The Dispossessed', get_dashboard_fragment(('authors',)))
+        self.assertEqual(get_dashboard_fragment(()).strip(), '')
+
+    def test_dashboard_steady_state_is_one_query(self):
+        # Shipped settings: no shared permissions cache, so the one query
+        # is the permission load; the catalog comes from the snapshot.
+        user = get_user_model().objects.create_user('reader', 'reader@example.com', 'pass12345')
+        UserProfile.objects.create(user=user, role='Librarian')
+        request = RequestFactory().get('/dashboard/')
+        request.user = SnapshotModelBackend().get_user(user.pk)
+        dashboard(request)
+
+        request.user = SnapshotModelBackend().get_user(user.pk)
+        with self.assertNumQueries(1):
+            response = dashboard(request)
+        self.assertContains(response, 'Welcome, reader! (Librarian)')
+
+
+@override_settings(BOOKSHELF_PERMISSIONS_CACHE_ALIAS='permissions')
+class PermissionSnapshotTests(TestCase):
+
+    def setUp(self):
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        # A file cache stands in for a shared backend like Redis.
+        self.enterContext(override_settings(CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+            'permissions': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': location},
+        }))
+        self.group = Group.objects.create(name='Librarians')
+        self.user = get_user_model().objects.create_user('reader', 'reader@example.com', 'pass12345')
+        self.user.groups.add(self.group)
+        self.view_book = Permission.objects.get(codename='can_view_book')
+        self.edit_book = Permission.objects.get(codename='can_edit_book')
+
+    def fresh_user(self):
+        # A new instance per "request", as the auth middleware would load.
+        return get_user_model().objects.get(pk=self.user.pk)
+
+    def test_snapshot_is_shared_across_requests(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group.permissions.add(self.view_book)
+        user = self.fresh_user()
+        with self.assertNumQueries(1):
+            self.assertTrue(user.has_perm('bookshelf.can_view_book'))
+        user = self.fresh_user()
+        with self.assertNumQueries(0):
+            self.assertTrue(user.has_perm('bookshelf.can_view_book'))
+            self.assertFalse(user.has_perm('bookshelf.can_edit_book'))
+            self.assertIsInstance(user.get_all_permissions(), set)
+
+    def test_grant_and_membership_changes_invalidate(self):
+        self.assertFalse(self.fresh_user().has_perm('bookshelf.can_edit_book'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group.permissions.add(self.edit_book)
+        self.assertTrue(self.fresh_user().has_perm('bookshelf.can_edit_book'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.groups.remove(self.group)
+        self.assertFalse(self.fresh_user().has_perm('bookshelf.can_edit_book'))
+
+    def test_inactive_users_have_no_permissions(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group.permissions.add(self.view_book)
+        self.assertTrue(self.fresh_user().has_perm('bookshelf.can_view_book'))
+        self.user.is_active = False
+        self.user.save()
+        self.assertFalse(self.fresh_user().has_perm('bookshelf.can_view_book'))
+
+    @override_settings(BOOKSHELF_PERMISSIONS_CACHE_ALIAS='default')
+    def test_process_local_cache_is_not_used(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.group.permissions.add(self.view_book)
+        for _ in range(2):
+            user = self.fresh_user()
+            with self.assertNumQueries(1):
+                self.assertTrue(user.has_perm('bookshelf.can_view_book'))
+
+    def test_snapshot_matches_model_backend(self):
+        self.group.permissions.add(self.view_book)
+        self.user.user_permissions.add(self.edit_book)
+        admin = get_user_model().objects.create_superuser('admin', 'admin@example.com', 'pass12345')
+        for user in (self.fresh_user(), admin):
+            self.assertEqual(load_permissions(user), ModelBackend().get_all_permissions(user))
+
+
+class UserProfileTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user('reader', 'reader@example.com', 'pass12345')
+
+    def test_user_saves_do_not_write_profiles(self):
+        self.assertFalse(UserProfile.objects.exists())
+        with self.assertNumQueries(1):
+            self.user.save(update_fields=['last_login'])
+
+    def test_profile_is_created_on_first_access(self):
+        profile = self.user.get_profile()
+        self.assertEqual(profile.role, 'Member')
+        with self.assertNumQueries(0):
+            self.assertEqual(self.user.get_profile(), profile)
+        user = get_user_model().objects.get(pk=self.user.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(user.get_profile(), profile)
+
+    def test_backfill_creates_only_missing_profiles(self):
+        other = get_user_model().objects.create_user('writer', 'writer@example.com', 'pass12345')
+        UserProfile.objects.create(user=other, role='Librarian')
+        out = io.StringIO()
+        call_command('backfill_profiles', batch_size=1, stdout=out)
+        self.assertIn('Backfilled 1 profiles.', out.getvalue())
+        roles = dict(UserProfile.objects.values_list('user__username', 'role'))
+        self.assertEqual(roles, {'reader': 'Member', 'writer': 'Librarian'})
+
+    def test_session_user_is_loaded_with_the_role(self):
+        UserProfile.objects.create(user=self.user, role='Librarian')
+        backend = SnapshotModelBackend()
+        with self.assertNumQueries(1):
+            user = backend.get_user(self.user.pk)
+            self.assertEqual(user.get_profile().role, 'Librarian')
+
+        UserProfile.objects.filter(user=self.user).update(role='Admin')
+        self.assertEqual(backend.get_user(self.user.pk).get_profile().role, 'Admin')
+
+
+class HoldingsTests(TestCase):
+
+    def setUp(self):
+        author = Author.objects.create(name='Ursula K. Le Guin')
+        self.books = Book.objects.bulk_create([Book(title=f'Book {i}', author=author) for i in range(6)])
+        self.library = Library.objects.create(
+            name='Central', opening_hours='09:00', email='central@example.com',
+            phone_number='555-0100', address='1 Main St',
+        )
+        self.library.books.set(self.books[:3])
+
+    def holdings(self):
+        return set(self.library.books.values_list('pk', flat=True))
+
+    def test_reconcile_applies_only_the_difference(self):
+        wanted = [book.pk for book in self.books[2:5]] + [999999, 'x']
+        result = reconcile_books(self.library, wanted, batch_size=2)
+        self.assertEqual(result, {'added': 2, 'removed': 2})
+        self.assertEqual(self.holdings(), {book.pk for book in self.books[2:5]})
+
+    def test_reconcile_to_nothing_empties_the_library(self):
+        self.assertEqual(reconcile_books(self.library, []), {'added': 0, 'removed': 3})
+        self.assertEqual(self.holdings(), set())
+
+    def test_incremental_changes_leave_other_holdings(self):
+        result = change_books(
+            self.library, add=[self.books[0].pk, self.books[5].pk, 999999], remove=[self.books[1].pk],
+        )
+        self.assertEqual(result, {'added': 1, 'removed': 1})
+        self.assertEqual(self.holdings(), {self.books[0].pk, self.books[2].pk, self.books[5].pk})
+
+    def test_managing_books_needs_change_library(self):
+        url = reverse('users:library_manage_books', args=[self.library.pk])
+        with override_settings(LOGIN_URL='/login/'):
+            self.assertRedirects(self.client.post(url, {'books': []}), f'/login/?next={url}',
+                                 fetch_redirect_response=False)
+        user = get_user_model().objects.create_user('reader', 'reader@example.com', 'pass12345')
+        self.client.force_login(user)
+        self.assertEqual(self.client.post(url, {'books': []}).status_code, 403)
+        self.assertEqual(len(self.holdings()), 3)
+
+        user.user_permissions.add(Permission.objects.get(content_type__app_label='bookshelf', codename='change_library'))
+        response = self.client.post(url, {'remove': [self.books[0].pk]})
+        self.assertRedirects(response, url, fetch_redirect_response=False)
+        self.assertEqual(len(self.holdings()), 2)
+
+    def test_empty_picker_submit_keeps_the_holdings(self):
+        url = reverse('users:library_manage_books', args=[self.library.pk])
+        user = get_user_model().objects.create_user('librarian', 'librarian@example.com', 'pass12345')
+        user.user_permissions.add(Permission.objects.get(content_type__app_label='bookshelf', codename='change_library'))
+        self.client.force_login(user)
+        response = self.client.post(url, {}, follow=True)
+        self.assertContains(response, 'Nothing changed.')
+        self.assertEqual(len(self.holdings()), 3)
+
+        response = self.client.post(url, {'mode': 'replace', 'books': [self.books[4].pk]})
+        self.assertRedirects(response, url, fetch_redirect_response=False)
+        self.assertEqual(self.holdings(), {self.books[4].pk})
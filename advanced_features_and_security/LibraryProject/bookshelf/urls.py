@@ -9,6 +9,7 @@ urlpatterns = [
     path('books/', views.BookListView.as_view(), name='book_list'),
     path('books/<int:pk>/', views.BookDetailView.as_view(), name='book_detail'),
     path('books/create/', views.book_create, name='book_create'),
+    path('books/import/', views.book_import, name='book_import'),
     path('books/<int:pk>/edit/', views.BookUpdateView.as_view(), name='book_edit'),
     path('books/<int:pk>/delete/', views.BookDeleteView.as_view(), name='book_delete'),
     path('books/<int:pk>/operations/', views.book_operations, name='book_operations'),
@@ -24,6 +25,7 @@ urlpatterns = [
     # Dashboard and API URLs
     path('dashboard/', views.dashboard, name='dashboard'),
     path('api/books/', views.api_books, name='api_books'),
+    path('api/books/export/', views.api_books_export, name='api_books_export'),
     
     # Home page
     path('', views.dashboard, name='home'),
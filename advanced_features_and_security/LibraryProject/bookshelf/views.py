@@ -10,11 +10,21 @@ from django.contrib.auth.decorators import permission_required
 from .forms import BookForm, AuthorForm, LibraryForm,UserProfile
 from django.urls import reverse
 from django.http import JsonResponse
+from django.views.decorators.http import require_POST
 from .forms import ExampleForm
 
 from django.shortcuts import render, redirect
 from django.contrib import messages
 from .forms import ContactForm
+from .forms import BulkUploadForm
+from django.conf import settings
+from django.core.files.storage import default_storage
+from jobs.registry import enqueue
+from .stats import get_dashboard_fragment, get_sections
+from .holdings import change_books, reconcile_books
+from django.core.paginator import Paginator
+from django.db.models import Exists, OuterRef
+import uuid
 
 def form_example(request):
     """
@@ -74,6 +84,28 @@ def book_create(request):
     
     return render(request, 'book_create.html', {'form': form})
 
+@login_required
+@permission_required('bookshelf.can_create_book', raise_exception=True)
+def book_import(request):
+    """
+    Queue an import of books from a CSV or JSON upload (see
+    bookshelf/importers.py). The file is saved to storage and imported by
+    a background worker; the page links to the job's status.
+    """
+    job = None
+    if request.method == 'POST':
+        form = BulkUploadForm(request.POST, request.FILES)
+        if form.is_valid():
+            file_type = form.cleaned_data['file_type']
+            name = default_storage.save(f'imports/{uuid.uuid4().hex}.{file_type}', form.cleaned_data['file'])
+            job = enqueue('bookshelf.import_books', {'file': name, 'file_type': file_type}, user=request.user)
+            messages.success(request, 'Your import has been queued.')
+            form = BulkUploadForm()
+    else:
+        form = BulkUploadForm()
+
+    return render(request, 'bookshelf/book_import.html', {'form': form, 'job': job})
+
 class BookUpdateView(LoginRequiredMixin, PermissionRequiredMixin, UpdateView):
     model = Book
     form_class = BookForm
@@ -128,40 +160,66 @@ class LibraryListView(LoginRequiredMixin, ListView):
         queryset = Library.objects.all()
         return queryset
 
+@login_required
+@permission_required('bookshelf.change_library', raise_exception=True)
 def library_manage_books(request, pk):
+    """
+    Add books to and remove books from a library (see bookshelf/holdings.py).
+
+    POST ``add``/``remove`` ids, as the picker does, or ``mode=replace``
+    with a full ``books`` selection to replace the holdings with; full
+    selections over BOOKSHELF_INLINE_SELECTION_LIMIT ids are applied by a
+    background job. A submit with nothing ticked changes nothing. The
+    picker lists available books a page at a time, filtered by ``q``.
+    """
     library = get_object_or_404(Library, pk=pk)
 
     if request.method == 'POST':
-        book_ids = request.POST.getlist('books')
-        books = Book.objects.filter(pk__in=book_ids)
-        library.books.set(books)
-        return redirect('library_detail', pk=pk)
+        if request.POST.get('mode') == 'replace':
+            book_ids = request.POST.getlist('books')
+            if len(book_ids) > getattr(settings, 'BOOKSHELF_INLINE_SELECTION_LIMIT', 1000):
+                job = enqueue('bookshelf.set_library_books', {'library': library.pk, 'books': book_ids}, user=request.user)
+                messages.info(request, f'Updating {len(book_ids)} books in the background (job {job.pk}).')
+                return redirect(request.get_full_path())
+            result = reconcile_books(library, book_ids)
+        else:
+            add, remove = request.POST.getlist('add'), request.POST.getlist('remove')
+            if not add and not remove:
+                messages.info(request, 'Nothing changed.')
+                return redirect(request.get_full_path())
+            result = change_books(library, add, remove)
+        messages.success(request, f'Added {result["added"]} and removed {result["removed"]} books.')
+        return redirect(request.get_full_path())
 
-    available_books = Book.objects.filter(is_available = True)
-    return render(request, 'library_manage_books.html', {'library': library, 'available_books': available_books})
+    query = request.GET.get('q', '').strip()
+    available_books = (
+        Book.objects.filter(is_available=True)
+        .select_related('author')
+        .annotate(held=Exists(Library.books.through.objects.filter(library_id=library.pk, book_id=OuterRef('pk'))))
+        .order_by('title', 'pk')
+    )
+    if query:
+        available_books = available_books.filter(title__icontains=query)
+    page = Paginator(available_books, 50).get_page(request.GET.get('page'))
+    return render(request, 'library_manage_books.html', {
+        'library': library,
+        'available_books': page,
+        'query': query,
+    })
 
 @login_required
 def dashboard(request):
-    context = {}
-    
-    if request.user.has_perm('users.can_view_book'):
-        context['recent_books'] = Book.objects.all()[:5]
-        context['total_books'] = Book.objects.count()
-    
-    if request.user.has_perm('users.can_create_book'):
-        context['can_create_book'] = True
-    
-    if request.user.has_perm('users.can_view_author'):
-        context['recent_authors'] = Author.objects.all()[:5]
-        context['total_authors'] = Author.objects.count()
-    
-    if request.user.has_perm('users.can_view_library'):
-        context['libraries'] = Library.objects.all()
-        context['total_libraries'] = Library.objects.count()
-    
-    user_profile = request.user.profile
-    context['user_role'] = user_profile.role
-    context['has_library_access'] = user_profile.has_library_access()
+    """
+    Catalog counts and recent items from the shared snapshot in
+    bookshelf/stats.py; the catalog part is rendered once per permission
+    combination and reused across users.
+    """
+    user_profile = request.user.get_profile()
+    context = {
+        'catalog': get_dashboard_fragment(get_sections(request.user)),
+        'user_role': user_profile.role,
+        'has_library_access': user_profile.role in ('Admin', 'Librarian'),
+    }
     
     return render(request, 'dashboard.html', context)
 
@@ -173,6 +231,22 @@ def api_books(request):
     books = Book.objects.values('id', 'title', 'author__name', 'is_available')
     return JsonResponse(list(books), safe=False)
 
+@login_required
+@require_POST
+def api_books_export(request):
+    """
+    Queue a full api_books dump as a JSON file. Responds 202 at once with
+    the job's status URL; the finished file is served by jobs:job_download.
+    """
+    if not request.user.has_perm('users.can_view_book'):
+        return JsonResponse({'error': 'Permission denied'}, status=403)
+
+    job = enqueue('bookshelf.export_books', user=request.user)
+    return JsonResponse(
+        {'job': job.pk, 'status_url': reverse('jobs:job_status', args=[job.pk])},
+        status=202,
+    )
+
 def check_model_permissions(user, model, actions=['view']):
     app_label = model._meta.app_label
     model_name = model._meta.model_name
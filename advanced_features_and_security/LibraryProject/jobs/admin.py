@@ -0,0 +1,9 @@
+from django.contrib import admin
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'task', 'status', 'attempts', 'progress_done', 'progress_total', 'created_by', 'created_at']
+    list_filter = ['status', 'task']
+    readonly_fields = ['started_at', 'heartbeat_at', 'finished_at', 'worker', 'error', 'result']
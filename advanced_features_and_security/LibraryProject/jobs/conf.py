@@ -0,0 +1,14 @@
+from django.conf import settings
+
+DEFAULTS = {
+    'POLL_INTERVAL': 1.0,       # seconds an idle worker thread sleeps
+    'MAX_ATTEMPTS': 3,
+    'RETRY_BACKOFF': 10,        # seconds before the first retry; doubles after
+    'HEARTBEAT_INTERVAL': 30,   # seconds between heartbeats of running jobs
+    'STALE_AFTER': 300,         # seconds without a heartbeat before a job is requeued
+}
+
+
+def get_config():
+    """Return the ``JOBS`` setting merged over the defaults."""
+    return {**DEFAULTS, **getattr(settings, 'JOBS', {})}
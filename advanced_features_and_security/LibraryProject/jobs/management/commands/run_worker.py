@@ -0,0 +1,52 @@
+import multiprocessing
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobs.worker import run_threads
+
+
+def _run_process(threads, burst):
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *args: stop.set())
+    signal.signal(signal.SIGINT, lambda *args: stop.set())
+    run_threads(threads, stop, burst)
+
+
+class Command(BaseCommand):
+    help = 'Runs background jobs with a pool of worker processes and threads'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1,
+                            help='Worker processes (default 1, in this process)')
+        parser.add_argument('--threads', type=int, default=4,
+                            help='Worker threads per process (default 4)')
+        parser.add_argument('--burst', action='store_true',
+                            help='Exit once the queue is empty instead of polling')
+
+    def handle(self, *args, **options):
+        processes, threads, burst = options['processes'], options['threads'], options['burst']
+        self.stdout.write(f'Starting {processes} process(es) x {threads} thread(s)')
+        if processes == 1:
+            _run_process(threads, burst)
+        else:
+            # Children must not inherit this process's open connections.
+            connections.close_all()
+            context = multiprocessing.get_context('fork')
+            children = [
+                context.Process(target=_run_process, args=(threads, burst), name=f'jobs-{index}')
+                for index in range(processes)
+            ]
+            for child in children:
+                child.start()
+            try:
+                for child in children:
+                    child.join()
+            except KeyboardInterrupt:
+                # The children received the SIGINT too; wait for them to
+                # finish their current jobs.
+                for child in children:
+                    child.join()
+        self.stdout.write(self.style.SUCCESS('Workers stopped'))
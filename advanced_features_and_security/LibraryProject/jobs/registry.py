@@ -0,0 +1,62 @@
+"""
+Task registration and enqueueing.
+
+A task is a function taking ``(job, payload)``. Register it under a name
+with ``@register('app.name')`` in the app's ``tasks.py`` (found by
+JobsConfig.ready) and queue it with ``enqueue('app.name', {...})``.
+Whatever the task returns must be JSON-serializable; it is stored as the
+job's ``result``. Payloads are JSON too, so pass ids, not model instances.
+
+A task that raises is retried until ``max_attempts`` is used up; raise
+``PermanentError`` for failures a retry cannot fix, such as bad input.
+"""
+
+from .conf import get_config
+from .models import Job
+
+_tasks = {}
+
+
+class PermanentError(Exception):
+    """Raised by a task to fail its job without retrying."""
+
+
+def register(name):
+    """Decorator registering a task function under ``name``."""
+    def decorator(func):
+        _tasks[name] = func
+        return func
+    return decorator
+
+
+def get_task(name):
+    """
+    Return the function registered under ``name``.
+
+    Raises:
+        KeyError: If no task has that name.
+    """
+    return _tasks[name]
+
+
+def enqueue(task, payload=None, user=None, max_attempts=None):
+    """
+    Queue a job and return it.
+
+    The row is visible to workers once the surrounding transaction, if
+    any, commits.
+
+    Args:
+        task (str): A registered task name.
+        payload (dict): JSON-serializable arguments for the task.
+        user: The user the job belongs to, for the status endpoint.
+        max_attempts (int): Runs allowed before the job fails; defaults to
+            the ``MAX_ATTEMPTS`` setting.
+    """
+    get_task(task)
+    return Job.objects.create(
+        task=task,
+        payload=payload or {},
+        created_by=user if user is not None and user.is_authenticated else None,
+        max_attempts=max_attempts or get_config()['MAX_ATTEMPTS'],
+    )
@@ -0,0 +1,113 @@
+"""
+Tests for the jobs application.
+"""
+
+import threading
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Job
+from .registry import enqueue, register
+from .worker import Worker, requeue_stale_jobs
+
+calls = []
+
+
+@register('jobs.tests.echo')
+def echo(job, payload):
+    job.report_progress(1, 1, 'Echoed')
+    calls.append(payload)
+    return payload
+
+
+@register('jobs.tests.broken')
+def broken(job, payload):
+    raise ValueError('Bad payload')
+
+
+@override_settings(JOBS={'RETRY_BACKOFF': 10})
+class WorkerTests(TestCase):
+
+    def setUp(self):
+        calls.clear()
+        self.worker = Worker('test', threading.Event())
+
+    def test_job_runs_once_and_stores_result(self):
+        job = enqueue('jobs.tests.echo', {'n': 1})
+        self.worker.run(burst=True)
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.SUCCEEDED)
+        self.assertEqual(job.result, {'n': 1})
+        self.assertEqual((job.attempts, job.progress_done, job.progress_message), (1, 1, 'Echoed'))
+        self.assertEqual(calls, [{'n': 1}])
+        self.assertFalse(self.worker.run_once())
+
+    def test_claimed_job_is_not_claimed_again(self):
+        job = enqueue('jobs.tests.echo')
+        self.assertEqual(self.worker.claim().pk, job.pk)
+        self.assertIsNone(Worker('other', threading.Event()).claim())
+
+    def test_jobs_not_yet_due_are_skipped(self):
+        job = enqueue('jobs.tests.echo')
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now() + timedelta(minutes=1))
+        self.assertFalse(self.worker.run_once())
+
+    def test_failures_back_off_then_fail(self):
+        job = enqueue('jobs.tests.broken', max_attempts=2)
+        before = timezone.now()
+        self.assertTrue(self.worker.run_once())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.QUEUED, 1))
+        self.assertGreaterEqual(job.run_at, before + timedelta(seconds=10))
+        self.assertEqual(job.as_dict()['error'], 'ValueError: Bad payload')
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        self.assertTrue(self.worker.run_once())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 2))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_stale_jobs_are_requeued_or_failed(self):
+        retry = enqueue('jobs.tests.echo')
+        spent = enqueue('jobs.tests.echo', max_attempts=1)
+        fresh = enqueue('jobs.tests.echo')
+        for job in (retry, spent, fresh):
+            self.worker.claim()
+        Job.objects.exclude(pk=fresh.pk).update(heartbeat_at=timezone.now() - timedelta(minutes=10))
+
+        self.assertEqual(requeue_stale_jobs(300), (1, 1))
+        statuses = dict(Job.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses, {retry.pk: Job.QUEUED, spent.pk: Job.FAILED, fresh.pk: Job.RUNNING})
+
+    def test_unknown_task_is_rejected(self):
+        with self.assertRaises(KeyError):
+            enqueue('jobs.tests.missing')
+
+
+class JobStatusViewTests(TestCase):
+
+    def setUp(self):
+        User = get_user_model()
+        self.owner = User.objects.create_user(username='owner', email='owner@example.com', password='pass12345')
+        self.other = User.objects.create_user(username='other', email='other@example.com', password='pass12345')
+        self.job = enqueue('jobs.tests.echo', {'n': 2}, user=self.owner)
+
+    def test_owner_sees_status(self):
+        self.client.force_login(self.owner)
+        response = self.client.get(reverse('jobs:job_status', args=[self.job.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], Job.QUEUED)
+
+    def test_other_users_get_404(self):
+        self.client.force_login(self.other)
+        response = self.client.get(reverse('jobs:job_status', args=[self.job.pk]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_download_needs_a_finished_file(self):
+        self.client.force_login(self.owner)
+        response = self.client.get(reverse('jobs:job_download', args=[self.job.pk]))
+        self.assertEqual(response.status_code, 404)
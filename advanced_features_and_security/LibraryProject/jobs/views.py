@@ -0,0 +1,32 @@
+from django.contrib.auth.decorators import login_required
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+
+from .models import Job
+
+
+def _get_job(request, pk):
+    job = get_object_or_404(Job, pk=pk)
+    if job.created_by_id != request.user.pk and not request.user.is_staff:
+        raise Http404
+    return job
+
+
+@login_required
+def job_status(request, pk):
+    """
+    Poll a job's status, progress and result. Only the user who queued
+    the job (or staff) can see it.
+    """
+    return JsonResponse(_get_job(request, pk).as_dict())
+
+
+@login_required
+def job_download(request, pk):
+    """Download the file a finished job stored as ``result['file']``."""
+    job = _get_job(request, pk)
+    name = (job.result or {}).get('file') if job.status == Job.SUCCEEDED else None
+    if not name or not default_storage.exists(name):
+        raise Http404
+    return FileResponse(default_storage.open(name, 'rb'), as_attachment=True, filename=name.rsplit('/', 1)[-1])
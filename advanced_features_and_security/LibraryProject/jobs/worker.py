@@ -0,0 +1,180 @@
+"""
+The worker loop behind ``manage.py run_worker``.
+
+Each worker thread repeatedly claims the oldest due queued job, runs its
+task and records the outcome. Claiming is a conditional UPDATE
+(``status = queued`` -> ``running``), so any number of threads and
+processes can poll the same table without taking a job twice, on SQLite
+as well as PostgreSQL.
+
+A failed run is retried with exponential backoff until ``max_attempts``
+is used up; a ``PermanentError`` fails the job at once. While a job
+runs, a per-process heartbeat thread refreshes ``heartbeat_at``; a
+running job whose heartbeat is older than ``STALE_AFTER`` belonged to a
+worker that died and is put back in the queue (or failed, if it has no
+attempts left).
+"""
+
+import logging
+import os
+import socket
+import threading
+import traceback
+from datetime import timedelta
+
+from django.db import close_old_connections, connections
+from django.db.models import F
+from django.utils import timezone
+
+from .conf import get_config
+from .models import Job
+from .registry import PermanentError, get_task
+
+logger = logging.getLogger('jobs')
+
+
+class Worker:
+    """
+    Claims and runs jobs until ``stop`` is set.
+
+    Args:
+        name (str): Recorded on the jobs this worker runs.
+        stop (threading.Event): Set to finish the current job and exit.
+        running (set): Shared with the process's Heartbeat; holds the ids
+            of jobs being run.
+    """
+
+    def __init__(self, name, stop, running=None):
+        self.name = name
+        self.stop = stop
+        self.running = running if running is not None else set()
+        self.config = get_config()
+
+    def run(self, burst=False):
+        """
+        Process jobs until stopped, or until the queue is empty with
+        ``burst``.
+        """
+        try:
+            while not self.stop.is_set():
+                close_old_connections()
+                if self.run_once():
+                    continue
+                if burst:
+                    return
+                self.stop.wait(self.config['POLL_INTERVAL'])
+        finally:
+            connections.close_all()
+
+    def run_once(self):
+        """Run one due job, if there is one. Returns True when a job ran."""
+        job = self.claim()
+        if job is None:
+            return False
+        self.running.add(job.pk)
+        try:
+            self.execute(job)
+        finally:
+            self.running.discard(job.pk)
+        return True
+
+    def claim(self):
+        now = timezone.now()
+        due = Job.objects.filter(status=Job.QUEUED, run_at__lte=now).order_by('run_at', 'pk')
+        for pk in due.values_list('pk', flat=True)[:10]:
+            claimed = Job.objects.filter(pk=pk, status=Job.QUEUED).update(
+                status=Job.RUNNING,
+                attempts=F('attempts') + 1,
+                worker=self.name,
+                started_at=now,
+                heartbeat_at=now,
+            )
+            if claimed:
+                return Job.objects.get(pk=pk)
+        return None
+
+    def execute(self, job):
+        try:
+            result = get_task(job.task)(job, job.payload)
+        except PermanentError:
+            self.fail(job, traceback.format_exc(), retry=False)
+            return
+        except Exception:
+            self.fail(job, traceback.format_exc())
+            return
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.SUCCEEDED, result=result, error='', finished_at=timezone.now(),
+        )
+        logger.info('%s succeeded', job)
+
+    def fail(self, job, error, retry=True):
+        now = timezone.now()
+        if retry and job.attempts < job.max_attempts:
+            delay = self.config['RETRY_BACKOFF'] * 2 ** (job.attempts - 1)
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.QUEUED, error=error, run_at=now + timedelta(seconds=delay),
+            )
+            logger.warning('%s failed (attempt %d of %d), retrying in %ss',
+                           job, job.attempts, job.max_attempts, delay)
+        else:
+            Job.objects.filter(pk=job.pk).update(status=Job.FAILED, error=error, finished_at=now)
+            logger.error('%s failed after %d attempts:\n%s', job, job.attempts, error)
+
+
+class Heartbeat(threading.Thread):
+    """
+    Refreshes the heartbeat of this process's running jobs and requeues
+    jobs whose worker stopped sending one.
+    """
+
+    def __init__(self, running, stop):
+        super().__init__(name='jobs-heartbeat', daemon=True)
+        self.running = running
+        self.stop = stop
+        self.config = get_config()
+
+    def run(self):
+        try:
+            while not self.stop.wait(self.config['HEARTBEAT_INTERVAL']):
+                close_old_connections()
+                if self.running:
+                    Job.objects.filter(pk__in=list(self.running)).update(heartbeat_at=timezone.now())
+                requeue_stale_jobs(self.config['STALE_AFTER'])
+        finally:
+            connections.close_all()
+
+
+def requeue_stale_jobs(stale_after):
+    """
+    Return running jobs with no heartbeat for ``stale_after`` seconds to
+    the queue, or fail them if they have no attempts left.
+    """
+    now = timezone.now()
+    stale = Job.objects.filter(status=Job.RUNNING, heartbeat_at__lt=now - timedelta(seconds=stale_after))
+    error = 'Worker stopped responding.'
+    requeued = stale.filter(attempts__lt=F('max_attempts')).update(status=Job.QUEUED, run_at=now, error=error)
+    failed = stale.update(status=Job.FAILED, finished_at=now, error=error)
+    if requeued or failed:
+        logger.warning('Requeued %d and failed %d stale jobs', requeued, failed)
+    return requeued, failed
+
+
+def run_threads(threads, stop, burst=False):
+    """Run ``threads`` workers plus a heartbeat in this process until stopped."""
+    running = set()
+    prefix = f'{socket.gethostname()}:{os.getpid()}'
+    heartbeat = Heartbeat(running, stop)
+    heartbeat.start()
+    workers = [
+        threading.Thread(
+            target=Worker(f'{prefix}:{index}', stop, running).run,
+            kwargs={'burst': burst},
+            name=f'jobs-worker-{index}',
+        )
+        for index in range(threads)
+    ]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    stop.set()
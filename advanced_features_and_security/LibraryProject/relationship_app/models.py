@@ -1,7 +1,4 @@
 from django.db import models
-from django.contrib.auth.models import User
-from django.db.models.signals import post_save
-from django.dispatch import receiver
 from django.conf import settings
 
 # class UserProfile(models.Model):
@@ -17,15 +14,6 @@ from django.conf import settings
 #     def __str__(self):
 #         return f"{self.user.username} - {self.role}"
 
-# Signal to automatically create UserProfile when a new User is created
-@receiver(post_save, sender=User)
-def create_user_profile(sender, instance, created, **kwargs):
-    if created:
-        UserProfile.objects.create(user=instance)
-
-@receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
-    instance.profile.save()
 class Author(models.Model):
     name = models.CharField(max_length=100)
 
@@ -42,6 +30,11 @@ class Book(models.Model):
             ("can_change_book", "Can change book"),
             ("can_delete_book", "Can delete book"),
         ]
+        indexes = [
+            # Library pages list holdings by title; with this index the
+            # first pages are read in order instead of sorting them all.
+            models.Index(fields=["title", "id"], name="book_title_id_idx"),
+        ]
     def __str__(self):
         return self.title
     
@@ -1,16 +0,0 @@
-
-from django.db.models.signals import post_save
-from django.dispatch import receiver
-from django.contrib.auth import get_user_model
-from .models import UserProfile
-
-User = get_user_model()
-
-@receiver(post_save,sender=User)
-def create_user_profile(sender,instance,created,**kwargs):
-    if created:
-        UserProfile.objects.create(user=instance)
-
-@receiver(post_save, sender=User)
-def save_user_profile(sender, instance, **kwargs):
-    instance.profile.save()
\ No newline at end of file
@@ -1,3 +1,56 @@
-from django.test import TestCase
+from django.http import Http404
+from django.test import RequestFactory, TestCase
 
-# Create your tests here.
+from .models import Author, Book, Library
+from .views import LibraryDetailView, count_books_in_libraries, with_book_counts
+
+
+class LibraryCountTests(TestCase):
+
+    def setUp(self):
+        author = Author.objects.create(name='Ursula K. Le Guin')
+        self.books = [Book.objects.create(title=f'Book {i}', author=author) for i in range(3)]
+        self.central = Library.objects.create(name='Central')
+        self.branch = Library.objects.create(name='Branch')
+        self.empty = Library.objects.create(name='Empty')
+        self.central.books.set(self.books[:2])
+        self.branch.books.set(self.books[1:2])
+
+    def test_book_counts_come_from_one_query(self):
+        with self.assertNumQueries(1):
+            counts = {library.name: library.book_count for library in with_book_counts(Library.objects.all())}
+        self.assertEqual(counts, {'Central': 2, 'Branch': 1, 'Empty': 0})
+
+    def test_books_held_anywhere_are_counted_once(self):
+        self.assertEqual(count_books_in_libraries(), 2)
+
+
+class LibraryDetailViewTests(TestCase):
+
+    def setUp(self):
+        author = Author.objects.create(name='Ursula K. Le Guin')
+        self.library = Library.objects.create(name='Central')
+        books = Book.objects.bulk_create([Book(title=f'Book {i:03}', author=author) for i in range(120)])
+        self.library.books.set(books)
+
+    def get(self, **params):
+        request = RequestFactory().get('/', params)
+        return LibraryDetailView.as_view(paginate_by=50)(request, pk=self.library.pk)
+
+    def test_page_is_loaded_with_the_library(self):
+        with self.assertNumQueries(2):
+            response = self.get(page=3)
+            response.render()
+        page = response.context_data['books']
+        self.assertEqual(page.paginator.count, 120)
+        self.assertEqual([book.title for book in page], [f'Book {i:03}' for i in range(100, 120)])
+
+    def test_search_filters_the_holdings(self):
+        response = self.get(q='book 11')
+        page = response.context_data['books']
+        self.assertEqual(page.paginator.count, 10)
+        self.assertEqual(page[0].title, 'Book 110')
+
+    def test_pages_past_the_end_are_404(self):
+        with self.assertRaises(Http404):
+            self.get(page=4)
@@ -1,7 +1,8 @@
 from django.shortcuts import render, get_list_or_404,redirect
 from django.http import HttpResponse
 from django.views.generic import DetailView
-from .models import Library, Author,Book, UserProfile
+from .models import Library, Author,Book
+from bookshelf.models import UserProfile
 
 from django.views.generic.detail import DetailView
 
@@ -13,15 +14,24 @@ from .forms import BookForm
 from django.contrib.auth.decorators import permission_required
 from django.contrib import messages
 from django.shortcuts import get_object_or_404
+from django.core.paginator import InvalidPage, Paginator
+from django.db.models import Count, Exists, OuterRef, Subquery
+from django.http import Http404
+from django.db.models.functions import Coalesce
+
+def has_role(user, role):
+    # The profile is loaded with the session user (bookshelf/backends.py),
+    # so stacked role checks do not query.
+    return user.is_authenticated and user.get_profile().role == role
 
 def is_admin(user):
-    return user.is_authenticated and hasattr(user, 'profile') and user.profile.role == 'Admin'
+    return has_role(user, 'Admin')
 
 def is_librarian(user):
-    return user.is_authenticated and hasattr(user, 'profile') and user.profile.role == 'Librarian'
+    return has_role(user, 'Librarian')
 
 def is_member(user):
-    return user.is_authenticated and hasattr(user, 'profile') and user.profile.role == 'Member'
+    return has_role(user, 'Member')
 def list_books(request):
     """
     Function-based view that lists all books in the database
@@ -45,17 +55,35 @@ def admin_view(request):
         'total_users': UserProfile.objects.count()
     })
 
+PAGE_SIZE = 24
+
+def with_book_counts(libraries):
+    """
+    Annotate ``book_count`` with a correlated COUNT over the through
+    table, instead of loading every library's books.
+    """
+    counts = (
+        Library.books.through.objects.filter(library_id=OuterRef('pk'))
+        .order_by().values('library_id').annotate(count=Count('pk')).values('count')
+    )
+    return libraries.annotate(book_count=Coalesce(Subquery(counts), 0))
+
+def count_books_in_libraries():
+    """Count books held by at least one library, with EXISTS rather than a DISTINCT join."""
+    held = Library.books.through.objects.filter(book_id=OuterRef('pk'))
+    return Book.objects.filter(Exists(held)).count()
+
 @user_passes_test(is_librarian)
 @login_required
 def librarian_view(request):
     """
     Librarian view - only accessible to users with Librarian role
     """
-    libraries = Library.objects.all().prefetch_related('books')
+    libraries = with_book_counts(Library.objects.select_related('librarian').order_by('pk'))
     return render(request, 'relationship_app/librarian_view.html', {
-        'libraries': libraries,
+        'libraries': Paginator(libraries, PAGE_SIZE).get_page(request.GET.get('page')),
         'total_books': Book.objects.count(),
-        'available_books': Book.objects.filter(libraries__isnull=False).distinct().count()
+        'available_books': count_books_in_libraries(),
     })
 @user_passes_test(is_member)
 @login_required
@@ -63,27 +91,54 @@ def member_view(request):
     """
     Member view - only accessible to users with Member role
     """
-    books = Book.objects.all().select_related('author')
-    libraries = Library.objects.all()
+    books = Book.objects.select_related('author').order_by('pk')
+    libraries = with_book_counts(Library.objects.order_by('pk'))
     return render(request, 'relationship_app/member_view.html', {
-        'books': books,
-        'libraries': libraries,
-        'available_books_count': Book.objects.filter(libraries__isnull=False).distinct().count()
+        'books': Paginator(books, PAGE_SIZE).get_page(request.GET.get('books_page')),
+        'libraries': Paginator(libraries, PAGE_SIZE).get_page(request.GET.get('libraries_page')),
+        'available_books_count': count_books_in_libraries(),
     })
 
 class LibraryDetailView(DetailView):
     """
     Class-based view that displays details for a specific library
+
+    get_queryset loads the library with its (optionally ``?q=`` filtered)
+    book count, so the paginator needs no COUNT of its own; the page of
+    books, sorted by title, is one more query however large the library.
     """
     model = Library
     template_name = 'relationship_app/library_detail.html'
     context_object_name = 'library'
+    paginate_by = 50
+
+    def get_search(self):
+        return self.request.GET.get('q', '').strip()
+
+    def get_books(self, library):
+        books = library.books.select_related('author').order_by('title', 'pk')
+        search = self.get_search()
+        return books.filter(title__icontains=search) if search else books
+
+    def get_queryset(self):
+        held = Library.books.through.objects.filter(library_id=OuterRef('pk'))
+        search = self.get_search()
+        if search:
+            held = held.filter(book__title__icontains=search)
+        counts = held.order_by().values('library_id').annotate(count=Count('pk')).values('count')
+        return Library.objects.annotate(book_count=Coalesce(Subquery(counts), 0))
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['library'] = Library.objects.prefetch_related('books__author').get(pk=self.object.pk)
+        paginator = Paginator(self.get_books(self.object), self.paginate_by)
+        paginator.count = self.object.book_count
+        try:
+            context['books'] = paginator.page(self.request.GET.get('page') or 1)
+        except InvalidPage as exc:
+            raise Http404(str(exc))
+        context['search'] = self.get_search()
         return context
-    
+
 
 def register_view(request):
     if request.method == 'POST':
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import importlib.util
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -53,6 +54,13 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Per-request SQL profiling (Server-Timing header, N+1 warnings) from the
+# shared query_profiler package at the repository root. It is wired up only
+# in DEBUG and once installed with `pip install -e query_profiler`.
+if DEBUG and importlib.util.find_spec("query_profiler") is not None:
+    INSTALLED_APPS += ["query_profiler"]
+    MIDDLEWARE += ["query_profiler.middleware.QueryProfilerMiddleware"]
+
 ROOT_URLCONF = "api_project.urls"
 
 TEMPLATES = [
@@ -0,0 +1,6 @@
+from django.apps import AppConfig
+
+
+class QueryProfilerConfig(AppConfig):
+    name = "query_profiler"
+    verbose_name = "Query profiler"
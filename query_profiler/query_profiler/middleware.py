@@ -0,0 +1,202 @@
+"""
+Per-request SQL profiling.
+
+QueryProfilerMiddleware installs an ``execute_wrapper`` on every database
+connection for the duration of a request and records how many queries the
+view ran, how long they took and how often each normalized statement
+("fingerprint") repeated. The totals go out as a ``Server-Timing`` header,
+so they show up in the browser's network panel, and the profile is left on
+``request.query_profile`` for views and tests.
+
+A fingerprint seen more than ``DUPLICATE_THRESHOLD`` times is almost always
+an N+1 (a related lookup per row of a list); it is logged on the
+``query_profiler`` logger, or raised as DuplicateQueryError when ``RAISE``
+is set. Configure with the ``QUERY_PROFILER`` setting:
+
+    QUERY_PROFILER = {
+        'ENABLED': DEBUG,
+        'DUPLICATE_THRESHOLD': 5,
+        'RAISE': False,
+        'SERVER_TIMING': True,
+    }
+
+Queries a StreamingHttpResponse runs while its body is being consumed
+happen after the middleware has returned and are not counted.
+
+The middleware is async-capable, so async views under ASGI are not pushed
+back into a thread. The async ORM runs queries on the request's
+thread-sensitive worker thread, whose connections are not the event
+loop's, so the wrappers are installed (and removed) from that thread.
+"""
+
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('query_profiler')
+
+DEFAULTS = {
+    'ENABLED': None,  # None follows DEBUG
+    'DUPLICATE_THRESHOLD': 5,
+    'RAISE': False,
+    'SERVER_TIMING': True,
+}
+
+# Transaction bookkeeping repeats by design and is not an N+1.
+IGNORED_RE = re.compile(r'^\s*(SAVEPOINT|RELEASE SAVEPOINT|ROLLBACK TO SAVEPOINT)\b', re.IGNORECASE)
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+PLACEHOLDER_RE = re.compile(r'%s|\?')
+IN_LIST_RE = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+class DuplicateQueryError(Exception):
+    """Raised when a request repeats a normalized query too many times."""
+
+
+def get_config():
+    """Return the ``QUERY_PROFILER`` setting merged over the defaults."""
+    config = {**DEFAULTS, **getattr(settings, 'QUERY_PROFILER', {})}
+    if config['ENABLED'] is None:
+        config['ENABLED'] = settings.DEBUG
+    return config
+
+
+def fingerprint(sql):
+    """
+    Normalize a SQL statement so repeats with different values compare equal.
+
+    Literals and placeholders become ``?`` and ``IN (?, ?, ...)`` lists of
+    any length collapse to ``IN (...)``.
+
+    Args:
+        sql (str): The statement as passed to the cursor.
+
+    Returns:
+        str: The normalized statement.
+    """
+    sql = STRING_RE.sub('?', sql)
+    sql = NUMBER_RE.sub('?', sql)
+    sql = PLACEHOLDER_RE.sub('?', sql)
+    sql = IN_LIST_RE.sub('(...)', sql)
+    return WHITESPACE_RE.sub(' ', sql).strip()
+
+
+class QueryProfile:
+    """
+    Query statistics for one request; also the ``execute_wrapper`` callable.
+
+    Attributes:
+        count (int): Statements executed.
+        duration (float): Total time spent in the database, in seconds.
+        fingerprints (Counter): Executions per normalized statement.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+        self.samples = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.record(sql, time.perf_counter() - started)
+
+    def record(self, sql, duration):
+        self.count += 1
+        self.duration += duration
+        if IGNORED_RE.match(sql):
+            return
+        key = fingerprint(sql)
+        self.fingerprints[key] += 1
+        self.samples.setdefault(key, sql)
+
+    def duplicates(self, threshold):
+        """Return ``(fingerprint, count)`` pairs repeated more than ``threshold`` times."""
+        return [
+            (key, count) for key, count in self.fingerprints.most_common() if count > threshold
+        ]
+
+    def server_timing(self):
+        noun = 'query' if self.count == 1 else 'queries'
+        return f'db;dur={self.duration * 1000:.2f};desc="{self.count} {noun}"'
+
+
+class QueryProfilerMiddleware:
+    """Record the queries each request runs and report repeated ones."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        config = get_config()
+        if not config['ENABLED']:
+            return self.get_response(request)
+
+        profile = request.query_profile = QueryProfile()
+        with ExitStack() as stack:
+            self.install(stack, profile)
+            response = self.get_response(request)
+        return self.finish(request, response, profile, config)
+
+    async def __acall__(self, request):
+        config = get_config()
+        if not config['ENABLED']:
+            return await self.get_response(request)
+
+        profile = request.query_profile = QueryProfile()
+        stack = ExitStack()
+        await sync_to_async(self.install)(stack, profile)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self.finish(request, response, profile, config)
+
+    def install(self, stack, profile):
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(profile))
+
+    def finish(self, request, response, profile, config):
+        if config['SERVER_TIMING']:
+            timing = profile.server_timing()
+            if response.has_header('Server-Timing'):
+                timing = f"{response['Server-Timing']}, {timing}"
+            response['Server-Timing'] = timing
+
+        duplicates = profile.duplicates(config['DUPLICATE_THRESHOLD'])
+        if duplicates:
+            self.report(request, profile, duplicates, config)
+        return response
+
+    def report(self, request, profile, duplicates, config):
+        key, count = duplicates[0]
+        message = (
+            f'{request.method} {request.path} repeated a query {count} times '
+            f'({profile.count} queries in total): {profile.samples[key]}'
+        )
+        if config['RAISE']:
+            raise DuplicateQueryError(message)
+        logger.warning(message, extra={
+            'request': request,
+            'duplicates': duplicates,
+            'query_count': profile.count,
+        })
@@ -0,0 +1,89 @@
+"""
+Tests for the query profiler middleware.
+"""
+
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from .middleware import DuplicateQueryError, QueryProfilerMiddleware, fingerprint
+
+ENABLED = {'ENABLED': True, 'DUPLICATE_THRESHOLD': 3}
+
+
+def per_user_view(request):
+    """Look users up one at a time, the way an N+1 template does."""
+    for pk in range(int(request.GET['n'])):
+        get_user_model().objects.filter(pk=pk).exists()
+    return HttpResponse('ok')
+
+
+async def async_per_user_view(request):
+    for pk in range(int(request.GET['n'])):
+        await get_user_model().objects.filter(pk=pk).aexists()
+    return HttpResponse('ok')
+
+
+class FingerprintTests(SimpleTestCase):
+
+    def test_values_and_in_lists_are_normalized(self):
+        self.assertEqual(
+            fingerprint('SELECT *  FROM "t" WHERE "id" IN (%s, %s, %s) AND name = \'x\' LIMIT 21'),
+            fingerprint('SELECT * FROM "t" WHERE "id" IN (%s) AND name = \'y\' LIMIT 1'),
+        )
+
+    def test_different_statements_differ(self):
+        self.assertNotEqual(
+            fingerprint('SELECT * FROM "a" WHERE "id" = %s'),
+            fingerprint('SELECT * FROM "b" WHERE "id" = %s'),
+        )
+
+
+class QueryProfilerMiddlewareTests(TestCase):
+
+    def setUp(self):
+        self.middleware = QueryProfilerMiddleware(per_user_view)
+
+    def get(self, n):
+        request = RequestFactory().get('/users/', {'n': n})
+        return request, self.middleware(request)
+
+    @override_settings(QUERY_PROFILER=ENABLED)
+    def test_server_timing_reports_query_count(self):
+        request, response = self.get(2)
+        self.assertEqual(request.query_profile.count, 2)
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="2 queries"$')
+
+    @override_settings(QUERY_PROFILER=ENABLED)
+    def test_repeated_query_is_logged(self):
+        with self.assertLogs('query_profiler', 'WARNING') as logs:
+            self.get(4)
+        self.assertIn('repeated a query 4 times', logs.output[0])
+
+    @override_settings(QUERY_PROFILER=ENABLED)
+    def test_queries_under_threshold_are_not_logged(self):
+        with self.assertNoLogs('query_profiler'):
+            self.get(3)
+
+    @override_settings(QUERY_PROFILER={**ENABLED, 'RAISE': True})
+    def test_raise_mode(self):
+        with self.assertRaises(DuplicateQueryError):
+            self.get(4)
+
+    @override_settings(QUERY_PROFILER={'ENABLED': False})
+    def test_disabled(self):
+        request, response = self.get(4)
+        self.assertFalse(hasattr(request, 'query_profile'))
+        self.assertFalse(response.has_header('Server-Timing'))
+
+
+class AsyncQueryProfilerMiddlewareTests(TestCase):
+
+    @override_settings(QUERY_PROFILER=ENABLED)
+    async def test_async_view_queries_are_recorded(self):
+        middleware = QueryProfilerMiddleware(async_per_user_view)
+        request = RequestFactory().get('/users/', {'n': 4})
+        with self.assertLogs('query_profiler', 'WARNING'):
+            response = await middleware(request)
+        self.assertEqual(request.query_profile.count, 4)
+        self.assertIn('desc="4 queries"', response['Server-Timing'])